@@ -0,0 +1,370 @@
+"""
+API latency benchmark.
+
+Seeds a tenant with realistic data volumes, then drives each endpoint
+scenario at a fixed concurrency against the API directly and, optionally,
+through the gateway. Per scenario the JSON report has latency percentiles,
+throughput, status codes and, from the profiling headers, DB queries per
+request and event-loop lag. A DB query count that grows with the seeded
+volume is an N+1.
+
+Start the API with profiling headers enabled (from backend/):
+    REQUEST_PROFILING_ENABLED=true uvicorn src.main:app --port 8000
+and, for --gateway-url, the gateway with the rate limit out of the way:
+    RATE_LIMIT=1000000/minute BACKEND_URL=http://localhost:8000 \\
+        uvicorn src.gateway.main:app --port 8080
+
+Usage:
+    python -m benchmarks.api_bench --entities 200 --executions 2000 --children 3 \\
+        --concurrency 20 --requests 500 --gateway-url http://localhost:8080 --output api.json
+
+Scenarios:
+    login             POST /auth/login
+    entities          GET /ai/entities
+    entity_library    GET /ai/entities/library?include_stats=true
+    executions        GET /ai/executions
+    execution_detail  GET /ai/executions/{id} on random seeded root runs
+    stats             GET /ai/stats
+    sse               GET /ai/executions/{id}/stream: --sse-streams held open at
+                      once; time to the first event, then delivery latency of a
+                      COMPLETED message published to the run's channel
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+sys.path.append(os.getcwd())
+
+import httpx
+import redis.asyncio as redis
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from src.common.config import settings
+from src.common.security import get_password_hash
+from src.auth.models import Company, User
+from src.ai.models import ExecutionRun, HierarchicalEntity, LLMInteractionLog, ToolInteractionLog
+import src.config.models  # noqa: F401 - registers IntegrationRegistry for relationship mapping
+from benchmarks.stats import git_revision, summarize
+
+BENCH_COMPANY = "API Benchmark"
+BENCH_EMAIL = "api-bench@example.com"
+BENCH_PASSWORD = "api-bench-password"
+SCENARIOS = ["login", "entities", "entity_library", "executions", "execution_detail", "stats", "sse"]
+SEED_BATCH = 500
+
+engine = create_async_engine(settings.DATABASE_URL)
+AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+# --- Seeding ---
+
+async def ensure_tenant(db):
+    result = await db.execute(select(Company).where(Company.name == BENCH_COMPANY))
+    company = result.scalars().first()
+    if not company:
+        company = Company(name=BENCH_COMPANY, type="TENANT", status="active")
+        db.add(company)
+        await db.flush()
+
+    result = await db.execute(select(User).where(User.email == BENCH_EMAIL))
+    if not result.scalar_one_or_none():
+        db.add(User(
+            email=BENCH_EMAIL,
+            full_name="API Benchmark",
+            hashed_password=get_password_hash(BENCH_PASSWORD),
+            company_id=company.id,
+            role="tenant_admin",
+            is_verified=True
+        ))
+    await db.commit()
+    return company
+
+
+async def seed_entities(db, company_id, count: int) -> list:
+    result = await db.execute(select(HierarchicalEntity.id).where(HierarchicalEntity.company_id == company_id))
+    ids = list(result.scalars().all())
+    for i in range(len(ids), count):
+        entity = HierarchicalEntity(
+            company_id=company_id,
+            name=f"bench-entity-{i}",
+            type=["AGENT", "PROCESS", "SKILL", "ACTION"][i % 4],
+            tags=["benchmark"],
+            identity={"persona": {"system_prompt": "You are a benchmark agent."}},
+            planning={"static_plan": {"enabled": True, "steps": []}}
+        )
+        db.add(entity)
+        await db.flush()
+        ids.append(entity.id)
+    await db.commit()
+    return ids[:count]
+
+
+def run_logs(run_id, created_at, logs: int) -> list:
+    rows = []
+    for i in range(logs):
+        if i % 2:
+            rows.append(ToolInteractionLog(
+                run_id=run_id, tool_id="calculator", tool_name="Calculator", provider="internal",
+                input_parameters={"expression": "2+2"}, output_result={"result": 4},
+                latency_ms=5, created_at=created_at
+            ))
+        else:
+            rows.append(LLMInteractionLog(
+                run_id=run_id, model_provider="openai", model_name="mock-gpt",
+                input_prompt="Summarize the benchmark topic. " * 10,
+                output_response="A benchmark summary. " * 20,
+                prompt_tokens=80, completion_tokens=60, latency_ms=300, created_at=created_at
+            ))
+    return rows
+
+
+async def seed_executions(db, company_id, entity_ids: list, count: int, children: int, logs: int, rng) -> list:
+    """Top up root runs (each with `children` child runs and `logs` logs per run) to `count`."""
+    result = await db.execute(
+        select(ExecutionRun.id)
+        .where(ExecutionRun.company_id == company_id, ExecutionRun.parent_run_id.is_(None))
+    )
+    root_ids = list(result.scalars().all())
+    now = datetime.utcnow()
+    pending = []
+    for i in range(len(root_ids), count):
+        # Spread over the last 30 days so "today" filters see a realistic share
+        created_at = now - timedelta(minutes=rng.randrange(30 * 24 * 60))
+        root = ExecutionRun(
+            id=uuid4(), company_id=company_id, entity_id=rng.choice(entity_ids),
+            status="COMPLETED", input_data={"input": f"request {i}"},
+            result_data={"output": "done", "steps": []}, trace_id=uuid4(),
+            total_tokens=140 * (children + 1), execution_time_ms=1200,
+            started_at=created_at, completed_at=created_at + timedelta(seconds=1), created_at=created_at
+        )
+        pending.append(root)
+        pending.extend(run_logs(root.id, created_at, logs))
+        for _ in range(children):
+            child = ExecutionRun(
+                id=uuid4(), company_id=company_id, entity_id=rng.choice(entity_ids),
+                parent_run_id=root.id, status="COMPLETED", input_data={"input": "delegated"},
+                result_data={"output": "child done"}, trace_id=root.trace_id,
+                started_at=created_at, completed_at=created_at + timedelta(milliseconds=500), created_at=created_at
+            )
+            pending.append(child)
+            pending.extend(run_logs(child.id, created_at, logs))
+        root_ids.append(root.id)
+
+        if len(pending) >= SEED_BATCH:
+            db.add_all(pending)
+            await db.commit()
+            pending = []
+    if pending:
+        db.add_all(pending)
+        await db.commit()
+    return root_ids[:count]
+
+
+async def table_counts(db, company_id) -> dict:
+    runs = await db.execute(select(func.count(ExecutionRun.id)).where(ExecutionRun.company_id == company_id))
+    entities = await db.execute(select(func.count(HierarchicalEntity.id)).where(HierarchicalEntity.company_id == company_id))
+    return {"execution_runs": runs.scalar(), "entities": entities.scalar()}
+
+
+# --- Load ---
+
+class ScenarioResult:
+    def __init__(self):
+        self.latencies, self.db_queries, self.db_time, self.loop_lag = [], [], [], []
+        self.statuses = Counter()
+        self.errors = Counter()
+
+    def record(self, elapsed: float, response: httpx.Response = None, error: Exception = None):
+        if error is not None:
+            self.errors[type(error).__name__] += 1
+            return
+        self.latencies.append(elapsed * 1000)
+        self.statuses[str(response.status_code)] += 1
+        headers = response.headers
+        if "x-db-queries" in headers:
+            self.db_queries.append(float(headers["x-db-queries"]))
+            self.db_time.append(float(headers["x-db-time-ms"]))
+            self.loop_lag.append(float(headers["x-event-loop-lag-ms"]))
+
+    def report(self, wall_seconds: float) -> dict:
+        return {
+            "requests": len(self.latencies),
+            "requests_per_sec": round(len(self.latencies) / max(wall_seconds, 1e-6), 2),
+            "status_codes": dict(self.statuses),
+            "errors": dict(self.errors),
+            "latency_ms": summarize(self.latencies),
+            # Empty when the server runs without REQUEST_PROFILING_ENABLED
+            "db_queries": summarize(self.db_queries),
+            "db_time_ms": summarize(self.db_time),
+            "event_loop_lag_ms": summarize(self.loop_lag),
+        }
+
+
+async def run_requests(client, make_request, requests: int, concurrency: int) -> dict:
+    result = ScenarioResult()
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                response = await make_request(client)
+            except httpx.HTTPError as e:
+                result.record(time.perf_counter() - started, error=e)
+            else:
+                result.record(time.perf_counter() - started, response)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return result.report(time.perf_counter() - started)
+
+
+async def run_sse(client, redis_client, run_ids: list, token: str, first_event_timeout: float) -> dict:
+    """Hold one stream open per run id, then publish a COMPLETED message to each."""
+    result = ScenarioResult()
+    first_event, delivery, timeouts = [], [], 0
+
+    async def stream(run_id):
+        connected = asyncio.Event()
+        published_at = None
+
+        async def publish():
+            nonlocal published_at, timeouts
+            try:
+                await asyncio.wait_for(connected.wait(), first_event_timeout)
+            except asyncio.TimeoutError:
+                # A buffering proxy only flushes the stream once it ends
+                timeouts += 1
+            published_at = time.perf_counter()
+            await redis_client.publish(f"execution:{run_id}", json.dumps({"status": "COMPLETED", "result": {}}))
+
+        started = time.perf_counter()
+        publisher = None
+        try:
+            async with client.stream("GET", f"/api/v1/ai/executions/{run_id}/stream", params={"token": token}) as response:
+                result.record(time.perf_counter() - started, response)
+                publisher = asyncio.create_task(publish())
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    if not connected.is_set():
+                        first_event.append((time.perf_counter() - started) * 1000)
+                        connected.set()
+                    elif "COMPLETED" in line and published_at is not None:
+                        delivery.append((time.perf_counter() - published_at) * 1000)
+                        break
+        except httpx.HTTPError as e:
+            result.record(time.perf_counter() - started, error=e)
+        if publisher:
+            await publisher
+
+    started = time.perf_counter()
+    await asyncio.gather(*(stream(run_id) for run_id in run_ids))
+    # latency_ms here is the time to response headers
+    report = result.report(time.perf_counter() - started)
+    report["first_event_ms"] = summarize(first_event)
+    report["delivery_ms"] = summarize(delivery)
+    report["first_event_timeouts"] = timeouts
+    return report
+
+
+async def bench_target(base_url: str, args, root_ids: list, rng) -> dict:
+    async with httpx.AsyncClient(
+        base_url=base_url,
+        timeout=args.timeout,
+        limits=httpx.Limits(max_connections=max(args.concurrency, args.sse_streams) + 10)
+    ) as client:
+        response = await client.post("/api/v1/auth/login", json={"email": BENCH_EMAIL, "password": BENCH_PASSWORD})
+        response.raise_for_status()
+        token = response.json()["access_token"]
+        auth = {"Authorization": f"Bearer {token}"}
+
+        requests = {
+            "login": lambda c: c.post("/api/v1/auth/login", json={"email": BENCH_EMAIL, "password": BENCH_PASSWORD}),
+            "entities": lambda c: c.get("/api/v1/ai/entities", headers=auth),
+            "entity_library": lambda c: c.get("/api/v1/ai/entities/library", params={"include_stats": "true"}, headers=auth),
+            "executions": lambda c: c.get("/api/v1/ai/executions", headers=auth),
+            "execution_detail": lambda c: c.get(f"/api/v1/ai/executions/{rng.choice(root_ids)}", headers=auth),
+            "stats": lambda c: c.get("/api/v1/ai/stats", headers=auth),
+        }
+
+        results = {}
+        for name in args.scenarios:
+            if name == "sse":
+                redis_client = redis.from_url(settings.REDIS_URL or "redis://localhost:6379")
+                try:
+                    stream_ids = rng.sample(root_ids, min(args.sse_streams, len(root_ids)))
+                    results[name] = await run_sse(client, redis_client, stream_ids, token, args.sse_first_event_timeout)
+                finally:
+                    await redis_client.close()
+            else:
+                await run_requests(client, requests[name], min(args.warmup, args.requests), args.concurrency)
+                results[name] = await run_requests(client, requests[name], args.requests, args.concurrency)
+            print(f"{base_url} {name}: p95 {results[name]['latency_ms']['p95']} ms", file=sys.stderr)
+        return results
+
+
+async def main(args):
+    rng = random.Random(args.seed)
+    async with AsyncSessionLocal() as db:
+        company = await ensure_tenant(db)
+        entity_ids = await seed_entities(db, company.id, args.entities)
+        root_ids = await seed_executions(db, company.id, entity_ids, args.executions, args.children, args.logs_per_run, rng)
+        volumes = await table_counts(db, company.id)
+    await engine.dispose()
+
+    targets = {"direct": args.base_url}
+    if args.gateway_url:
+        targets["gateway"] = args.gateway_url
+
+    results = {name: await bench_target(url, args, root_ids, rng) for name, url in targets.items()}
+
+    report = {
+        "benchmark": "api",
+        "revision": git_revision(),
+        "timestamp": datetime.utcnow().isoformat(),
+        "params": {
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "sse_streams": args.sse_streams,
+            "entities": args.entities,
+            "executions": args.executions,
+            "children": args.children,
+            "logs_per_run": args.logs_per_run
+        },
+        "volumes": volumes,
+        "results": results
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--gateway-url", default=None, help="Also run every scenario through the gateway")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests before each scenario")
+    parser.add_argument("--sse-streams", type=int, default=50, help="Streams held open at once")
+    parser.add_argument("--sse-first-event-timeout", type=float, default=2.0)
+    parser.add_argument("--entities", type=int, default=100)
+    parser.add_argument("--executions", type=int, default=1000, help="Seeded root runs")
+    parser.add_argument("--children", type=int, default=2, help="Child runs per root run")
+    parser.add_argument("--logs-per-run", type=int, default=4, help="LLM/tool log rows per run")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default=None, help="Also write the JSON report to this file")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,326 @@
+"""
+Execution engine throughput benchmark.
+
+Seeds an entity shape, drives root runs through arq with a bounded number in
+flight, and reports throughput, run/step latency percentiles, DB
+transactions per run and Redis commands per run as JSON.
+
+Start the mock LLM and a worker pointed at it first (from backend/):
+    uvicorn src.mock_llm.main:app --port 8090
+    OPENAI_BASE_URL=http://localhost:8090/v1 arq src.ai.worker.WorkerSettings
+
+Usage:
+    python -m benchmarks.engine_bench --shape wide_process --runs 200 --concurrency 20 \\
+        --mock-url http://localhost:8090 --output engine.json
+
+Shapes:
+    wide_process  PROCESS with --width LLM steps
+    deep          chain of --depth nested entities, one LLM step at the leaf
+    tool_heavy    AGENT with --width calculator tool calls and a final LLM step
+
+DB transactions come from pg_stat_database and Redis commands from INFO
+commandstats, so they include any other traffic on the same database and
+Redis; run against an otherwise idle stack.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from decimal import Decimal
+from uuid import uuid4
+
+sys.path.append(os.getcwd())
+
+import httpx
+import redis.asyncio as redis
+from arq import create_pool
+from arq.connections import RedisSettings
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from src.common.config import settings
+from src.common.security import encrypt_api_key
+from src.auth.models import Company
+from src.config.models import IntegrationRegistry
+from src.ai.models import ExecutionRun, HierarchicalEntity, RunStatus
+from benchmarks.stats import git_revision, summarize
+
+MOCK_SKU = "mock-gpt"
+BENCH_COMPANY = "Engine Benchmark"
+FINISHED = (RunStatus.COMPLETED.value, RunStatus.FAILED.value)
+
+engine = create_async_engine(settings.DATABASE_URL)
+AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+# --- Seeding ---
+
+def llm_step(order: int, prompt: str) -> dict:
+    return {
+        "step_id": str(uuid4()),
+        "order": order,
+        "name": f"think_{order}",
+        "type": "THOUGHT",
+        "target": {"prompt_template": prompt}
+    }
+
+
+def entity(company_id, name: str, entity_type: str, steps: list) -> HierarchicalEntity:
+    return HierarchicalEntity(
+        company_id=company_id,
+        name=name,
+        type=entity_type,
+        tags=["benchmark"],
+        identity={"persona": {"system_prompt": "You are a benchmark agent."}},
+        logic_gate={
+            "reasoning_config": {
+                "model_provider": "openai",
+                "model_name": MOCK_SKU,
+                "max_tokens": 64,
+                "reasoning_mode": "CHAIN_OF_THOUGHT"
+            }
+        },
+        planning={"static_plan": {"enabled": True, "steps": steps}}
+    )
+
+
+async def ensure_company(db) -> Company:
+    result = await db.execute(select(Company).where(Company.name == BENCH_COMPANY))
+    company = result.scalars().first()
+    if not company:
+        company = Company(name=BENCH_COMPANY, type="TENANT", status="active")
+        db.add(company)
+        await db.flush()
+
+    result = await db.execute(
+        select(IntegrationRegistry).where(
+            IntegrationRegistry.company_id == company.id,
+            IntegrationRegistry.service_sku == MOCK_SKU
+        )
+    )
+    if not result.scalar_one_or_none():
+        db.add(IntegrationRegistry(
+            company_id=company.id,
+            provider_name="Mock",
+            model_name=MOCK_SKU,
+            service_sku=MOCK_SKU,
+            component_type="token",
+            encrypted_api_key=encrypt_api_key("mock-key"),
+            internal_cost=Decimal("0.000001"),
+            cost_unit="1 Token"
+        ))
+    await db.commit()
+    return company
+
+
+async def seed_shape(db, company_id, shape: str, width: int, depth: int) -> HierarchicalEntity:
+    tag = uuid4().hex[:6]
+    if shape == "wide_process":
+        root = entity(company_id, f"bench-wide-{tag}", "PROCESS", [
+            llm_step(i, f"Step {i}: summarize {{{{topic}}}}.") for i in range(width)
+        ])
+    elif shape == "deep":
+        child = entity(company_id, f"bench-deep-{tag}-{depth}", "ACTION", [
+            llm_step(0, "Answer about {{topic}}.")
+        ])
+        db.add(child)
+        await db.flush()
+        for level in range(depth - 1, 0, -1):
+            parent = entity(company_id, f"bench-deep-{tag}-{level}", "SKILL" if level > 1 else "AGENT", [{
+                "step_id": str(uuid4()),
+                "order": 0,
+                "name": f"delegate_{level}",
+                "type": "CHILD_ENTITY_INVOCATION",
+                "target": {"entity_id": str(child.id)}
+            }])
+            db.add(parent)
+            await db.flush()
+            child = parent
+        root = child
+    elif shape == "tool_heavy":
+        steps = [
+            {
+                "step_id": str(uuid4()),
+                "order": i,
+                "name": f"tool_{i}",
+                "type": "TOOL_CALL",
+                "target": {"tool_id": "calculator"}
+            }
+            for i in range(width)
+        ]
+        steps.append(llm_step(width, "Combine the results for {{topic}}."))
+        root = entity(company_id, f"bench-tools-{tag}", "AGENT", steps)
+    else:
+        raise ValueError(f"Unknown shape: {shape}")
+
+    db.add(root)
+    await db.commit()
+    return root
+
+
+# --- Counters ---
+
+async def db_transactions(db) -> int:
+    result = await db.execute(text(
+        "SELECT xact_commit + xact_rollback FROM pg_stat_database WHERE datname = current_database()"
+    ))
+    value = result.scalar()
+    await db.commit()
+    return value
+
+
+async def redis_commands(client) -> int:
+    stats = await client.info("commandstats")
+    return sum(entry["calls"] for entry in stats.values())
+
+
+# --- Driver ---
+
+async def drive(db, entity_id, company_id, runs: int, concurrency: int, poll_interval: float):
+    """Keep up to `concurrency` root runs in flight until `runs` have finished.
+
+    Returns (root run ids, harness transaction count).
+    """
+    arq_pool = await create_pool(RedisSettings())
+    harness_xacts = 0
+    submitted, in_flight, done = 0, set(), []
+    try:
+        while len(done) < runs:
+            while submitted < runs and len(in_flight) < concurrency:
+                run = ExecutionRun(
+                    company_id=company_id,
+                    entity_id=entity_id,
+                    input_data={"topic": "benchmarks", "input": "2+2"},
+                    status="PENDING",
+                    trace_id=uuid4()
+                )
+                db.add(run)
+                await db.commit()
+                harness_xacts += 1
+                await arq_pool.enqueue_job("run_execution_recursive", str(run.id))
+                in_flight.add(run.id)
+                submitted += 1
+
+            await asyncio.sleep(poll_interval)
+            result = await db.execute(
+                select(ExecutionRun.id).where(ExecutionRun.id.in_(in_flight), ExecutionRun.status.in_(FINISHED))
+            )
+            finished = set(result.scalars().all())
+            await db.commit()
+            harness_xacts += 1
+            in_flight -= finished
+            done.extend(finished)
+    finally:
+        await arq_pool.close()
+    return done, harness_xacts
+
+
+async def collect(db, root_ids):
+    result = await db.execute(select(ExecutionRun).where(ExecutionRun.id.in_(root_ids)))
+    roots = result.scalars().all()
+    trace_ids = [r.trace_id for r in roots]
+    result = await db.execute(select(ExecutionRun).where(ExecutionRun.trace_id.in_(trace_ids)))
+    all_runs = result.scalars().all()
+    await db.commit()
+
+    completed = [r for r in roots if r.status == RunStatus.COMPLETED.value]
+    step_latencies = [
+        step["latency_ms"]
+        for r in all_runs if r.result_data
+        for step in r.result_data.get("steps", [])
+        if isinstance(step, dict) and "latency_ms" in step
+    ]
+    first_created = min(r.created_at for r in roots)
+    last_completed = max(r.completed_at for r in roots if r.completed_at)
+    wall_seconds = max((last_completed - first_created).total_seconds(), 1e-6)
+
+    return {
+        "runs_completed": len(completed),
+        "runs_failed": len(roots) - len(completed),
+        "child_runs": len(all_runs) - len(roots),
+        "wall_seconds": round(wall_seconds, 3),
+        "runs_per_sec": round(len(completed) / wall_seconds, 3),
+        "run_latency_ms": summarize([r.execution_time_ms for r in completed if r.execution_time_ms is not None]),
+        "end_to_end_latency_ms": summarize([
+            (r.completed_at - r.created_at).total_seconds() * 1000 for r in completed if r.completed_at
+        ]),
+        "step_latency_ms": summarize(step_latencies),
+        "errors": sorted({r.error_message for r in roots if r.error_message})[:5],
+    }
+
+
+async def main(args):
+    mock_stats = None
+    async with httpx.AsyncClient(base_url=args.mock_url or "http://localhost", timeout=10) as mock:
+        if args.mock_url:
+            await mock.post("/_mock/reset")
+            if args.mock_latency_ms is not None:
+                await mock.patch("/_mock/config", json={"LATENCY_MS": args.mock_latency_ms})
+
+        redis_client = redis.from_url(settings.REDIS_URL or "redis://localhost:6379")
+        async with AsyncSessionLocal() as db:
+            company = await ensure_company(db)
+            root = await seed_shape(db, company.id, args.shape, args.width, args.depth)
+
+            xacts_before = await db_transactions(db)
+            redis_before = await redis_commands(redis_client)
+            started = time.perf_counter()
+
+            root_ids, harness_xacts = await drive(db, root.id, company.id, args.runs, args.concurrency, args.poll_interval)
+
+            elapsed = time.perf_counter() - started
+            # Backends flush transaction counters to pg_stat_database lazily
+            await asyncio.sleep(args.stats_settle_seconds)
+            xacts_after = await db_transactions(db)
+            redis_after = await redis_commands(redis_client)
+            results = await collect(db, root_ids)
+        await redis_client.close()
+
+        if args.mock_url:
+            mock_stats = (await mock.get("/_mock/stats")).json()
+
+    # Exclude the harness's own inserts, polls and first counter query
+    worker_xacts = xacts_after - xacts_before - harness_xacts - 1
+    results["db_transactions_per_run"] = round(worker_xacts / args.runs, 2)
+    results["redis_commands_per_run"] = round((redis_after - redis_before - 1) / args.runs, 2)
+    results["harness_seconds"] = round(elapsed, 3)
+
+    report = {
+        "benchmark": "engine",
+        "revision": git_revision(),
+        "timestamp": datetime.utcnow().isoformat(),
+        "params": {
+            "shape": args.shape,
+            "runs": args.runs,
+            "concurrency": args.concurrency,
+            "width": args.width,
+            "depth": args.depth,
+            "mock_latency_ms": args.mock_latency_ms
+        },
+        "results": results,
+        "mock_llm": mock_stats
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shape", choices=["wide_process", "deep", "tool_heavy"], default="wide_process")
+    parser.add_argument("--runs", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--width", type=int, default=5, help="LLM steps (wide_process) or tool calls (tool_heavy)")
+    parser.add_argument("--depth", type=int, default=4, help="Nesting depth for the deep shape")
+    parser.add_argument("--mock-url", default=None, help="Mock LLM server to reset and read stats from")
+    parser.add_argument("--mock-latency-ms", type=float, default=None)
+    parser.add_argument("--poll-interval", type=float, default=0.05)
+    parser.add_argument("--stats-settle-seconds", type=float, default=11.0)
+    parser.add_argument("--output", default=None, help="Also write the JSON report to this file")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,363 @@
+"""
+RAG ingest and search benchmark.
+
+Builds a synthetic corpus with the local deterministic embedding provider (no
+network or keys), then measures:
+
+  ingest  process_document throughput (chunks/sec) and peak RSS, for the API
+          process and the parser child processes
+  search  search_documents latency and recall@k against exact search, per
+          VECTOR_SEARCH_MODE (exact scan, halfvec HNSW, binary HNSW), filter
+          (whole company, single entity) and top_k
+
+Usage (from backend/, with migrations applied):
+    python -m benchmarks.rag_bench --ingest-docs 20 --fill-chunks 100000 \\
+        --queries 100 --top-k 5 10 50 --output rag.json
+
+--ingest-docs documents go through the real ingest pipeline; --fill-chunks
+more are bulk-inserted directly so search can be measured at 10k-1M chunks
+without waiting for parsing.
+"""
+import os
+
+# Must be set before settings are imported
+os.environ.setdefault("EMBEDDING_PROVIDER", "local")
+
+import argparse
+import asyncio
+import json
+import random
+import resource
+import sys
+import time
+from datetime import datetime
+from uuid import uuid4
+
+sys.path.append(os.getcwd())
+
+from sqlalchemy import func, insert, select, text
+from src.common.config import settings
+from src.common.database import AsyncSessionLocal, engine
+from src.common.blob_store import get_blob_store
+from src.auth.models import Company
+from src.ai.models import Document, DocumentChunk, HierarchicalEntity
+from src.ai.embedding_providers import LocalEmbeddingProvider
+from src.ai.embedding_store import content_hash
+from src.ai.service import AIService
+from src.ai.vector_search import VECTOR_SEARCH_MODES
+from src.ai.worker import process_document
+import src.config.models  # noqa: F401 - registers IntegrationRegistry for relationship mapping
+from benchmarks.stats import git_revision, summarize
+
+# SQL echo logging would dominate the timings
+engine.sync_engine.echo = False
+
+BENCH_COMPANY = "RAG Benchmark"
+INDEX_NAMES = {
+    "halfvec": "ix_document_chunks_embedding_halfvec",
+    "binary": "ix_document_chunks_embedding_binary",
+}
+
+
+# --- Synthetic corpus ---
+
+class CorpusGenerator:
+    """
+    Seeded generator of topic-clustered text.
+
+    Each topic has its own pseudo-word vocabulary mixed with shared filler
+    words, so chunks of one topic embed near each other, as in a real corpus.
+    """
+
+    COMMON = (
+        "the a of and to in for with on policy process team report customer "
+        "data review update plan should must will can each every"
+    ).split()
+
+    def __init__(self, seed: int, topics: int = 50, words_per_topic: int = 40):
+        self.rng = random.Random(seed)
+        self.topics = [
+            [self._pseudo_word() for _ in range(words_per_topic)] for _ in range(topics)
+        ]
+
+    def _pseudo_word(self) -> str:
+        consonants, vowels = "bcdfghklmnprstvz", "aeiou"
+        return "".join(
+            self.rng.choice(consonants) + self.rng.choice(vowels) for _ in range(self.rng.randint(2, 4))
+        )
+
+    def sentence(self, topic: int) -> str:
+        words = [
+            self.rng.choice(self.topics[topic]) if self.rng.random() < 0.6 else self.rng.choice(self.COMMON)
+            for _ in range(self.rng.randint(8, 16))
+        ]
+        return " ".join(words).capitalize() + "."
+
+    def paragraph(self, topic: int, sentences: int = 6) -> str:
+        return " ".join(self.sentence(topic) for _ in range(sentences))
+
+    def document(self, topic: int, paragraphs: int) -> str:
+        return "\n\n".join(self.paragraph(topic) for _ in range(paragraphs))
+
+
+# --- Setup ---
+
+async def ensure_fixtures(db, entity_count: int):
+    result = await db.execute(select(Company).where(Company.name == BENCH_COMPANY))
+    company = result.scalars().first()
+    if not company:
+        company = Company(name=BENCH_COMPANY, type="TENANT", status="active")
+        db.add(company)
+        await db.flush()
+
+    result = await db.execute(
+        select(HierarchicalEntity.id)
+        .where(HierarchicalEntity.company_id == company.id)
+        .order_by(HierarchicalEntity.created_at)
+    )
+    entity_ids = list(result.scalars().all())
+    for i in range(len(entity_ids), entity_count):
+        entity = HierarchicalEntity(company_id=company.id, name=f"rag-bench-{i}", type="AGENT", tags=["benchmark"])
+        db.add(entity)
+        await db.flush()
+        entity_ids.append(entity.id)
+    await db.commit()
+    return company, entity_ids[:entity_count]
+
+
+def peak_rss_mb(who: int) -> float:
+    # ru_maxrss is KiB on Linux
+    return round(resource.getrusage(who).ru_maxrss / 1024, 1)
+
+
+async def bytes_stream(data: bytes, chunk_size: int = 1024 * 1024):
+    for i in range(0, len(data), chunk_size):
+        yield data[i:i + chunk_size]
+
+
+# --- Ingest ---
+
+async def run_ingest(company, entity_ids, generator: CorpusGenerator, docs: int, paragraphs: int) -> dict:
+    blob_store = get_blob_store()
+    elapsed = 0.0
+    document_ids = []
+    for i in range(docs):
+        body = generator.document(i % len(generator.topics), paragraphs).encode("utf-8")
+        blob_key, size = await blob_store.write_stream(bytes_stream(body))
+        async with AsyncSessionLocal() as db:
+            document = Document(
+                company_id=company.id,
+                entity_id=entity_ids[i % len(entity_ids)],
+                filename=f"bench-ingest-{i}.txt",
+                file_type="txt",
+                file_size=str(size),
+                upload_status="processing"
+            )
+            db.add(document)
+            await db.commit()
+            document_ids.append(document.id)
+
+        started = time.perf_counter()
+        await process_document({}, str(document.id), blob_key, "txt", document.filename)
+        elapsed += time.perf_counter() - started
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(Document.upload_status, Document.upload_error).where(Document.id.in_(document_ids))
+        )
+        statuses = result.all()
+        result = await db.execute(
+            select(func.count(DocumentChunk.id)).where(DocumentChunk.document_id.in_(document_ids))
+        )
+        chunks = result.scalar()
+
+    return {
+        "documents": docs,
+        "failed": sum(1 for status, _ in statuses if status != "completed"),
+        "errors": sorted({error for _, error in statuses if error})[:5],
+        "chunks": chunks,
+        "seconds": round(elapsed, 3),
+        "chunks_per_sec": round(chunks / elapsed, 2) if elapsed else 0.0,
+        "peak_rss_mb": peak_rss_mb(resource.RUSAGE_SELF),
+        "peak_child_rss_mb": peak_rss_mb(resource.RUSAGE_CHILDREN),
+    }
+
+
+async def fill_chunks(company, entity_ids, generator: CorpusGenerator, total: int, per_document: int = 1000) -> dict:
+    """Bulk-insert pre-chunked synthetic documents, bypassing parsing."""
+    provider = LocalEmbeddingProvider()
+    started = time.perf_counter()
+    inserted = 0
+    doc_index = 0
+    while inserted < total:
+        count = min(per_document, total - inserted)
+        topic = doc_index % len(generator.topics)
+        async with AsyncSessionLocal() as db:
+            document = Document(
+                company_id=company.id,
+                entity_id=entity_ids[doc_index % len(entity_ids)],
+                filename=f"bench-fill-{doc_index}.txt",
+                file_type="txt",
+                upload_status="completed"
+            )
+            db.add(document)
+            await db.flush()
+            rows = []
+            for i in range(count):
+                content = generator.paragraph(topic)
+                rows.append({
+                    "id": uuid4(),
+                    "document_id": document.id,
+                    "chunk_index": str(i),
+                    "content": content,
+                    "embedding": provider.embed_one(content),
+                    "content_hash": content_hash(content),
+                    "embedding_model": provider.model,
+                })
+            await db.execute(insert(DocumentChunk), rows)
+            await db.commit()
+        inserted += count
+        doc_index += 1
+
+    elapsed = time.perf_counter() - started
+    return {"chunks": inserted, "seconds": round(elapsed, 3), "chunks_per_sec": round(inserted / elapsed, 2)}
+
+
+# --- Search ---
+
+async def sample_queries(company, count: int, seed: int):
+    """Use word spans of stored chunks as queries, so every query has relevant hits."""
+    async with AsyncSessionLocal() as db:
+        await db.execute(text("SELECT setseed(:seed)"), {"seed": (seed % 1000) / 1000})
+        result = await db.execute(
+            text("""
+                SELECT dc.content FROM document_chunks dc
+                JOIN documents d ON dc.document_id = d.id
+                WHERE d.company_id = :company_id
+                ORDER BY random()
+                LIMIT :count
+            """),
+            {"company_id": str(company.id), "count": count}
+        )
+        contents = [row[0] for row in result.all()]
+    rng = random.Random(seed)
+    queries = []
+    for content in contents:
+        words = content.split()
+        start = rng.randint(0, max(0, len(words) - 8))
+        queries.append(" ".join(words[start:start + 8]))
+    return queries
+
+
+async def timed_search(mode: str, query: str, company_id, entity_id, top_k: int):
+    settings.VECTOR_SEARCH_MODE = mode
+    async with AsyncSessionLocal() as db:
+        started = time.perf_counter()
+        rows = await AIService(db).search_documents(query, company_id, entity_id=entity_id, top_k=top_k)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        await db.commit()
+    return [row.chunk_id for row in rows], elapsed_ms
+
+
+async def run_search(company, entity_ids, queries, top_ks) -> list:
+    results = []
+    filters = {"company": None, "entity": entity_ids[0]}
+    for filter_name, entity_id in filters.items():
+        for top_k in top_ks:
+            exact = []
+            for query in queries:
+                ids, _ = await timed_search("full", query, company.id, entity_id, top_k)
+                exact.append(set(ids))
+
+            for mode in VECTOR_SEARCH_MODES:
+                latencies, recalls = [], []
+                for query, truth in zip(queries, exact):
+                    ids, elapsed_ms = await timed_search(mode, query, company.id, entity_id, top_k)
+                    latencies.append(elapsed_ms)
+                    if truth:
+                        recalls.append(len(truth & set(ids)) / len(truth))
+                results.append({
+                    "mode": mode,
+                    "filter": filter_name,
+                    "top_k": top_k,
+                    "latency_ms": summarize(latencies),
+                    "recall_at_k": round(sum(recalls) / len(recalls), 4) if recalls else None,
+                })
+    return results
+
+
+async def corpus_stats(company) -> dict:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            text("""
+                SELECT count(*) FROM document_chunks dc
+                JOIN documents d ON dc.document_id = d.id
+                WHERE d.company_id = :company_id
+            """),
+            {"company_id": str(company.id)}
+        )
+        company_chunks = result.scalar()
+        result = await db.execute(text("SELECT count(*), pg_total_relation_size('document_chunks') FROM document_chunks"))
+        total_chunks, table_bytes = result.one()
+        index_bytes = {}
+        for mode, name in INDEX_NAMES.items():
+            result = await db.execute(text("SELECT pg_relation_size(to_regclass(:name))"), {"name": name})
+            index_bytes[mode] = result.scalar()
+    return {
+        "company_chunks": company_chunks,
+        "table_chunks": total_chunks,
+        "table_bytes": table_bytes,
+        "index_bytes": index_bytes,
+    }
+
+
+async def main(args):
+    generator = CorpusGenerator(args.seed)
+    async with AsyncSessionLocal() as db:
+        company, entity_ids = await ensure_fixtures(db, args.entities)
+
+    report = {
+        "benchmark": "rag",
+        "revision": git_revision(),
+        "timestamp": datetime.utcnow().isoformat(),
+        "params": {
+            "ingest_docs": args.ingest_docs,
+            "paragraphs_per_doc": args.paragraphs,
+            "fill_chunks": args.fill_chunks,
+            "entities": args.entities,
+            "queries": args.queries,
+            "top_k": args.top_k,
+            "seed": args.seed,
+            "chunk_tokens": settings.DOCUMENT_CHUNK_TOKENS,
+            "candidate_multiplier": settings.VECTOR_CANDIDATE_MULTIPLIER,
+            "local_embedding_latency_ms": settings.LOCAL_EMBEDDING_LATENCY_MS,
+        },
+    }
+    if args.ingest_docs:
+        report["ingest"] = await run_ingest(company, entity_ids, generator, args.ingest_docs, args.paragraphs)
+    if args.fill_chunks:
+        report["fill"] = await fill_chunks(company, entity_ids, generator, args.fill_chunks)
+    report["corpus"] = await corpus_stats(company)
+
+    if args.queries:
+        queries = await sample_queries(company, args.queries, args.seed)
+        report["search"] = await run_search(company, entity_ids, queries, args.top_k)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ingest-docs", type=int, default=10, help="Documents sent through process_document")
+    parser.add_argument("--paragraphs", type=int, default=200, help="Paragraphs per ingested document")
+    parser.add_argument("--fill-chunks", type=int, default=10000, help="Chunks bulk-inserted for search scale")
+    parser.add_argument("--entities", type=int, default=10, help="Entities documents are spread across")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, nargs="+", default=[5, 10, 50])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="Also write the JSON report to this file")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,140 @@
+"""
+Prompt template rendering micro-benchmark.
+
+Renders the same prompts against synthetic run contexts with the regex
+``parse_variables`` the worker used before templates were compiled
+(kept here verbatim as the baseline) and with ``compile_template``, and
+reports per-render latency percentiles in microseconds plus the speedup.
+
+Each case is a prompt with --placeholders ``{{step_N.field}}`` tags spread
+through --prompt-chars of text, rendered against a context of --context-steps
+step outputs of --output-chars each. No database, Redis or network needed.
+
+Usage (from backend/):
+    python -m benchmarks.template_bench --placeholders 5 50 --context-steps 10 200 \\
+        --output-chars 20000 --renders 500 --output templates.json
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+from datetime import datetime
+
+sys.path.append(os.getcwd())
+
+from src.ai.templating import compile_template
+from benchmarks.stats import git_revision, summarize
+
+WORDS = "the agent reads each step output and writes a short grounded answer".split()
+
+
+def legacy_parse_variables(text: str, variables: dict) -> str:
+    """Replaces {{variable}} in text with values from variables dict."""
+    if not text:
+        return ""
+    def replace(match):
+        key = match.group(1).strip()
+        val = variables
+        for k in key.split('.'):
+            if isinstance(val, dict):
+                val = val.get(k, match.group(0))
+            else:
+                return match.group(0)
+        return str(val)
+    return re.sub(r'\{\{(.*?)\}\}', replace, text)
+
+
+def filler(rng: random.Random, chars: int) -> str:
+    words, size = [], 0
+    while size < chars:
+        word = rng.choice(WORDS)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)[:chars]
+
+
+def make_context(rng: random.Random, steps: int, output_chars: int) -> dict:
+    context = {"input": filler(rng, 200)}
+    for i in range(steps):
+        context[f"step_{i}"] = {"text": filler(rng, output_chars), "score": rng.random(), "tags": ["a", "b"]}
+    return context
+
+
+def make_prompt(rng: random.Random, placeholders: int, prompt_chars: int, steps: int) -> str:
+    gap = max(1, prompt_chars // (placeholders + 1))
+    parts = [filler(rng, gap)]
+    for _ in range(placeholders):
+        parts.append(f"{{{{ step_{rng.randrange(steps)}.text }}}}")
+        parts.append(filler(rng, gap))
+    return " ".join(parts)
+
+
+def time_renders(render, prompt: str, context: dict, renders: int) -> list:
+    samples = []
+    for _ in range(renders):
+        start = time.perf_counter()
+        render(prompt, context)
+        samples.append((time.perf_counter() - start) * 1_000_000)
+    return samples
+
+
+def compiled_render(prompt: str, context: dict) -> str:
+    # The worker compiles once per plan; the lru lookup is the per-run cost
+    return compile_template(prompt).render(context)
+
+
+def run_case(rng: random.Random, placeholders: int, steps: int, args) -> dict:
+    context = make_context(rng, steps, args.output_chars)
+    prompt = make_prompt(rng, placeholders, args.prompt_chars, steps)
+    expected = legacy_parse_variables(prompt, context)
+    if compiled_render(prompt, context) != expected:
+        raise SystemExit(f"Output mismatch for placeholders={placeholders} steps={steps}")
+
+    legacy = summarize(time_renders(legacy_parse_variables, prompt, context, args.renders))
+    compiled = summarize(time_renders(compiled_render, prompt, context, args.renders))
+    return {
+        "placeholders": placeholders,
+        "context_steps": steps,
+        "rendered_chars": len(expected),
+        "legacy_us": legacy,
+        "compiled_us": compiled,
+        "speedup_p50": round(legacy["p50"] / compiled["p50"], 2) if compiled["p50"] else None,
+    }
+
+
+def main(args):
+    rng = random.Random(args.seed)
+    report = {
+        "benchmark": "template",
+        "revision": git_revision(),
+        "timestamp": datetime.utcnow().isoformat(),
+        "prompt_chars": args.prompt_chars,
+        "output_chars": args.output_chars,
+        "renders": args.renders,
+        "cases": [
+            run_case(rng, placeholders, steps, args)
+            for placeholders in args.placeholders
+            for steps in args.context_steps
+        ],
+    }
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--placeholders", type=int, nargs="+", default=[5, 50])
+    parser.add_argument("--context-steps", type=int, nargs="+", default=[10, 200])
+    parser.add_argument("--prompt-chars", type=int, default=4000)
+    parser.add_argument("--output-chars", type=int, default=20000)
+    parser.add_argument("--renders", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output")
+    main(parser.parse_args())
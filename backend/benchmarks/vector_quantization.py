@@ -0,0 +1,124 @@
+"""
+Recall/latency report for the vector search modes.
+
+Samples stored chunk embeddings as queries, runs each VECTOR_SEARCH_MODE
+against the live database and compares the top-k with exact search.
+
+Usage (from backend/):
+    python -m benchmarks.vector_quantization --company-id <uuid> [--queries 200] [--top-k 10]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.getcwd())
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from src.common.config import settings
+from src.ai.embedding_providers import get_embedding_model
+from src.ai.vector_search import VECTOR_SEARCH_MODES, build_search_sql, candidate_count, ef_search_sql
+from benchmarks.stats import percentile
+
+engine = create_async_engine(settings.DATABASE_URL)
+AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+INDEX_NAMES = {
+    "halfvec": "ix_document_chunks_embedding_halfvec",
+    "binary": "ix_document_chunks_embedding_binary",
+}
+
+
+async def sample_queries(db, company_id, count):
+    result = await db.execute(
+        text("""
+            SELECT dc.embedding::text
+            FROM document_chunks dc
+            JOIN documents d ON dc.document_id = d.id
+            WHERE d.company_id = :company_id
+            AND dc.embedding_model = :embedding_model
+            AND dc.embedding IS NOT NULL
+            ORDER BY random()
+            LIMIT :count
+        """),
+        {"company_id": company_id, "embedding_model": get_embedding_model(), "count": count}
+    )
+    return [row[0] for row in result.fetchall()]
+
+
+async def run_search(db, mode, embedding, company_id, top_k, multiplier):
+    params = {
+        "query_embedding": embedding,
+        "company_id": company_id,
+        "entity_id": None,
+        "embedding_model": get_embedding_model(),
+        "top_k": top_k
+    }
+    async with db.begin():
+        if mode != "full":
+            params["candidates"] = candidate_count(top_k, multiplier)
+            await db.execute(ef_search_sql(params["candidates"]))
+        start = time.perf_counter()
+        result = await db.execute(build_search_sql(mode), params)
+        rows = result.fetchall()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+    return [row.chunk_id for row in rows], elapsed_ms
+
+
+async def index_size(db, name):
+    result = await db.execute(text("SELECT pg_relation_size(to_regclass(:name))"), {"name": name})
+    return result.scalar()
+
+
+async def main(args):
+    report = {"top_k": args.top_k, "candidate_multiplier": args.multiplier, "modes": {}}
+    async with AsyncSessionLocal() as db:
+        queries = await sample_queries(db, args.company_id, args.queries)
+        await db.commit()
+        if not queries:
+            print("No embedded chunks found for this company.")
+            return
+
+        report["queries"] = len(queries)
+        result = await db.execute(text("SELECT pg_total_relation_size('document_chunks')"))
+        report["table_bytes"] = result.scalar()
+        await db.commit()
+
+        exact = []
+        for mode in VECTOR_SEARCH_MODES:
+            latencies, recalls = [], []
+            for i, embedding in enumerate(queries):
+                ids, elapsed_ms = await run_search(db, mode, embedding, args.company_id, args.top_k, args.multiplier)
+                latencies.append(elapsed_ms)
+                if mode == "full":
+                    exact.append(set(ids))
+                elif exact[i]:
+                    recalls.append(len(exact[i] & set(ids)) / len(exact[i]))
+
+            stats = {
+                "latency_ms_p50": round(percentile(latencies, 50), 2),
+                "latency_ms_p95": round(percentile(latencies, 95), 2),
+                "latency_ms_mean": round(statistics.mean(latencies), 2),
+                "recall_at_k": round(statistics.mean(recalls), 4) if recalls else 1.0,
+            }
+            if mode in INDEX_NAMES:
+                stats["index_bytes"] = await index_size(db, INDEX_NAMES[mode])
+                await db.commit()
+            report["modes"][mode] = stats
+
+    print(json.dumps(report, indent=2))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--company-id", required=True)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--multiplier", type=int, default=settings.VECTOR_CANDIDATE_MULTIPLIER)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,48 @@
+"""Add content_hash and embedding_model to document_chunks
+
+Revision ID: 6a6ef779a9f0
+Revises: 9bc12d4c6cc6
+Create Date: 2026-10-19 09:12:44.218305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6a6ef779a9f0'
+down_revision: Union[str, Sequence[str], None] = '9bc12d4c6cc6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('document_chunks', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.add_column('document_chunks', sa.Column('embedding_model', sa.String(), nullable=True))
+    op.create_index(op.f('ix_document_chunks_content_hash'), 'document_chunks', ['content_hash'], unique=False)
+
+    # Existing rows were all embedded with Gemini text-embedding-004. The SQL
+    # normalization mirrors normalize_chunk(); any edge-case mismatch only
+    # costs a missed reuse, never a wrong one.
+    op.execute(r"""
+        UPDATE document_chunks
+        SET embedding_model = 'text-embedding-004',
+            content_hash = encode(
+                sha256(convert_to(
+                    btrim(regexp_replace(normalize(content, NFKC), '\s+', ' ', 'g')),
+                    'UTF8'
+                )),
+                'hex'
+            )
+        WHERE embedding IS NOT NULL
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_document_chunks_content_hash'), table_name='document_chunks')
+    op.drop_column('document_chunks', 'embedding_model')
+    op.drop_column('document_chunks', 'content_hash')
@@ -0,0 +1,64 @@
+"""Add foreign-key and query-path indexes for the AI tables
+
+Revision ID: a3e9f5b7c104
+Revises: f1a4d7c2e836
+Create Date: 2026-10-19 16:20:45.917302
+
+Each index backs a specific query (see tests/test_query_plans.py):
+
+    execution_runs (parent_run_id)             trace loader recursive CTE
+    execution_runs (entity_id, status, ...)    entity library run stats
+    llm/tool logs (run_id, created_at)         trace loader bulk log loads
+    human_approvals (run_id, requested_at)     trace loader approvals
+    human_approvals (status, run_id)           pending approvals queue
+    hierarchical_entities (company_id, type)   entity list by type
+    hierarchical_entities (company_id, created_at, id)  entity library pages
+    documents (company_id, entity_id)          document list
+    integration_registry (company_id, service_sku)      API key / SKU lookup per LLM call
+    usage_logs (company_id, timestamp)         usage per billing period
+    usage_logs (run_id)                        usage per run
+
+The root execution history is covered by e7b3c1f05a92 and
+document_chunks (document_id) by d8e1f3a6b072.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3e9f5b7c104'
+down_revision: Union[str, Sequence[str], None] = 'f1a4d7c2e836'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    'ix_execution_runs_parent_run_id': 'execution_runs (parent_run_id) WHERE parent_run_id IS NOT NULL',
+    'ix_execution_runs_entity_id_status': 'execution_runs (entity_id, status, created_at)',
+    'ix_llm_interaction_logs_run_id': 'llm_interaction_logs (run_id, created_at)',
+    'ix_tool_interaction_logs_run_id': 'tool_interaction_logs (run_id, created_at)',
+    'ix_human_approvals_run_id': 'human_approvals (run_id, requested_at)',
+    'ix_human_approvals_status_run_id': 'human_approvals (status, run_id)',
+    'ix_hierarchical_entities_company_id_type': 'hierarchical_entities (company_id, type)',
+    'ix_hierarchical_entities_library': 'hierarchical_entities (company_id, created_at DESC, id DESC)',
+    'ix_documents_company_id_entity_id': 'documents (company_id, entity_id)',
+    'ix_integration_registry_company_id_service_sku': 'integration_registry (company_id, service_sku)',
+    'ix_usage_logs_company_id_timestamp': 'usage_logs (company_id, timestamp)',
+    'ix_usage_logs_run_id': 'usage_logs (run_id) WHERE run_id IS NOT NULL',
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY keeps the tables writable while the indexes build
+    with op.get_context().autocommit_block():
+        for name, definition in INDEXES.items():
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name in reversed(list(INDEXES)):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,28 @@
+"""Add upload_error to documents
+
+Revision ID: b41c7e2d9a53
+Revises: 6a6ef779a9f0
+Create Date: 2026-10-19 11:03:27.561902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b41c7e2d9a53'
+down_revision: Union[str, Sequence[str], None] = '6a6ef779a9f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('documents', sa.Column('upload_error', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('documents', 'upload_error')
@@ -0,0 +1,113 @@
+"""Partition the log tables by month
+
+Revision ID: b6d2e9a4f318
+Revises: a3e9f5b7c104
+Create Date: 2026-10-19 16:58:03.271940
+
+llm_interaction_logs, tool_interaction_logs (on created_at) and usage_logs
+(on timestamp) become range-partitioned parents with one partition per UTC
+month. Each table is rebuilt: the partition key joins the primary key,
+partitions are created from the oldest existing row through a few months
+ahead, the rows are copied over and the query-path indexes from
+a3e9f5b7c104 are recreated on the parent. The worker creates later months
+and archives expired ones (src/ai/partitions.py).
+
+The copy rewrites every log row under an exclusive lock; run it in a
+maintenance window.
+
+"""
+from datetime import date, datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d2e9a4f318'
+down_revision: Union[str, Sequence[str], None] = 'a3e9f5b7c104'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PREMAKE_MONTHS = 3
+
+TABLES = {
+    'llm_interaction_logs': {
+        'key': 'created_at',
+        'foreign_keys': {'run_id': 'execution_runs (id)'},
+        'indexes': {'ix_llm_interaction_logs_run_id': '(run_id, created_at)'},
+    },
+    'tool_interaction_logs': {
+        'key': 'created_at',
+        'foreign_keys': {'run_id': 'execution_runs (id)'},
+        'indexes': {'ix_tool_interaction_logs_run_id': '(run_id, created_at)'},
+    },
+    'usage_logs': {
+        'key': 'timestamp',
+        'foreign_keys': {
+            'company_id': 'companies (id)',
+            'run_id': 'execution_runs (id)',
+            'sku_id': 'integration_registry (id)',
+        },
+        'indexes': {
+            'ix_usage_logs_company_id_timestamp': '(company_id, timestamp)',
+            'ix_usage_logs_run_id': '(run_id) WHERE run_id IS NOT NULL',
+        },
+    },
+}
+
+
+def _add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _rebuild(table: str, spec: dict, partitioned: bool) -> None:
+    """Recreate ``table`` (partitioned or plain) from its current rows."""
+    key = spec['key']
+    old = f'{table}_old'
+    op.execute(f'ALTER TABLE {table} RENAME TO {old}')
+    op.execute(f'ALTER TABLE {old} RENAME CONSTRAINT {table}_pkey TO {old}_pkey')
+    for name in spec['indexes']:
+        op.execute(f'DROP INDEX IF EXISTS {name}')
+
+    if partitioned:
+        op.execute(f"UPDATE {old} SET {key} = now() AT TIME ZONE 'utc' WHERE {key} IS NULL")
+        op.execute(f'CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS) PARTITION BY RANGE ({key})')
+        op.execute(f'ALTER TABLE {table} ADD PRIMARY KEY (id, {key})')
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {key} SET DEFAULT (now() AT TIME ZONE 'utc')")
+
+        oldest = op.get_bind().execute(sa.text(f'SELECT min({key}) FROM {old}')).scalar()
+        current = datetime.utcnow().date().replace(day=1)
+        month = min(oldest.date().replace(day=1), current) if oldest else current
+        while month <= _add_months(current, PREMAKE_MONTHS):
+            op.execute(
+                f"CREATE TABLE {table}_y{month.year:04d}m{month.month:02d} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+            )
+            month = _add_months(month, 1)
+    else:
+        op.execute(f'CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS)')
+        op.execute(f'ALTER TABLE {table} ADD PRIMARY KEY (id)')
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN {key} DROP NOT NULL')
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN {key} DROP DEFAULT')
+
+    for column, target in spec['foreign_keys'].items():
+        op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {table}_{column}_fkey FOREIGN KEY ({column}) REFERENCES {target}')
+    op.execute(f'INSERT INTO {table} SELECT * FROM {old}')
+    # CASCADE drops the old partitions on downgrade
+    op.execute(f'DROP TABLE {old} CASCADE')
+    for name, columns in spec['indexes'].items():
+        op.execute(f'CREATE INDEX {name} ON {table} {columns}')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, spec in TABLES.items():
+        _rebuild(table, spec, partitioned=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, spec in TABLES.items():
+        _rebuild(table, spec, partitioned=False)
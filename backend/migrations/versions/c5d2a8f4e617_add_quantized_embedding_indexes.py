@@ -0,0 +1,71 @@
+"""Add quantized HNSW indexes on document chunk embeddings
+
+Revision ID: c5d2a8f4e617
+Revises: b41c7e2d9a53
+Create Date: 2026-10-19 12:41:08.215733
+
+The indexes are built over expressions on the existing embedding column, so
+every existing and future row is covered without a backfill and the full
+precision vectors stay available for rescoring. The indexes need pgvector
+>= 0.7 (halfvec and binary_quantize). On an older extension the migration
+skips them with a warning rather than upgrading it, which needs a superuser
+and is cluster-wide; search then falls back to exact scans (see
+src/ai/vector_search.py). After ALTER EXTENSION vector UPDATE, create the
+indexes by hand with the statements in upgrade().
+
+"""
+from typing import Sequence, Union
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d2a8f4e617'
+down_revision: Union[str, Sequence[str], None] = 'b41c7e2d9a53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MIN_PGVECTOR_VERSION = (0, 7)
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+def _supports_quantization() -> bool:
+    installed = op.get_bind().execute(
+        sa.text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+    ).scalar()
+    parts = tuple(int(part) for part in (installed or "0").split(".")[:2] if part.isdigit())
+    if parts < MIN_PGVECTOR_VERSION:
+        required = ".".join(str(part) for part in MIN_PGVECTOR_VERSION)
+        logger.warning(
+            f"pgvector {installed or 'not installed'} < {required}: skipping the halfvec/binary "
+            f"indexes. VECTOR_SEARCH_MODE=halfvec|binary will use exact search until a superuser "
+            f"runs ALTER EXTENSION vector UPDATE and the indexes are created."
+        )
+        return False
+    return True
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not _supports_quantization():
+        return
+    # CONCURRENTLY keeps document_chunks writable while the indexes build
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_document_chunks_embedding_halfvec "
+            "ON document_chunks USING hnsw ((embedding::halfvec(768)) halfvec_cosine_ops)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_document_chunks_embedding_binary "
+            "ON document_chunks USING hnsw ((binary_quantize(embedding)::bit(768)) bit_hamming_ops)"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_document_chunks_embedding_binary")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_document_chunks_embedding_halfvec")
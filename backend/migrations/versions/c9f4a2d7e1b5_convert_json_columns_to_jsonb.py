@@ -0,0 +1,67 @@
+"""Convert entity and run JSON columns to JSONB
+
+Revision ID: c9f4a2d7e1b5
+Revises: b6d2e9a4f318
+Create Date: 2026-10-19 17:42:18.604113
+
+JSONB is stored parsed, so reads no longer re-parse each document, and it
+can be indexed. The indexes back the list API filters:
+
+    hierarchical_entities (tags) GIN             GET /ai/entities[/library]?tag=
+    hierarchical_entities (company_id, model)    GET /ai/entities[/library]?model_name=
+    execution_runs (input_data) GIN, root runs   GET /ai/executions?input_key=
+
+Each table is rewritten once under an exclusive lock by the type change.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9f4a2d7e1b5'
+down_revision: Union[str, Sequence[str], None] = 'b6d2e9a4f318'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = {
+    'hierarchical_entities': [
+        'tags', 'identity', 'hierarchy', 'logic_gate', 'planning', 'capabilities', 'governance',
+        'io_contract', 'observability', 'metadata_extensions', 'static_plan', 'llm_config', 'toolkit',
+    ],
+    'execution_runs': ['input_data', 'dynamic_plan', 'result_data', 'context_state'],
+}
+
+INDEXES = {
+    'ix_hierarchical_entities_tags': 'hierarchical_entities USING gin (tags)',
+    'ix_hierarchical_entities_model_name':
+        "hierarchical_entities (company_id, (logic_gate -> 'reasoning_config' ->> 'model_name'))",
+    'ix_execution_runs_root_input_data':
+        'execution_runs USING gin (input_data) WHERE parent_run_id IS NULL',
+}
+
+
+def _alter_types(type_name: str) -> None:
+    for table, columns in COLUMNS.items():
+        # One ALTER TABLE per table, so each is rewritten only once
+        changes = ', '.join(
+            f'ALTER COLUMN {column} TYPE {type_name} USING {column}::{type_name}' for column in columns
+        )
+        op.execute(f'ALTER TABLE {table} {changes}')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _alter_types('jsonb')
+    with op.get_context().autocommit_block():
+        for name, definition in INDEXES.items():
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name in reversed(list(INDEXES)):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    _alter_types('json')
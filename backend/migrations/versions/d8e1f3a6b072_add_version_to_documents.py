@@ -0,0 +1,30 @@
+"""Add version to documents
+
+Revision ID: d8e1f3a6b072
+Revises: c5d2a8f4e617
+Create Date: 2026-10-19 13:27:44.109385
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8e1f3a6b072'
+down_revision: Union[str, Sequence[str], None] = 'c5d2a8f4e617'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('documents', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.create_index('ix_document_chunks_document_id', 'document_chunks', ['document_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_document_chunks_document_id', table_name='document_chunks')
+    op.drop_column('documents', 'version')
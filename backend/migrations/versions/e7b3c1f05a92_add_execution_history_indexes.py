@@ -0,0 +1,45 @@
+"""Add execution history keyset indexes
+
+Revision ID: e7b3c1f05a92
+Revises: d8e1f3a6b072
+Create Date: 2026-10-19 14:52:31.640218
+
+Partial indexes over root runs matching the (created_at DESC, id DESC)
+keyset order of GET /ai/executions, unfiltered and with the status and
+entity filters, so each page is an index range scan of `limit` rows.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b3c1f05a92'
+down_revision: Union[str, Sequence[str], None] = 'd8e1f3a6b072'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    'ix_execution_runs_root_history': 'company_id, created_at DESC, id DESC',
+    'ix_execution_runs_root_status_history': 'company_id, status, created_at DESC, id DESC',
+    'ix_execution_runs_root_entity_history': 'company_id, entity_id, created_at DESC, id DESC',
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY keeps execution_runs writable while the indexes build
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES.items():
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+                f"ON execution_runs ({columns}) WHERE parent_run_id IS NULL"
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name in reversed(list(INDEXES)):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,72 @@
+"""Add dashboard counter tables
+
+Revision ID: f1a4d7c2e836
+Revises: e7b3c1f05a92
+Create Date: 2026-10-19 15:36:12.408851
+
+Counters are maintained on write from now on; existing data is backfilled
+here. Only root runs are rolled up, since their totals include children.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a4d7c2e836'
+down_revision: Union[str, Sequence[str], None] = 'e7b3c1f05a92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('company_counters',
+    sa.Column('company_id', sa.UUID(), nullable=False),
+    sa.Column('entities_total', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('documents_total', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['company_id'], ['companies.id'], ),
+    sa.PrimaryKeyConstraint('company_id')
+    )
+    op.create_table('company_daily_stats',
+    sa.Column('company_id', sa.UUID(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('executions', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('completed', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('failed', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('cost_usd', sa.Numeric(precision=18, scale=6), server_default='0', nullable=False),
+    sa.Column('tokens', sa.BigInteger(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['company_id'], ['companies.id'], ),
+    sa.PrimaryKeyConstraint('company_id', 'day')
+    )
+
+    op.execute("""
+        INSERT INTO company_counters (company_id, entities_total, documents_total, updated_at)
+        SELECT c.id,
+               (SELECT count(*) FROM hierarchical_entities e WHERE e.company_id = c.id),
+               (SELECT count(*) FROM documents d WHERE d.company_id = c.id),
+               now() AT TIME ZONE 'utc'
+        FROM companies c
+    """)
+    op.execute("""
+        INSERT INTO company_daily_stats (company_id, day, executions, completed, failed, cost_usd, tokens)
+        SELECT company_id,
+               created_at::date,
+               count(*),
+               count(*) FILTER (WHERE status = 'COMPLETED'),
+               count(*) FILTER (WHERE status = 'FAILED'),
+               coalesce(sum(total_cost_usd) FILTER (WHERE status IN ('COMPLETED', 'FAILED')), 0),
+               coalesce(sum(total_tokens) FILTER (WHERE status IN ('COMPLETED', 'FAILED')), 0)
+        FROM execution_runs
+        WHERE parent_run_id IS NULL AND created_at IS NOT NULL
+        GROUP BY company_id, created_at::date
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('company_daily_stats')
+    op.drop_table('company_counters')
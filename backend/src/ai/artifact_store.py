@@ -0,0 +1,211 @@
+"""
+Content-addressed storage for large prompts, responses and step outputs.
+
+Implements the REFERENCE mode of ``ArtifactHandling.artifact_reference_mode``:
+payloads over ``ARTIFACT_INLINE_MAX_BYTES`` are compressed into the blob
+store under the SHA-256 of their content, and the row keeps a reference::
+
+    {"$artifact": "<sha256>", "codec": "zstd", "kind": "text", "size": 48213, "preview": "..."}
+
+Identical payloads share one blob, so a step output that appears in both
+``result_data["steps"]`` and ``context_state`` is stored once. Compression
+uses zstd (``zstandard`` is a required dependency); an environment without
+it falls back to zlib with a warning. The codec is recorded in each
+reference so either can be read back.
+"""
+
+from typing import Any, Dict, Iterator, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import logging
+import zlib
+
+from src.common.blob_store import BlobStore
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_KEY = "$artifact"
+
+
+def _default_codec() -> str:
+    try:
+        import zstandard  # noqa: F401
+        return "zstd"
+    except ImportError:
+        logger.warning("zstandard is not installed; artifacts will be compressed with zlib")
+        return "zlib"
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        import zstandard
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    if codec == "zlib":
+        return zlib.compress(data, 6)
+    raise ValueError(f"Unsupported artifact codec: {codec}")
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        import zstandard
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == "zlib":
+        return zlib.decompress(data)
+    raise ValueError(f"Unsupported artifact codec: {codec}")
+
+
+def is_reference(value: Any) -> bool:
+    return isinstance(value, dict) and REFERENCE_KEY in value
+
+
+def find_references(value: Any) -> Iterator[dict]:
+    """Yield every artifact reference nested in a JSON value."""
+    if is_reference(value):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from find_references(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from find_references(item)
+
+
+def trace_references(run) -> Iterator[dict]:
+    """Yield the artifact references stored on a loaded run, its logs and its child runs."""
+    for value in (run.input_data, run.result_data, run.context_state):
+        yield from find_references(value)
+    for log in run.llm_logs:
+        yield from find_references(log.log_metadata)
+    for log in run.tool_logs:
+        yield from find_references(log.input_parameters)
+        yield from find_references(log.output_result)
+    for child in run.child_runs:
+        yield from trace_references(child)
+
+
+def uses_references(capabilities: Optional[dict]) -> bool:
+    """Whether an entity's artifact handling asks for large payloads to be stored by reference."""
+    from src.ai.schemas import ContextEngineering
+
+    context_engineering = ContextEngineering(**(capabilities or {}).get("context_engineering", {}))
+    handling = context_engineering.artifact_handling
+    return handling.store_large_objects and handling.artifact_reference_mode == "REFERENCE"
+
+
+class ArtifactStore:
+    """Writes large payloads to a blob store and swaps them for references."""
+
+    def __init__(
+        self,
+        blob_store: BlobStore,
+        inline_max_bytes: int = 4096,
+        preview_chars: int = 280,
+        codec: Optional[str] = None
+    ):
+        self.blob_store = blob_store
+        self.inline_max_bytes = inline_max_bytes
+        self.preview_chars = preview_chars
+        self.codec = codec or _default_codec()
+
+    @staticmethod
+    def _key(digest: str, codec: str) -> str:
+        return f"artifacts/{digest[:2]}/{digest}.{codec}"
+
+    def preview(self, text: str) -> str:
+        if len(text) <= self.preview_chars:
+            return text
+        return text[:self.preview_chars] + "…"
+
+    async def _put(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        key = self._key(digest, self.codec)
+        if not await self.blob_store.exists(key):
+            payload = compress(data, self.codec)
+
+            async def chunks():
+                yield payload
+
+            await self.blob_store.write_stream(chunks(), key=key)
+        return digest
+
+    async def offload(self, value: Any) -> Any:
+        """
+        Store a string or JSON value if it is over the inline limit.
+
+        Returns:
+            A reference to the stored value, or the value itself if small
+        """
+        if is_reference(value):
+            return value
+        if isinstance(value, str):
+            kind, data = "text", value.encode()
+        else:
+            kind, data = "json", json.dumps(value, separators=(",", ":"), default=str).encode()
+        if len(data) <= self.inline_max_bytes:
+            return value
+
+        preview = value if kind == "text" else data.decode()
+        return {
+            REFERENCE_KEY: await self._put(data),
+            "codec": self.codec,
+            "kind": kind,
+            "size": len(data),
+            "preview": self.preview(preview),
+        }
+
+    async def offload_tree(self, value: Any) -> Any:
+        """Replace each large string in a JSON value with a reference, keeping the structure."""
+        if isinstance(value, dict) and not is_reference(value):
+            return {key: await self.offload_tree(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [await self.offload_tree(item) for item in value]
+        if isinstance(value, str):
+            return await self.offload(value)
+        return value
+
+    async def offload_texts(self, texts: Dict[str, str]) -> Tuple[Dict[str, str], Dict[str, dict]]:
+        """
+        Offload text column values.
+
+        Returns:
+            The values to store in the columns (previews for offloaded ones)
+            and the references by column name
+        """
+        columns, references = {}, {}
+        for name, text in texts.items():
+            stored = await self.offload(text)
+            if is_reference(stored):
+                references[name] = stored
+                columns[name] = stored["preview"]
+            else:
+                columns[name] = text
+        return columns, references
+
+    def _read(self, key: str) -> bytes:
+        with self.blob_store.open(key) as f:
+            return f.read()
+
+    async def load(self, reference: dict) -> Any:
+        """Read back the full value behind a reference."""
+        key = self._key(reference[REFERENCE_KEY], reference["codec"])
+        data = decompress(await asyncio.to_thread(self._read, key), reference["codec"])
+        if reference.get("kind") == "json":
+            return json.loads(data)
+        return data.decode()
+
+
+_artifact_store: Optional[ArtifactStore] = None
+
+
+def get_artifact_store() -> ArtifactStore:
+    global _artifact_store
+    if _artifact_store is None:
+        from src.common.blob_store import get_blob_store
+        from src.common.config import settings
+        _artifact_store = ArtifactStore(
+            get_blob_store(),
+            inline_max_bytes=settings.ARTIFACT_INLINE_MAX_BYTES,
+            preview_chars=settings.ARTIFACT_PREVIEW_CHARS
+        )
+    return _artifact_store
@@ -0,0 +1,175 @@
+"""
+Token-budgeted prompts for THOUGHT steps without a ``prompt_template``.
+
+Instead of ``str(context)``, the run context is split into sections:
+
+    STATIC_PLAN    the plan's steps, marking the current one
+    USER_INPUT     the run's input keys
+    STEP_HISTORY   outputs of earlier steps, oldest first
+
+Sections are filled in ``ContextEngineering.context_priority`` order (sections
+it does not list follow in the order above) until
+``max_context_tokens`` is spent. The system prompt is always sent whole, so
+it is charged first wherever ``SYSTEM_PROMPT`` appears in the priority list.
+A section that does not fit is cut down: step outputs are summarized oldest
+first, then dropped oldest first, and what remains is truncated.
+
+``LoopControl.iteration_context_mode`` selects the step history:
+
+    FULL_HISTORY   every earlier output
+    SUMMARIZED     the latest output in full, older ones summarized
+    LAST_N         only the last ``last_n_iterations`` outputs
+
+Summaries are extractive (leading sentences), so assembling a prompt never
+costs an extra LLM call. Tokens are counted with ``src.ai.tokens``.
+"""
+
+from dataclasses import dataclass
+from typing import Any, List, Mapping, Sequence, Tuple
+import json
+import re
+
+from src.ai.tokens import count_tokens, truncate_to_tokens
+
+SYSTEM_PROMPT = "SYSTEM_PROMPT"
+STATIC_PLAN = "STATIC_PLAN"
+USER_INPUT = "USER_INPUT"
+STEP_HISTORY = "STEP_HISTORY"
+
+DEFAULT_CONTEXT_PRIORITY = (SYSTEM_PROMPT, STATIC_PLAN, USER_INPUT)
+DEFAULT_LAST_N_ITERATIONS = 3
+
+# Token budget for each summarized step output
+SUMMARY_MAX_TOKENS = 64
+ELLIPSIS = " […]"
+
+_TITLES = {STATIC_PLAN: "## Plan", USER_INPUT: "## Input", STEP_HISTORY: "## Previous steps"}
+_SECTION_ORDER = (STATIC_PLAN, USER_INPUT, STEP_HISTORY)
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+@dataclass
+class AssembledContext:
+    prompt: str
+    tokens: int  # system prompt included
+    # Sections that were summarized, cut short or left out to fit the budget
+    reduced: Tuple[str, ...]
+
+
+def render_value(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, default=str, ensure_ascii=False)
+
+
+def summarize(text: str, max_tokens: int = SUMMARY_MAX_TOKENS) -> str:
+    """Leading sentences of text within max_tokens, marked when shortened."""
+    if count_tokens(text) <= max_tokens:
+        return text
+    budget = max_tokens - count_tokens(ELLIPSIS)
+    kept, used = [], 0
+    for sentence in _SENTENCE_END.split(text):
+        tokens = count_tokens(sentence)
+        if used + tokens > budget:
+            break
+        kept.append(sentence)
+        used += tokens
+    summary = " ".join(kept) if kept else truncate_to_tokens(text, budget)
+    return summary + ELLIPSIS
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    if count_tokens(text) <= max_tokens:
+        return text
+    return truncate_to_tokens(text, max_tokens - count_tokens(ELLIPSIS)) + ELLIPSIS
+
+
+class _Section:
+    def __init__(self, name: str, entries: List[str]):
+        self.name = name
+        self.entries = entries
+
+    def render(self) -> str:
+        return "\n\n".join([_TITLES[self.name], *self.entries]) if self.entries else ""
+
+    def tokens(self) -> int:
+        return count_tokens(self.render())
+
+    def fit(self, budget: int) -> bool:
+        """Shrink to at most budget tokens; returns whether anything was cut."""
+        if self.tokens() <= budget:
+            return False
+        if self.name == STEP_HISTORY:
+            # The newest output stays as long as possible
+            for i in range(len(self.entries) - 1):
+                heading, _, output = self.entries[i].partition("\n")
+                self.entries[i] = f"{heading}\n{summarize(output)}"
+                if self.tokens() <= budget:
+                    return True
+            while len(self.entries) > 1 and self.tokens() > budget:
+                self.entries.pop(0)
+        body_budget = budget - count_tokens(_TITLES[self.name])
+        if self.tokens() > budget:
+            if body_budget <= count_tokens(ELLIPSIS):
+                self.entries = []
+            else:
+                self.entries = [_truncate("\n\n".join(self.entries), body_budget)]
+        return True
+
+
+def _history(steps, current_index: int, context: Mapping[str, Any], mode: str, last_n: int) -> List[str]:
+    outputs = [
+        (compiled.step.name, render_value(context[compiled.step.name]))
+        for compiled in steps[:current_index] if compiled.step.name in context
+    ]
+    if mode == "LAST_N":
+        outputs = outputs[-last_n:] if last_n > 0 else []
+    elif mode == "SUMMARIZED":
+        outputs = [(name, summarize(text)) for name, text in outputs[:-1]] + outputs[-1:]
+    return [f"### {name}\n{text}" for name, text in outputs]
+
+
+def _ordered_sections(priority: Sequence[str]) -> List[str]:
+    listed = [name for name in priority if name in _TITLES]
+    return list(dict.fromkeys(listed)) + [name for name in _SECTION_ORDER if name not in listed]
+
+
+def assemble_context(plan, compiled_step, context: Mapping[str, Any]) -> AssembledContext:
+    """The user prompt for ``compiled_step`` within the plan's context budget."""
+    steps = plan.steps
+    current_index = next((i for i, compiled in enumerate(steps) if compiled is compiled_step), len(steps))
+    step = compiled_step.step
+    step_names = {compiled.step.name for compiled in steps}
+
+    header = f"Current step: {step.name}" + (f"\n{step.description}" if step.description else "")
+    plan_lines = [
+        f"{i + 1}. {compiled.step.name} ({compiled.step.type.value})"
+        + (f": {compiled.step.description}" if compiled.step.description else "")
+        + (" <- current" if i == current_index else "")
+        for i, compiled in enumerate(steps)
+    ]
+    sections = {
+        STATIC_PLAN: _Section(STATIC_PLAN, ["\n".join(plan_lines)] if plan_lines else []),
+        USER_INPUT: _Section(USER_INPUT, [
+            f"{key}: {render_value(value)}" for key, value in context.items() if key not in step_names
+        ]),
+        STEP_HISTORY: _Section(STEP_HISTORY, _history(
+            steps, current_index, context, plan.iteration_context_mode, plan.last_n_iterations
+        )),
+    }
+
+    # The system prompt and the step header are always sent in full
+    used = count_tokens(plan.system_prompt) + count_tokens(header)
+    parts, reduced = [header], []
+    for name in _ordered_sections(plan.context_priority):
+        section = sections[name]
+        if not section.entries:
+            continue
+        if section.fit(max(plan.max_context_tokens - used, 0)):
+            reduced.append(name)
+        text = section.render()
+        if text:
+            parts.append(text)
+            used += count_tokens(text)
+
+    return AssembledContext(prompt="\n\n".join(parts), tokens=used, reduced=tuple(reduced))
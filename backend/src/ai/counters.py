@@ -0,0 +1,168 @@
+"""
+Precomputed dashboard counters.
+
+Totals live in ``company_counters`` and per-day execution rollups in
+``company_daily_stats``. Both are updated with upserts inside the same
+transaction as the write they count, so /ai/stats reads two primary-key rows
+instead of counting the underlying tables.
+
+Only root runs are counted: a root run's cost and tokens already include
+its children's (the engine rolls them up), so adding child runs would
+double count.
+"""
+
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+import time
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from src.ai.models import CompanyCounter, CompanyDailyStats
+
+
+def _upsert(model, keys: Dict[str, Any], deltas: Dict[str, Any], assign: Optional[Dict[str, Any]] = None):
+    """INSERT the deltas as initial values, or add them to the existing row."""
+    table = model.__table__
+    stmt = insert(model).values(**keys, **deltas, **(assign or {}))
+    return stmt.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={**{column: table.c[column] + stmt.excluded[column] for column in deltas}, **(assign or {})}
+    )
+
+
+def company_counter_upsert(company_id: UUID, entities: int = 0, documents: int = 0):
+    """Statement adjusting a company's entity/document totals."""
+    return _upsert(
+        CompanyCounter,
+        {"company_id": company_id},
+        {"entities_total": entities, "documents_total": documents},
+        # ON CONFLICT updates skip column onupdate defaults
+        assign={"updated_at": datetime.utcnow()}
+    )
+
+
+def daily_stats_upsert(
+    company_id: UUID,
+    day: date,
+    executions: int = 0,
+    completed: int = 0,
+    failed: int = 0,
+    cost_usd: Decimal = Decimal(0),
+    tokens: int = 0
+):
+    """Statement adding to a company's rollup for one UTC day."""
+    return _upsert(
+        CompanyDailyStats,
+        {"company_id": company_id, "day": day},
+        {"executions": executions, "completed": completed, "failed": failed, "cost_usd": cost_usd, "tokens": tokens}
+    )
+
+
+async def record_entities(db, company_id: UUID, delta: int) -> None:
+    await db.execute(company_counter_upsert(company_id, entities=delta))
+
+
+async def record_documents(db, company_id: UUID, delta: int) -> None:
+    await db.execute(company_counter_upsert(company_id, documents=delta))
+
+
+async def record_run_created(db, run) -> None:
+    """Count a new root run on the day it was created."""
+    if run.parent_run_id is None:
+        await db.execute(daily_stats_upsert(run.company_id, run.created_at.date(), executions=1))
+
+
+async def record_run_finished(db, run, succeeded: bool) -> None:
+    """Add a finished root run's outcome, cost and tokens to its creation day."""
+    if run.parent_run_id is not None or run.created_at is None:
+        return
+    await db.execute(daily_stats_upsert(
+        run.company_id,
+        run.created_at.date(),
+        completed=1 if succeeded else 0,
+        failed=0 if succeeded else 1,
+        cost_usd=Decimal(run.total_cost_usd or 0),
+        tokens=run.total_tokens or 0
+    ))
+
+
+class TTLCache:
+    """Small in-process cache whose entries expire ``ttl_seconds`` after being set."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Any, tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        return value
+
+    def set(self, key, value) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+_stats_cache: Optional[TTLCache] = None
+
+
+def get_stats_cache() -> TTLCache:
+    global _stats_cache
+    if _stats_cache is None:
+        from src.common.config import settings
+        _stats_cache = TTLCache(settings.DASHBOARD_STATS_CACHE_TTL_SECONDS)
+    return _stats_cache
+
+
+async def read_dashboard_stats(db, company_id: UUID, today: Optional[date] = None) -> dict:
+    """Totals plus today's rollup, from two primary-key lookups."""
+    today = today or datetime.utcnow().date()
+    totals = await db.get(CompanyCounter, company_id)
+    daily = await db.get(CompanyDailyStats, (company_id, today))
+    return {
+        "entities_total": totals.entities_total if totals else 0,
+        "documents_total": totals.documents_total if totals else 0,
+        "executions_today": daily.executions if daily else 0,
+        "cost_today_usd": float(daily.cost_usd) if daily else 0.0,
+        "tokens_today": daily.tokens if daily else 0,
+    }
+
+
+async def read_timeseries(db, company_id: UUID, days: int, today: Optional[date] = None) -> List[dict]:
+    """One point per UTC day for the last ``days`` days, oldest first, zero-filled."""
+    today = today or datetime.utcnow().date()
+    start = today - timedelta(days=days - 1)
+    result = await db.execute(
+        select(CompanyDailyStats)
+        .where(CompanyDailyStats.company_id == company_id, CompanyDailyStats.day >= start)
+        .order_by(CompanyDailyStats.day)
+    )
+    rows = {row.day: row for row in result.scalars().all()}
+
+    points = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        row = rows.get(day)
+        points.append({
+            "day": day,
+            "executions": row.executions if row else 0,
+            "completed": row.completed if row else 0,
+            "failed": row.failed if row else 0,
+            "cost_usd": float(row.cost_usd) if row else 0.0,
+            "tokens": row.tokens if row else 0,
+        })
+    return points
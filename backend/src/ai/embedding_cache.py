@@ -0,0 +1,175 @@
+"""Two-tier cache for query embeddings: in-process LRU backed by Redis."""
+
+from array import array
+from collections import OrderedDict
+from typing import Awaitable, Callable, List, Optional
+import hashlib
+import logging
+import time
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(text: str) -> str:
+    """Normalize query text so trivially different spellings share a cache entry."""
+    return " ".join(unicodedata.normalize("NFKC", text or "").split())
+
+
+def pack_embedding(values: List[float]) -> bytes:
+    """Serialize an embedding as packed float32 bytes."""
+    return array("f", values).tobytes()
+
+
+def unpack_embedding(data: bytes) -> List[float]:
+    """Deserialize packed float32 bytes back into a list of floats."""
+    values = array("f")
+    values.frombytes(data)
+    return values.tolist()
+
+
+class EmbeddingCache:
+    """
+    Caches text -> embedding vectors keyed by embedding model.
+
+    Lookups hit the in-process LRU first, then Redis (shared across API
+    workers). Both tiers honour the same TTL. Redis failures are logged and
+    treated as misses so search keeps working if Redis is unavailable.
+    """
+
+    def __init__(
+        self,
+        redis_client=None,
+        max_entries: int = 2048,
+        ttl_seconds: int = 86400,
+        namespace: str = "emb:query"
+    ):
+        self.redis = redis_client
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.namespace = namespace
+        self._lru: "OrderedDict[str, tuple[float, bytes]]" = OrderedDict()
+
+    def make_key(self, model: str, text: str) -> str:
+        digest = hashlib.sha256(normalize_query(text).encode("utf-8")).hexdigest()
+        return f"{self.namespace}:{model}:{digest}"
+
+    def _get_local(self, key: str) -> Optional[bytes]:
+        entry = self._lru.get(key)
+        if entry is None:
+            return None
+        expires_at, data = entry
+        if expires_at < time.monotonic():
+            del self._lru[key]
+            return None
+        self._lru.move_to_end(key)
+        return data
+
+    def _set_local(self, key: str, data: bytes) -> None:
+        self._lru[key] = (time.monotonic() + self.ttl_seconds, data)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    async def get(self, model: str, text: str) -> Optional[List[float]]:
+        key = self.make_key(model, text)
+        data = self._get_local(key)
+        if data is None and self.redis is not None:
+            try:
+                data = await self.redis.get(key)
+            except Exception as e:
+                logger.warning(f"Embedding cache read failed: {e}")
+                data = None
+            if data is not None:
+                self._set_local(key, data)
+        return unpack_embedding(data) if data is not None else None
+
+    async def set(self, model: str, text: str, embedding: List[float]) -> None:
+        key = self.make_key(model, text)
+        data = pack_embedding(embedding)
+        self._set_local(key, data)
+        if self.redis is not None:
+            try:
+                await self.redis.set(key, data, ex=self.ttl_seconds)
+            except Exception as e:
+                logger.warning(f"Embedding cache write failed: {e}")
+
+    async def get_or_compute(
+        self,
+        model: str,
+        text: str,
+        compute: Callable[[str], Awaitable[List[float]]]
+    ) -> List[float]:
+        """
+        Return the cached embedding for text, computing and storing it on a miss.
+
+        Args:
+            model: Embedding model name (part of the cache key)
+            text: Raw query text; normalized before keying and embedding
+            compute: Coroutine function that embeds the normalized text
+
+        Returns:
+            The embedding vector
+        """
+        cached = await self.get(model, text)
+        if cached is not None:
+            return cached
+        embedding = await compute(normalize_query(text))
+        await self.set(model, text, embedding)
+        return embedding
+
+    async def get_many_or_compute(
+        self,
+        model: str,
+        texts: List[str],
+        compute_batch: Callable[[List[str]], Awaitable[List[List[float]]]]
+    ) -> List[List[float]]:
+        """
+        Return embeddings for several texts, computing all misses in one batch.
+
+        Args:
+            model: Embedding model name (part of the cache key)
+            texts: Raw query texts; duplicates are embedded once
+            compute_batch: Coroutine function embedding a list of normalized
+                texts and returning vectors in the same order
+
+        Returns:
+            Embedding vectors in the order of texts
+        """
+        found: dict[str, List[float]] = {}
+        missing: List[str] = []
+        for text in texts:
+            normalized = normalize_query(text)
+            if normalized in found or normalized in missing:
+                continue
+            cached = await self.get(model, normalized)
+            if cached is not None:
+                found[normalized] = cached
+            else:
+                missing.append(normalized)
+
+        if missing:
+            embeddings = await compute_batch(missing)
+            for normalized, embedding in zip(missing, embeddings, strict=True):
+                found[normalized] = embedding
+                await self.set(model, normalized, embedding)
+
+        return [found[normalize_query(text)] for text in texts]
+
+
+_query_cache: Optional[EmbeddingCache] = None
+
+
+def get_query_embedding_cache() -> EmbeddingCache:
+    """Process-wide query embedding cache, created lazily on first use."""
+    global _query_cache
+    if _query_cache is None:
+        import redis.asyncio as redis
+        from src.common.config import settings
+
+        _query_cache = EmbeddingCache(
+            redis_client=redis.from_url(settings.REDIS_URL or "redis://localhost:6379"),
+            max_entries=settings.QUERY_EMBEDDING_CACHE_SIZE,
+            ttl_seconds=settings.QUERY_EMBEDDING_CACHE_TTL_SECONDS
+        )
+    return _query_cache
@@ -0,0 +1,175 @@
+"""Pluggable embedding providers for document ingest and search."""
+
+from abc import ABC, abstractmethod
+from typing import List, Optional
+from uuid import UUID
+import asyncio
+import hashlib
+import logging
+import math
+import re
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIMENSIONS = 768
+
+
+class EmbeddingProviderError(Exception):
+    """Raised when an embedding provider cannot be created."""
+
+
+class EmbeddingProvider(ABC):
+    """
+    Turns texts into fixed-size vectors.
+
+    ``model`` is stored on each chunk and keys the embedding caches, so
+    vectors from different providers never get compared with each other.
+    Providers are async context managers; use them with ``async with`` so
+    network clients are closed.
+    """
+
+    model: str
+
+    @abstractmethod
+    async def embed(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Return one vector (or None if that text failed) per input text."""
+
+    async def aclose(self) -> None:  # noqa: B027 - optional hook, not abstract
+        """Release network clients; providers without any keep this no-op."""
+
+    async def __aenter__(self) -> "EmbeddingProvider":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+
+class GeminiEmbeddingProvider(EmbeddingProvider):
+    """Google Gemini text-embedding-004 via batchEmbedContents."""
+
+    model = "text-embedding-004"
+    BATCH_LIMIT = 100  # requests per batchEmbedContents call
+    BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
+
+    def __init__(self, api_key: str, base_url: Optional[str] = None):
+        import httpx
+
+        self.api_key = api_key
+        self.base_url = base_url or self.BASE_URL
+        self._client = httpx.AsyncClient(timeout=60.0)
+
+    async def embed(self, texts: List[str]) -> List[Optional[List[float]]]:
+        vectors: List[Optional[List[float]]] = []
+        url = f"{self.base_url}/models/{self.model}:batchEmbedContents?key={self.api_key}"
+        for i in range(0, len(texts), self.BATCH_LIMIT):
+            batch = texts[i:i + self.BATCH_LIMIT]
+            response = await self._client.post(
+                url,
+                headers={"Content-Type": "application/json"},
+                json={
+                    "requests": [
+                        {"model": f"models/{self.model}", "content": {"parts": [{"text": text}]}}
+                        for text in batch
+                    ]
+                }
+            )
+            if response.status_code != 200:
+                logger.warning(f"Gemini embedding batch failed ({response.status_code}): {response.text[:500]}")
+                vectors.extend([None] * len(batch))
+                continue
+            vectors.extend(embedding["values"] for embedding in response.json()["embeddings"])
+        return vectors
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+class LocalEmbeddingProvider(EmbeddingProvider):
+    """
+    Deterministic offline embeddings from hashed n-grams.
+
+    Words and character trigrams are hashed into signed buckets of a
+    ``dimensions``-sized vector, which is then L2-normalized. Texts sharing
+    vocabulary land close together under cosine distance, so search and index
+    behaviour are realistic enough for benchmarks without network or keys.
+
+    Args:
+        latency_ms: Artificial delay per embed() call, to model a remote API
+        dimensions: Vector size; must match the DocumentChunk.embedding column
+    """
+
+    model = "local-hash-768"
+
+    def __init__(self, latency_ms: float = 0, dimensions: int = EMBEDDING_DIMENSIONS):
+        self.latency_ms = latency_ms
+        self.dimensions = dimensions
+
+    def embed_one(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        for feature in self._features(text):
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dimensions
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector))
+        if norm == 0:
+            # Empty text still needs a valid, non-zero vector for cosine distance
+            vector[0] = norm = 1.0
+        return [v / norm for v in vector]
+
+    @staticmethod
+    def _features(text: str):
+        for word in _WORD_PATTERN.findall((text or "").lower()):
+            yield f"w:{word}"
+            padded = f" {word} "
+            for i in range(len(padded) - 2):
+                yield f"c:{padded[i:i + 3]}"
+
+    async def embed(self, texts: List[str]) -> List[Optional[List[float]]]:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        return [self.embed_one(text) for text in texts]
+
+
+_PROVIDERS = {
+    "gemini": GeminiEmbeddingProvider,
+    "local": LocalEmbeddingProvider,
+}
+
+
+def _provider_class(name: str):
+    if name not in _PROVIDERS:
+        raise EmbeddingProviderError(f"Unsupported embedding provider: {name}")
+    return _PROVIDERS[name]
+
+
+def get_embedding_model() -> str:
+    """Model name of the configured provider, without creating it."""
+    from src.common.config import settings
+
+    return _provider_class(settings.EMBEDDING_PROVIDER).model
+
+
+async def get_embedding_provider(db, company_id: UUID) -> EmbeddingProvider:
+    """
+    Create the configured embedding provider for a company.
+
+    Raises:
+        EmbeddingProviderError: If the provider is unknown or has no API key
+    """
+    from src.common.config import settings
+
+    provider_class = _provider_class(settings.EMBEDDING_PROVIDER)
+    if provider_class is LocalEmbeddingProvider:
+        return LocalEmbeddingProvider(latency_ms=settings.LOCAL_EMBEDDING_LATENCY_MS)
+
+    from src.config.service import ConfigService
+
+    config_service = ConfigService(db)
+    api_key = await config_service.get_api_key_by_sku(company_id, "gemini-embedding-004") or \
+        await config_service.get_api_key_by_sku(company_id, "gemini-api-key")
+    if not api_key:
+        raise EmbeddingProviderError("Gemini API Key not found in Integrations for this company")
+    return GeminiEmbeddingProvider(api_key, base_url=settings.GEMINI_BASE_URL)
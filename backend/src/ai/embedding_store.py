@@ -0,0 +1,133 @@
+"""Content-addressed embedding reuse for document chunks."""
+
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.ai.models import Document, DocumentChunk
+import hashlib
+import unicodedata
+
+# Keeps IN (...) lists well below Postgres' bind parameter limit
+LOOKUP_BATCH_SIZE = 500
+
+
+def normalize_chunk(text: str) -> str:
+    """Normalize chunk text so whitespace-only differences hash identically."""
+    return " ".join(unicodedata.normalize("NFKC", text or "").split())
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 hex digest of the normalized chunk text."""
+    return hashlib.sha256(normalize_chunk(text).encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore:
+    """
+    Reuses embeddings already stored on DocumentChunk rows.
+
+    Chunks are addressed by the hash of their normalized content. Lookups are
+    scoped to the company and the embedding model, so vectors never cross
+    tenants or models with different vector spaces.
+    """
+
+    def __init__(self, db: AsyncSession, company_id: UUID, model: str):
+        self.db = db
+        self.company_id = company_id
+        self.model = model
+
+    async def lookup(self, hashes: Sequence[str]) -> Dict[str, list]:
+        """
+        Fetch existing embeddings for the given content hashes.
+
+        Args:
+            hashes: Content hashes to look up
+
+        Returns:
+            Mapping of content hash to embedding for every hash already stored
+        """
+        found: Dict[str, list] = {}
+        unique = list(dict.fromkeys(hashes))
+        for i in range(0, len(unique), LOOKUP_BATCH_SIZE):
+            batch = unique[i:i + LOOKUP_BATCH_SIZE]
+            result = await self.db.execute(
+                select(DocumentChunk.content_hash, DocumentChunk.embedding)
+                .join(Document, Document.id == DocumentChunk.document_id)
+                .where(
+                    Document.company_id == self.company_id,
+                    DocumentChunk.embedding_model == self.model,
+                    DocumentChunk.content_hash.in_(batch),
+                    DocumentChunk.embedding.is_not(None)
+                )
+                .distinct(DocumentChunk.content_hash)
+            )
+            for chunk_hash, embedding in result.all():
+                found[chunk_hash] = embedding
+        return found
+
+    async def embed_chunks(
+        self,
+        texts: Sequence[str],
+        embed: Callable[[List[str]], Awaitable[List[Optional[list]]]]
+    ) -> List[Tuple[str, Optional[list]]]:
+        """
+        Resolve embeddings for chunk texts, embedding only unseen content.
+
+        Args:
+            texts: Chunk texts in document order
+            embed: Coroutine function embedding a list of texts; returns one
+                vector (or None on failure) per input text
+
+        Returns:
+            List of (content_hash, embedding) pairs aligned with texts
+        """
+        hashes = [content_hash(t) for t in texts]
+        known = await self.lookup(hashes)
+
+        # Embed each distinct missing content once, even if repeated in texts
+        missing: Dict[str, str] = {}
+        for chunk_hash, chunk_text in zip(hashes, texts, strict=True):
+            if chunk_hash not in known and chunk_hash not in missing:
+                missing[chunk_hash] = chunk_text
+
+        if missing:
+            vectors = await embed(list(missing.values()))
+            for chunk_hash, vector in zip(missing.keys(), vectors, strict=True):
+                if vector is not None:
+                    known[chunk_hash] = vector
+
+        return [(h, known.get(h)) for h in hashes]
+
+
+class ChunkDiff:
+    """
+    Matches a document's new chunks against its existing rows by content hash.
+
+    Feed new chunks in order through ``match``; chunks whose content already
+    exists reuse that row (and its embedding), recording a position change
+    if needed. Whatever is left unmatched at the end is stale.
+    """
+
+    def __init__(self, existing: Iterable[Tuple[Any, Optional[str], str]]):
+        """
+        Args:
+            existing: (chunk_id, content_hash, chunk_index) for the current rows
+        """
+        self._by_hash: Dict[Optional[str], List[Tuple[Any, str]]] = {}
+        for chunk_id, chunk_hash, chunk_index in existing:
+            self._by_hash.setdefault(chunk_hash, []).append((chunk_id, chunk_index))
+        self.moved: List[dict] = []
+
+    def match(self, index: int, text: str) -> bool:
+        """Claim an existing row for the chunk at index; False if it must be embedded."""
+        rows = self._by_hash.get(content_hash(text))
+        if not rows:
+            return False
+        chunk_id, chunk_index = rows.pop()
+        if chunk_index != str(index):
+            self.moved.append({"id": chunk_id, "chunk_index": str(index)})
+        return True
+
+    def stale(self) -> List[Any]:
+        """Ids of existing rows not matched by any new chunk."""
+        return [chunk_id for rows in self._by_hash.values() for chunk_id, _ in rows]
@@ -0,0 +1,189 @@
+"""Streaming text extraction and token-aware chunking for document ingest."""
+
+from typing import BinaryIO, Iterable, Iterator, List, NamedTuple, TypeVar
+from src.ai.tokens import count_tokens
+import io
+import re
+
+T = TypeVar("T")
+
+_PARAGRAPH_BOUNDARY = re.compile(r"\n\s*\n")
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+# Plain-text files without blank lines are still yielded in bounded blocks
+MAX_TEXT_BLOCK_CHARS = 64 * 1024
+
+
+def iter_document_text(file_obj: BinaryIO, file_type: str) -> Iterator[str]:
+    """
+    Yield a document's text one page or paragraph at a time.
+
+    Only the current page/paragraph is held in memory, so extraction cost is
+    independent of document length.
+
+    Args:
+        file_obj: Seekable binary file object for the document
+        file_type: pdf, docx, txt or any other extension (decoded as text)
+
+    Yields:
+        Text segments in document order
+    """
+    if file_type == "pdf":
+        import PyPDF2
+        for page in PyPDF2.PdfReader(file_obj).pages:
+            yield page.extract_text() or ""
+    elif file_type == "docx":
+        import docx
+        for paragraph in docx.Document(file_obj).paragraphs:
+            yield paragraph.text
+    else:
+        errors = "strict" if file_type == "txt" else "ignore"
+        yield from _iter_text_blocks(file_obj, errors)
+
+
+def _iter_text_blocks(file_obj: BinaryIO, errors: str) -> Iterator[str]:
+    """Yield blank-line separated blocks from a UTF-8 byte stream."""
+    reader = io.TextIOWrapper(file_obj, encoding="utf-8", errors=errors)
+    try:
+        block: List[str] = []
+        size = 0
+        for line in reader:
+            if not line.strip():
+                if block:
+                    yield "".join(block)
+                    block, size = [], 0
+                continue
+            block.append(line)
+            size += len(line)
+            if size >= MAX_TEXT_BLOCK_CHARS:
+                yield "".join(block)
+                block, size = [], 0
+        if block:
+            yield "".join(block)
+    finally:
+        # Leave the underlying file open for its owner to close
+        reader.detach()
+
+
+class _Unit(NamedTuple):
+    text: str
+    tokens: int
+    paragraph_start: bool
+
+
+class TextChunker:
+    """
+    Packs sentences into chunks of at most ``chunk_tokens`` tokens.
+
+    Chunks break on sentence boundaries and keep paragraph breaks. Consecutive
+    chunks share up to ``overlap_tokens`` tokens of trailing sentences so
+    retrieval does not lose context at chunk edges. Sentences longer than a
+    chunk are split on word boundaries.
+    """
+
+    def __init__(self, chunk_tokens: int = 400, overlap_tokens: int = 50):
+        if chunk_tokens <= 0:
+            raise ValueError("chunk_tokens must be positive")
+        if not 0 <= overlap_tokens < chunk_tokens:
+            raise ValueError("overlap_tokens must be between 0 and chunk_tokens")
+        self.chunk_tokens = chunk_tokens
+        self.overlap_tokens = overlap_tokens
+
+    def chunk(self, segments: Iterable[str]) -> Iterator[str]:
+        """
+        Lazily chunk a stream of text segments.
+
+        Args:
+            segments: Pages or paragraphs, e.g. from iter_document_text
+
+        Yields:
+            Chunk texts in document order
+        """
+        buffer: List[_Unit] = []
+        total = 0
+        fresh = False  # buffer holds units not yet emitted in a chunk
+
+        for segment in segments:
+            for unit in self._units(segment):
+                if buffer and total + unit.tokens > self.chunk_tokens:
+                    if fresh:
+                        yield self._join(buffer)
+                    buffer = self._overlap(buffer, unit.tokens)
+                    total = sum(u.tokens for u in buffer)
+                    fresh = False
+                buffer.append(unit)
+                total += unit.tokens
+                fresh = True
+
+        if fresh:
+            yield self._join(buffer)
+
+    def _units(self, segment: str) -> Iterator[_Unit]:
+        for paragraph in _PARAGRAPH_BOUNDARY.split(segment or ""):
+            paragraph = " ".join(paragraph.split())
+            if not paragraph:
+                continue
+            paragraph_start = True
+            for sentence in _SENTENCE_BOUNDARY.split(paragraph):
+                tokens = count_tokens(sentence)
+                if tokens <= self.chunk_tokens:
+                    yield _Unit(sentence, tokens, paragraph_start)
+                else:
+                    for piece in self._split_long(sentence):
+                        yield _Unit(piece, count_tokens(piece), paragraph_start)
+                        paragraph_start = False
+                paragraph_start = False
+
+    def _split_long(self, sentence: str) -> Iterator[str]:
+        words: List[str] = []
+        total = 0
+        for word in sentence.split(" "):
+            tokens = count_tokens(word)
+            if tokens > self.chunk_tokens:
+                # A single unbroken run (URLs, base64, tables); slice by chars
+                if words:
+                    yield " ".join(words)
+                    words, total = [], 0
+                step = self.chunk_tokens * 4
+                for i in range(0, len(word), step):
+                    yield word[i:i + step]
+                continue
+            if words and total + tokens > self.chunk_tokens:
+                yield " ".join(words)
+                words, total = [], 0
+            words.append(word)
+            total += tokens
+        if words:
+            yield " ".join(words)
+
+    def _overlap(self, buffer: List[_Unit], next_tokens: int) -> List[_Unit]:
+        budget = min(self.overlap_tokens, self.chunk_tokens - next_tokens)
+        kept: List[_Unit] = []
+        total = 0
+        for unit in reversed(buffer):
+            if total + unit.tokens > budget:
+                break
+            kept.append(unit)
+            total += unit.tokens
+        kept.reverse()
+        return kept
+
+    @staticmethod
+    def _join(units: List[_Unit]) -> str:
+        parts = [units[0].text]
+        for unit in units[1:]:
+            parts.append("\n\n" if unit.paragraph_start else " ")
+            parts.append(unit.text)
+        return "".join(parts)
+
+
+def batched(iterable: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Yield lists of up to size items from iterable."""
+    batch: List[T] = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
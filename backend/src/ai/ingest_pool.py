@@ -0,0 +1,138 @@
+"""Out-of-process document parsing with bounded concurrency and timeouts."""
+
+from typing import Any, Callable, Optional
+import asyncio
+import json
+import multiprocessing
+import traceback
+
+
+class IngestError(Exception):
+    """Raised when parsing a document in a worker process fails."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+def _child_entry(target: Callable, args: tuple, conn) -> None:
+    try:
+        result = target(*args)
+        conn.send(("ok", result))
+    except BaseException as e:
+        traceback.print_exc()
+        # Keep the message small so the send never blocks on a full pipe
+        conn.send(("error", f"{type(e).__name__}: {e}"[:1000]))
+    finally:
+        conn.close()
+
+
+class IngestProcessPool:
+    """
+    Runs CPU-bound ingest work in dedicated child processes.
+
+    Each call gets its own spawned process so a parser that hangs can be
+    killed on timeout and one that crashes (segfault, OOM kill) cannot take
+    down the arq worker. At most ``max_workers`` processes run at once; the
+    event loop only awaits their completion, so LLM runs, heartbeats and SSE
+    publishes on the same worker keep flowing.
+    """
+
+    def __init__(self, max_workers: int = 2, timeout_seconds: float = 300):
+        self.max_workers = max_workers
+        self.timeout_seconds = timeout_seconds
+        self._slots = asyncio.Semaphore(max_workers)
+        self._context = multiprocessing.get_context("spawn")
+
+    async def run(self, target: Callable, *args, timeout: Optional[float] = None) -> Any:
+        """
+        Run target(*args) in a child process and return its result.
+
+        Args:
+            target: Module-level (picklable) function to run
+            *args: Picklable arguments for target
+            timeout: Seconds before the child is killed; defaults to the pool timeout
+
+        Returns:
+            The (picklable) return value of target
+
+        Raises:
+            IngestError: If the child raises, crashes or times out
+        """
+        timeout = timeout or self.timeout_seconds
+        async with self._slots:
+            parent_conn, child_conn = self._context.Pipe(duplex=False)
+            process = self._context.Process(target=_child_entry, args=(target, args, child_conn), daemon=True)
+            process.start()
+            child_conn.close()
+            try:
+                await asyncio.to_thread(process.join, timeout)
+                if process.is_alive():
+                    process.kill()
+                    await asyncio.to_thread(process.join)
+                    raise IngestError(f"Parsing timed out after {timeout:.0f}s")
+
+                try:
+                    status, payload = parent_conn.recv() if parent_conn.poll() else (None, None)
+                except EOFError:
+                    # Child died before reporting anything
+                    status, payload = None, None
+                if status == "ok":
+                    return payload
+                if status == "error":
+                    raise IngestError(payload)
+                raise IngestError(f"Parser process crashed (exit code {process.exitcode})")
+            finally:
+                # Also reached when the awaiting job is cancelled mid-parse
+                if process.is_alive():
+                    process.kill()
+                    process.join()
+                parent_conn.close()
+                process.close()
+
+
+def extract_chunks_to_file(
+    blob_key: str,
+    file_type: str,
+    chunk_tokens: int,
+    overlap_tokens: int,
+    spool_path: str
+) -> int:
+    """
+    Parse and chunk a staged blob, writing one JSON string per line to spool_path.
+
+    Runs inside an IngestProcessPool child. Chunks go to disk as they are
+    produced so neither process holds the whole document in memory.
+
+    Returns:
+        Number of chunks written
+    """
+    from src.ai.ingest import TextChunker, iter_document_text
+    from src.common.blob_store import get_blob_store
+
+    blob_store = get_blob_store()
+    chunker = TextChunker(chunk_tokens, overlap_tokens)
+    open_blob = blob_store.open_mmap if file_type == "pdf" else blob_store.open
+    count = 0
+    with open_blob(blob_key) as file_obj, open(spool_path, "w", encoding="utf-8") as spool:
+        for chunk_text in chunker.chunk(iter_document_text(file_obj, file_type)):
+            spool.write(json.dumps(chunk_text))
+            spool.write("\n")
+            count += 1
+    return count
+
+
+_ingest_pool: Optional[IngestProcessPool] = None
+
+
+def get_ingest_pool() -> IngestProcessPool:
+    """Process-wide ingest pool, created lazily on first use."""
+    global _ingest_pool
+    if _ingest_pool is None:
+        from src.common.config import settings
+
+        _ingest_pool = IngestProcessPool(
+            max_workers=settings.INGEST_MAX_WORKERS,
+            timeout_seconds=settings.DOCUMENT_PARSE_TIMEOUT_SECONDS
+        )
+    return _ingest_pool
@@ -0,0 +1,114 @@
+"""Chat completion providers with configurable endpoints."""
+
+from abc import ABC, abstractmethod
+from typing import Optional
+import httpx
+
+
+class LLMProvider(ABC):
+    """
+    Speaks one provider's chat wire format.
+
+    ``base_url`` defaults to the public API; point it at the mock LLM server
+    (src/mock_llm) or a proxy to run the engine without real providers.
+    """
+
+    name: str
+    default_base_url: str
+
+    def __init__(self, base_url: Optional[str] = None):
+        self.base_url = (base_url or self.default_base_url).rstrip("/")
+
+    @abstractmethod
+    async def complete(
+        self,
+        client: httpx.AsyncClient,
+        api_key: str,
+        model: str,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None
+    ) -> dict:
+        """
+        Run one chat completion.
+
+        Returns:
+            Dict with output, prompt_tokens and completion_tokens
+
+        Raises:
+            Exception: If the provider returns a non-200 response
+        """
+
+    def _raise_for_status(self, response: httpx.Response) -> None:
+        if response.status_code != 200:
+            raise Exception(f"{self.name.capitalize()} API Error: {response.text}")
+
+
+class OpenAIProvider(LLMProvider):
+    name = "openai"
+    default_base_url = "https://api.openai.com/v1"
+
+    async def complete(self, client, api_key, model, system_prompt, user_prompt, temperature=0.7, max_tokens=None) -> dict:
+        response = await client.post(
+            f"{self.base_url}/chat/completions",
+            headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
+            json={
+                "model": model,
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                "temperature": temperature,
+                "max_tokens": max_tokens
+            }
+        )
+        self._raise_for_status(response)
+
+        data = response.json()
+        usage = data.get("usage", {})
+        return {
+            "output": data["choices"][0]["message"]["content"],
+            "prompt_tokens": usage.get("prompt_tokens", 0),
+            "completion_tokens": usage.get("completion_tokens", 0)
+        }
+
+
+class GoogleProvider(LLMProvider):
+    name = "google"
+    default_base_url = "https://generativelanguage.googleapis.com/v1beta"
+
+    async def complete(self, client, api_key, model, system_prompt, user_prompt, temperature=0.7, max_tokens=None) -> dict:
+        response = await client.post(
+            f"{self.base_url}/models/{model}:generateContent?key={api_key}",
+            headers={"Content-Type": "application/json"},
+            json={
+                "contents": [{
+                    "parts": [{"text": f"{system_prompt}\n\nUser: {user_prompt}"}]
+                }],
+                "generationConfig": {
+                    "temperature": temperature,
+                    "maxOutputTokens": max_tokens
+                }
+            }
+        )
+        self._raise_for_status(response)
+
+        data = response.json()
+        usage = data.get("usageMetadata", {})
+        return {
+            "output": data["candidates"][0]["content"]["parts"][0]["text"],
+            "prompt_tokens": usage.get("promptTokenCount", 0),
+            "completion_tokens": usage.get("candidatesTokenCount", 0)
+        }
+
+
+def get_llm_provider(name: str) -> LLMProvider:
+    """Provider for a model_provider name, using the configured base URLs."""
+    from src.common.config import settings
+
+    if name == "openai":
+        return OpenAIProvider(settings.OPENAI_BASE_URL)
+    if name == "google":
+        return GoogleProvider(settings.GEMINI_BASE_URL)
+    raise Exception(f"Unsupported provider: {name}")
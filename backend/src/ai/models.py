@@ -1,13 +1,13 @@
 import uuid
 from datetime import datetime
 from sqlalchemy import Column, String, Boolean, ForeignKey, DateTime, Text, JSON, Numeric
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import relationship
 from src.common.database import Base
 import pgvector.sqlalchemy
 
 
-from sqlalchemy import Column, String, Boolean, ForeignKey, DateTime, Text, JSON, Numeric, Enum, Integer
+from sqlalchemy import Column, String, Boolean, ForeignKey, DateTime, Text, JSON, Numeric, Enum, Integer, BigInteger, Date
 import enum
 from src.auth.models import Company, User
 from src.config.models import IntegrationRegistry
@@ -37,23 +37,23 @@ class HierarchicalEntity(Base):
     name = Column(String, nullable=False)
     display_name = Column(String, nullable=True)
     description = Column(Text, nullable=True)
-    tags = Column(JSON, nullable=True) # ["tag1", "tag2"]
+    tags = Column(JSONB, nullable=True) # ["tag1", "tag2"]
     
     # New unified structure fields
-    identity = Column(JSON, nullable=True)
-    hierarchy = Column(JSON, nullable=True)
-    logic_gate = Column(JSON, nullable=True)
-    planning = Column(JSON, nullable=True)
-    capabilities = Column(JSON, nullable=True)
-    governance = Column(JSON, nullable=True)
-    io_contract = Column(JSON, nullable=True)
-    observability = Column(JSON, nullable=True)
-    metadata_extensions = Column(JSON, nullable=True)
+    identity = Column(JSONB, nullable=True)
+    hierarchy = Column(JSONB, nullable=True)
+    logic_gate = Column(JSONB, nullable=True)
+    planning = Column(JSONB, nullable=True)
+    capabilities = Column(JSONB, nullable=True)
+    governance = Column(JSONB, nullable=True)
+    io_contract = Column(JSONB, nullable=True)
+    observability = Column(JSONB, nullable=True)
+    metadata_extensions = Column(JSONB, nullable=True)
 
     # Legacy fields (kept for compatibility during transition)
-    static_plan = Column(JSON, nullable=True)
-    llm_config = Column(JSON, nullable=True)
-    toolkit = Column(JSON, nullable=True)
+    static_plan = Column(JSONB, nullable=True)
+    llm_config = Column(JSONB, nullable=True)
+    toolkit = Column(JSONB, nullable=True)
     is_active = Column(Boolean, default=True)
     
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -71,10 +71,10 @@ class ExecutionRun(Base):
     parent_run_id = Column(UUID(as_uuid=True), ForeignKey("execution_runs.id"), nullable=True)
     company_id = Column(UUID(as_uuid=True), ForeignKey("companies.id"), nullable=False)
     status = Column(String, default="PENDING")
-    input_data = Column(JSON, nullable=True)
-    dynamic_plan = Column(JSON, nullable=True)
-    result_data = Column(JSON, nullable=True)
-    context_state = Column(JSON, nullable=True)
+    input_data = Column(JSONB, nullable=True)
+    dynamic_plan = Column(JSONB, nullable=True)
+    result_data = Column(JSONB, nullable=True)
+    context_state = Column(JSONB, nullable=True)
     error_message = Column(Text, nullable=True)
     
     # Metrics and Tracing
@@ -97,6 +97,7 @@ class ExecutionRun(Base):
     tool_logs = relationship("ToolInteractionLog", back_populates="run")
 
 class LLMInteractionLog(Base):
+    """Partitioned monthly on created_at (see src/ai/partitions.py)."""
     __tablename__ = "llm_interaction_logs"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -111,11 +112,13 @@ class LLMInteractionLog(Base):
     cost_usd = Column(Numeric(10, 6), default=0)
     reasoning_mode = Column(String, nullable=True)
     log_metadata = Column(JSON, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # Partition key, so part of the primary key
+    created_at = Column(DateTime, primary_key=True, default=datetime.utcnow)
 
     run = relationship("ExecutionRun", back_populates="llm_logs")
 
 class ToolInteractionLog(Base):
+    """Partitioned monthly on created_at (see src/ai/partitions.py)."""
     __tablename__ = "tool_interaction_logs"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -129,7 +132,8 @@ class ToolInteractionLog(Base):
     error_message = Column(Text, nullable=True)
     latency_ms = Column(Integer, nullable=True)
     log_metadata = Column(JSON, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # Partition key, so part of the primary key
+    created_at = Column(DateTime, primary_key=True, default=datetime.utcnow)
 
     run = relationship("ExecutionRun", back_populates="tool_logs")
 
@@ -153,10 +157,12 @@ class HumanApproval(Base):
     reviewer = relationship("User")
 
 class UsageLog(Base):
+    """Partitioned monthly on timestamp (see src/ai/partitions.py)."""
     __tablename__ = "usage_logs"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    # Partition key, so part of the primary key
+    timestamp = Column(DateTime, primary_key=True, default=datetime.utcnow)
     company_id = Column(UUID(as_uuid=True), ForeignKey("companies.id"), nullable=False)
     run_id = Column(UUID(as_uuid=True), ForeignKey("execution_runs.id"), nullable=True)
     sku_id = Column(UUID(as_uuid=True), ForeignKey("integration_registry.id"), nullable=False)
@@ -168,6 +174,27 @@ class UsageLog(Base):
     run = relationship("ExecutionRun", back_populates="usage_logs")
     sku = relationship("IntegrationRegistry")
 
+class CompanyCounter(Base):
+    """Running per-company totals, maintained on write (see src/ai/counters.py)."""
+    __tablename__ = "company_counters"
+
+    company_id = Column(UUID(as_uuid=True), ForeignKey("companies.id"), primary_key=True)
+    entities_total = Column(Integer, nullable=False, default=0, server_default="0")
+    documents_total = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class CompanyDailyStats(Base):
+    """Per-company, per-UTC-day root execution rollups for the dashboard and charts."""
+    __tablename__ = "company_daily_stats"
+
+    company_id = Column(UUID(as_uuid=True), ForeignKey("companies.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    executions = Column(Integer, nullable=False, default=0, server_default="0")
+    completed = Column(Integer, nullable=False, default=0, server_default="0")
+    failed = Column(Integer, nullable=False, default=0, server_default="0")
+    cost_usd = Column(Numeric(18, 6), nullable=False, default=0, server_default="0")
+    tokens = Column(BigInteger, nullable=False, default=0, server_default="0")
+
 class Document(Base):
     __tablename__ = "documents"
 
@@ -178,6 +205,8 @@ class Document(Base):
     file_type = Column(String, nullable=False)  # pdf, docx, txt
     file_size = Column(String, nullable=True)
     upload_status = Column(String, default="processing")  # processing, completed, failed
+    upload_error = Column(Text, nullable=True)  # reason when upload_status is failed
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -189,10 +218,12 @@ class DocumentChunk(Base):
     __tablename__ = "document_chunks"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    document_id = Column(UUID(as_uuid=True), ForeignKey("documents.id"), nullable=False)
+    document_id = Column(UUID(as_uuid=True), ForeignKey("documents.id"), nullable=False, index=True)
     chunk_index = Column(String, nullable=False)  # Position in document
     content = Column(Text, nullable=False)
     embedding = Column(pgvector.sqlalchemy.Vector(768), nullable=True)  # 768 for Gemini embeddings
+    content_hash = Column(String(64), nullable=True, index=True)  # sha256 of normalized content
+    embedding_model = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     document = relationship("Document", back_populates="chunks")
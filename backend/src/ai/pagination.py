@@ -0,0 +1,38 @@
+"""Keyset pagination helpers for (created_at, id) ordered listings."""
+
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+from uuid import UUID
+import base64
+import binascii
+import json
+
+from fastapi import HTTPException
+
+
+def encode_cursor(created_at: datetime, row_id: UUID) -> str:
+    """Cursor pointing just past the given row."""
+    payload = json.dumps([created_at.isoformat(), str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """
+    Parse a cursor from encode_cursor().
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), UUID(row_id)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+
+
+def to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Timestamps are stored as naive UTC; convert aware filter values to match."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
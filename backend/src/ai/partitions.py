@@ -0,0 +1,197 @@
+"""
+Monthly range partitions for the append-only log tables.
+
+``llm_interaction_logs`` and ``tool_interaction_logs`` are partitioned on
+``created_at`` and ``usage_logs`` on ``timestamp``, one partition per UTC
+calendar month named ``<table>_yYYYYmMM``. The worker's daily
+``maintain_log_partitions`` cron keeps the next few months created ahead of
+time (there is no default partition, so a missing month would reject
+inserts) and archives months past the retention window: each one is
+COPYed to a gzip'd CSV, then detached and dropped. Vacuum and backups only
+see the retained months, and queries bounded on the partition key are
+pruned to the months they cover.
+
+Every worker replica schedules the cron, so the maintenance runs under a
+Postgres advisory lock (``maintenance_lock``) and replicas that do not get
+it skip the run.
+"""
+
+from contextlib import asynccontextmanager
+from datetime import date, datetime
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional
+import asyncio
+import gzip
+import os
+import re
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+PARTITIONED_TABLES: Dict[str, str] = {
+    "llm_interaction_logs": "created_at",
+    "tool_interaction_logs": "created_at",
+    "usage_logs": "timestamp",
+}
+
+_PARTITION_SUFFIX = re.compile(r"_y(\d{4})m(\d{2})$")
+
+# pg_advisory_lock key for partition maintenance (arbitrary, app-wide)
+MAINTENANCE_LOCK_KEY = 0x6C6F6770  # "logp"
+
+
+def month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_y{month.year:04d}m{month.month:02d}"
+
+
+def partition_month(name: str) -> Optional[date]:
+    """Month a partition covers, or None if the name is not a monthly partition."""
+    match = _PARTITION_SUFFIX.search(name)
+    if match is None:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def create_partition_sql(table: str, month: date) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, month)} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    )
+
+
+def expired_partitions(names: List[str], today: date, retention_months: int) -> List[str]:
+    """
+    Partitions entirely older than the retention window, oldest first.
+
+    The current month and the ``retention_months`` before it are kept;
+    ``retention_months <= 0`` keeps everything.
+    """
+    if retention_months <= 0:
+        return []
+    cutoff = add_months(month_start(today), -retention_months)
+    expired = [(partition_month(name), name) for name in names]
+    return [name for month, name in sorted(expired) if month is not None and month < cutoff]
+
+
+async def list_partitions(db: AsyncSession, table: str) -> List[str]:
+    result = await db.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = CAST(:table AS regclass) ORDER BY c.relname"
+        ),
+        {"table": table}
+    )
+    return list(result.scalars().all())
+
+
+async def ensure_partitions(
+    db: AsyncSession,
+    today: Optional[date] = None,
+    months_ahead: Optional[int] = None
+) -> List[str]:
+    """
+    Create any missing partitions from the current month through ``months_ahead`` months later.
+
+    Returns:
+        Names of the partitions created; the caller commits
+    """
+    from src.common.config import settings
+
+    today = today or datetime.utcnow().date()
+    if months_ahead is None:
+        months_ahead = settings.LOG_PARTITION_PREMAKE_MONTHS
+    current = month_start(today)
+
+    created = []
+    for table in PARTITIONED_TABLES:
+        existing = set(await list_partitions(db, table))
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            if partition_name(table, month) not in existing:
+                await db.execute(text(create_partition_sql(table, month)))
+                created.append(partition_name(table, month))
+    return created
+
+
+async def export_partition(db: AsyncSession, name: str, archive_dir: str) -> Path:
+    """
+    COPY a partition to ``<archive_dir>/<name>.csv.gz``.
+
+    The file is written under a temporary name and renamed once complete,
+    so a half-written archive never looks finished.
+    """
+    path = Path(archive_dir) / f"{name}.csv.gz"
+    partial = path.with_name(path.name + ".partial")
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    connection = await db.connection()
+    raw = await connection.get_raw_connection()
+    with gzip.open(partial, "wb") as archive:
+        async def write(chunk: bytes) -> None:
+            await asyncio.to_thread(archive.write, chunk)
+
+        await raw.driver_connection.copy_from_table(name, output=write, format="csv", header=True)
+    os.replace(partial, path)
+    return path
+
+
+async def archive_expired_partitions(
+    db: AsyncSession,
+    today: Optional[date] = None,
+    retention_months: Optional[int] = None,
+    archive_dir: Optional[str] = None
+) -> List[Path]:
+    """
+    Export, detach and drop every partition past the retention window.
+
+    Each partition is committed separately; the export happens before the
+    detach, so a failed export leaves the partition attached and it is
+    retried on the next run.
+
+    Returns:
+        Paths of the archives written
+    """
+    from src.common.config import settings
+
+    today = today or datetime.utcnow().date()
+    if retention_months is None:
+        retention_months = settings.LOG_RETENTION_MONTHS
+    archive_dir = archive_dir or settings.LOG_ARCHIVE_DIR
+
+    archived = []
+    for table in PARTITIONED_TABLES:
+        for name in expired_partitions(await list_partitions(db, table), today, retention_months):
+            archived.append(await export_partition(db, name, archive_dir))
+            await db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+            await db.execute(text(f"DROP TABLE {name}"))
+            await db.commit()
+    return archived
+
+
+@asynccontextmanager
+async def maintenance_lock(engine: AsyncEngine) -> AsyncIterator[bool]:
+    """
+    Hold the partition maintenance advisory lock for the block.
+
+    The lock is session-level on a dedicated connection, so it stays held
+    across the per-partition commits of the maintenance session.
+
+    Yields:
+        True if this process holds the lock, False if another one does
+    """
+    async with engine.connect() as conn:
+        locked = await conn.scalar(text("SELECT pg_try_advisory_lock(:key)"), {"key": MAINTENANCE_LOCK_KEY})
+        try:
+            yield bool(locked)
+        finally:
+            if locked:
+                await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MAINTENANCE_LOCK_KEY})
@@ -0,0 +1,147 @@
+"""
+Compiles an entity version into an immutable execution plan.
+
+Everything ``execute_run`` used to redo per run is resolved once here:
+steps are validated into ``PlanStep`` objects, prompt and query templates
+are parsed, the reasoning config (with the legacy ``llm_config``
+fallback), persona prompt and context settings are resolved.
+
+Compiled plans are cached in process by entity id and checked against
+``(version, updated_at)``, so an edit is picked up by every worker on the
+next run even without an explicit ``invalidate``.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any, Mapping, Optional, Tuple
+from uuid import UUID
+import copy
+
+from src.ai.artifact_store import uses_references
+from src.ai.context_assembler import DEFAULT_CONTEXT_PRIORITY, DEFAULT_LAST_N_ITERATIONS
+from src.ai.schemas import PlanStep, StepType
+from src.ai.templating import Template
+
+DEFAULT_SYSTEM_PROMPT = "You are a helpful assistant."
+DEFAULT_MODEL_CONFIG = {"model_provider": "openai", "model_name": "gpt-4o"}
+DEFAULT_QUERY_TEMPLATE = "{{input}}"
+
+VersionKey = Tuple[Any, Optional[datetime]]
+
+
+@dataclass(frozen=True)
+class CompiledStep:
+    step: PlanStep
+    prompt: Optional[Template]
+    query: Optional[Template]
+
+
+@dataclass(frozen=True)
+class CompiledPlan:
+    entity_id: UUID
+    version_key: VersionKey
+    steps: Tuple[CompiledStep, ...]
+    document: Mapping[str, Any]  # the static plan as stored on the run
+    model_config: Mapping[str, Any]
+    system_prompt: str
+    max_context_tokens: int
+    # Context assembly for template-less THOUGHT steps (see src/ai/context_assembler.py)
+    context_priority: Tuple[str, ...]
+    iteration_context_mode: str
+    last_n_iterations: int
+    # ArtifactHandling REFERENCE mode (see src/ai/artifact_store.py)
+    store_artifacts: bool
+    review_enabled: bool
+
+    @property
+    def final_step(self) -> Optional[str]:
+        return self.steps[-1].step.name if self.steps else None
+
+
+def version_key(entity) -> VersionKey:
+    return (entity.version, entity.updated_at)
+
+
+def _freeze(value: Optional[dict]) -> Mapping[str, Any]:
+    return MappingProxyType(copy.deepcopy(value or {}))
+
+
+def compile_plan(entity) -> CompiledPlan:
+    """
+    Build the execution plan for an entity's current version.
+
+    Raises:
+        pydantic.ValidationError: If a step in the static plan is invalid
+    """
+    planning = entity.planning or {}
+    document = planning.get("static_plan", {}) or {}
+
+    steps = []
+    for raw in document.get("steps", []):
+        step = PlanStep(**raw)
+        prompt = Template(step.target.prompt_template) if step.target.prompt_template else None
+        query = None
+        if step.type == StepType.RETRIEVAL:
+            query = Template(step.target.query_template or DEFAULT_QUERY_TEMPLATE)
+        steps.append(CompiledStep(step, prompt, query))
+
+    logic_gate = entity.logic_gate or {}
+    model_config = logic_gate.get("reasoning_config", {}) or entity.llm_config or DEFAULT_MODEL_CONFIG
+    identity = entity.identity or {}
+    capabilities = entity.capabilities or {}
+    context_engineering = capabilities.get("context_engineering", {}) or {}
+    loop_control = planning.get("loop_control", {}) or {}
+
+    return CompiledPlan(
+        entity_id=entity.id,
+        version_key=version_key(entity),
+        steps=tuple(steps),
+        document=_freeze(document),
+        model_config=_freeze(model_config),
+        system_prompt=identity.get("persona", {}).get("system_prompt", DEFAULT_SYSTEM_PROMPT),
+        max_context_tokens=context_engineering.get("max_context_tokens", 4096),
+        context_priority=tuple(context_engineering.get("context_priority", DEFAULT_CONTEXT_PRIORITY)),
+        iteration_context_mode=loop_control.get("iteration_context_mode", "FULL_HISTORY"),
+        last_n_iterations=loop_control.get("last_n_iterations", DEFAULT_LAST_N_ITERATIONS),
+        store_artifacts=uses_references(capabilities),
+        review_enabled=bool(logic_gate.get("review_mechanism", {}).get("enabled")),
+    )
+
+
+class PlanCache:
+    """LRU of compiled plans, one per entity, valid for a single entity version."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._plans: "OrderedDict[UUID, CompiledPlan]" = OrderedDict()
+
+    def get(self, entity_id: UUID, key: VersionKey) -> Optional[CompiledPlan]:
+        plan = self._plans.get(entity_id)
+        if plan is None or plan.version_key != key:
+            return None
+        self._plans.move_to_end(entity_id)
+        return plan
+
+    def put(self, plan: CompiledPlan) -> None:
+        if self.max_entries <= 0:
+            return
+        self._plans[plan.entity_id] = plan
+        self._plans.move_to_end(plan.entity_id)
+        while len(self._plans) > self.max_entries:
+            self._plans.popitem(last=False)
+
+    def invalidate(self, entity_id: UUID) -> None:
+        self._plans.pop(entity_id, None)
+
+
+_plan_cache: Optional[PlanCache] = None
+
+
+def get_plan_cache() -> PlanCache:
+    global _plan_cache
+    if _plan_cache is None:
+        from src.common.config import settings
+        _plan_cache = PlanCache(settings.PLAN_CACHE_SIZE)
+    return _plan_cache
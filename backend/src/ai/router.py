@@ -1,16 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile
+from fastapi import APIRouter, Depends, File, UploadFile, Query
 from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
 from uuid import UUID
 from typing import List, Optional
 from src.common.database import get_db
 from src.auth.dependencies import get_current_user, get_current_user_from_query
 from src.auth.models import User
 from src.ai.schemas import (
-    HierarchicalEntityCreate, HierarchicalEntityUpdate, HierarchicalEntityResponse, 
-    ExecutionRunCreate, ExecutionRunResponse, ExecutionRunSummary, EntityType,
-    DocumentResponse, DocumentSearchResult
+    HierarchicalEntityCreate, HierarchicalEntityUpdate, HierarchicalEntityResponse, EntityLibraryPage,
+    ExecutionRunCreate, ExecutionRunResponse, ExecutionRunPage, ArtifactResponse, RunStatus, EntityType, EntityStatus,
+    StatsTimeseriesPoint,
+    DocumentResponse, DocumentSearchResult, DocumentBatchSearchRequest, DocumentBatchSearchResult
 )
 from src.ai.service import AIService
+from src.common.blob_store import get_blob_store, iter_upload
 
 router = APIRouter(prefix="/ai", tags=["AI Hierarchical Agent Platform"])
 
@@ -27,11 +30,37 @@ async def create_entity(
 @router.get("/entities", response_model=List[HierarchicalEntityResponse])
 async def list_entities(
     type: Optional[EntityType] = None,
+    tag: Optional[str] = None,
+    model_name: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     service = AIService(db)
-    return await service.get_entities(current_user.company_id, type)
+    return await service.get_entities(current_user.company_id, type, tag=tag, model_name=model_name)
+
+@router.get("/entities/library", response_model=EntityLibraryPage)
+async def list_entity_library(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    type: Optional[EntityType] = None,
+    status: Optional[EntityStatus] = None,
+    tag: Optional[str] = None,
+    model_name: Optional[str] = None,
+    include_stats: bool = False,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    service = AIService(db)
+    return await service.get_entity_library(
+        current_user.company_id,
+        limit=limit,
+        cursor=cursor,
+        type=type.value if type else None,
+        status=status.value if status else None,
+        tag=tag,
+        model_name=model_name,
+        include_stats=include_stats
+    )
 
 @router.get("/entities/{entity_id}", response_model=HierarchicalEntityResponse)
 async def get_entity(
@@ -71,6 +100,15 @@ async def get_dashboard_stats(
     service = AIService(db)
     return await service.get_dashboard_stats(current_user.company_id)
 
+@router.get("/stats/timeseries", response_model=List[StatsTimeseriesPoint])
+async def get_stats_timeseries(
+    days: int = Query(30, ge=1, le=366),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    service = AIService(db)
+    return await service.get_stats_timeseries(current_user.company_id, days)
+
 # --- Executions ---
 @router.post("/execute", response_model=ExecutionRunResponse)
 async def trigger_execution(
@@ -81,13 +119,33 @@ async def trigger_execution(
     service = AIService(db)
     return await service.trigger_execution(execution_in, current_user.company_id)
 
-@router.get("/executions", response_model=List[ExecutionRunSummary])
+@router.get("/executions", response_model=ExecutionRunPage)
 async def list_executions(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    status: Optional[RunStatus] = None,
+    entity_id: Optional[UUID] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    min_cost: Optional[float] = Query(None, ge=0),
+    input_key: Optional[str] = Query(None, description="Only runs whose input_data has this top-level key"),
+    fields: Optional[str] = Query(None, description="Comma-separated ExecutionRunSummary fields to return"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     service = AIService(db)
-    return await service.get_executions(current_user.company_id)
+    return await service.get_executions(
+        current_user.company_id,
+        limit=limit,
+        cursor=cursor,
+        status=status.value if status else None,
+        entity_id=entity_id,
+        created_after=created_after,
+        created_before=created_before,
+        min_cost=min_cost,
+        input_key=input_key,
+        fields=[f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    )
 
 @router.get("/executions/{execution_id}", response_model=ExecutionRunResponse)
 async def get_execution(
@@ -99,6 +157,16 @@ async def get_execution(
     execution = await service.get_execution(execution_id, current_user.company_id)
     return execution
 
+@router.get("/executions/{execution_id}/artifacts/{digest}", response_model=ArtifactResponse)
+async def get_execution_artifact(
+    execution_id: UUID,
+    digest: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    service = AIService(db)
+    return await service.get_execution_artifact(execution_id, digest, current_user.company_id)
+
 @router.get("/executions/{execution_id}/stream")
 async def stream_execution(
     execution_id: UUID,
@@ -185,22 +253,52 @@ async def upload_document(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    # Read file content
-    file_content = await file.read()
+    # Stream the upload to blob storage; only the key travels through the job queue
+    blob_key, file_size = await get_blob_store().write_stream(iter_upload(file))
     
     # Get file extension
     file_type = file.filename.split('.')[-1].lower() if '.' in file.filename else 'txt'
     
     service = AIService(db)
-    document = await service.upload_document(
-        file_content=file_content,
-        filename=file.filename,
-        file_type=file_type,
-        company_id=current_user.company_id,
-        entity_id=entity_id
-    )
+    try:
+        document = await service.upload_document(
+            blob_key=blob_key,
+            file_size=file_size,
+            filename=file.filename,
+            file_type=file_type,
+            company_id=current_user.company_id,
+            entity_id=entity_id
+        )
+    except Exception:
+        await get_blob_store().delete(blob_key)
+        raise
     return {"id": str(document.id), "status": document.upload_status}
 
+@router.put("/documents/{document_id}", response_model=dict)
+async def update_document(
+    document_id: UUID,
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    blob_key, file_size = await get_blob_store().write_stream(iter_upload(file))
+    file_type = file.filename.split('.')[-1].lower() if '.' in file.filename else 'txt'
+    
+    service = AIService(db)
+    try:
+        document = await service.update_document(
+            document_id=document_id,
+            blob_key=blob_key,
+            file_size=file_size,
+            filename=file.filename,
+            file_type=file_type,
+            company_id=current_user.company_id
+        )
+    except Exception:
+        await get_blob_store().delete(blob_key)
+        raise
+    return {"id": str(document.id), "status": document.upload_status, "version": document.version}
+
 @router.get("/documents", response_model=List[DocumentResponse])
 async def list_documents(
     entity_id: Optional[UUID] = None,
@@ -235,3 +333,33 @@ async def search_documents(
         }
         for r in results
     ]
+
+@router.post("/documents/search/batch", response_model=List[DocumentBatchSearchResult])
+async def search_documents_batch(
+    request: DocumentBatchSearchRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    service = AIService(db)
+    results = await service.search_documents_batch(
+        queries=request.queries,
+        company_id=current_user.company_id,
+        entity_id=request.entity_id,
+        top_k=request.top_k
+    )
+    return [
+        {
+            "query": query,
+            "results": [
+                {
+                    "chunk_id": r.chunk_id,
+                    "document_id": r.document_id,
+                    "filename": r.filename,
+                    "content": r.content,
+                    "similarity": float(r.similarity)
+                }
+                for r in rows
+            ]
+        }
+        for query, rows in zip(request.queries, results)
+    ]
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List
-from datetime import datetime
+from datetime import date, datetime
 from uuid import UUID
 from enum import Enum
 
@@ -52,6 +52,7 @@ class StepType(str, Enum):
     ACTION = "ACTION"
     TOOL_CALL = "TOOL_CALL"
     CHILD_ENTITY_INVOCATION = "CHILD_ENTITY_INVOCATION"
+    RETRIEVAL = "RETRIEVAL"
 
 class PersonaExample(BaseModel):
     scenario: str
@@ -118,6 +119,9 @@ class PlanStepTarget(BaseModel):
     entity_id: Optional[UUID] = None
     tool_id: Optional[str] = None
     prompt_template: Optional[str] = None
+    # RETRIEVAL steps: documents of entity_id (all company documents if unset)
+    query_template: Optional[str] = None
+    top_k: int = 5
 
 class PlanStep(BaseModel):
     step_id: UUID
@@ -156,6 +160,7 @@ class LoopControl(BaseModel):
     max_iterations: Optional[int] = 1
     convergence_criteria: List[ConvergenceCriterion] = []
     iteration_context_mode: str = "FULL_HISTORY" # FULL_HISTORY | SUMMARIZED | LAST_N
+    last_n_iterations: int = 3 # outputs kept in LAST_N mode
     summary_every_n_iterations: Optional[int] = None
 
 class Planning(BaseModel):
@@ -268,6 +273,31 @@ class HierarchicalEntityResponse(HierarchicalEntityBase):
     class Config:
         from_attributes = True
 
+class EntityRunStats(BaseModel):
+    run_count: int = 0
+    last_run_at: Optional[datetime] = None
+    success_rate: Optional[float] = None  # completed / (completed + failed)
+
+class EntityLibraryItem(BaseModel):
+    id: UUID
+    name: str
+    display_name: Optional[str] = None
+    description: Optional[str] = None
+    type: EntityType
+    version: str
+    status: EntityStatus
+    tags: Optional[List[str]] = None
+    parent_id: Optional[UUID] = None
+    model_name: Optional[str] = None
+    step_count: int = 0
+    created_at: datetime
+    updated_at: datetime
+    stats: Optional[EntityRunStats] = None
+
+class EntityLibraryPage(BaseModel):
+    items: List[EntityLibraryItem]
+    next_cursor: Optional[str] = None
+
 # Execution Run Schemas
 class ExecutionRunCreate(BaseModel):
     entity_id: UUID
@@ -350,6 +380,24 @@ class ExecutionRunResponse(ExecutionRunSummary):
 
 ExecutionRunResponse.model_rebuild()
 
+class ArtifactResponse(BaseModel):
+    digest: str
+    kind: str  # text | json
+    size: int
+    content: Any
+
+class ExecutionRunPage(BaseModel):
+    items: List[Dict[str, Any]]  # ExecutionRunSummary, limited to the requested fields
+    next_cursor: Optional[str] = None
+
+class StatsTimeseriesPoint(BaseModel):
+    day: date
+    executions: int = 0
+    completed: int = 0
+    failed: int = 0
+    cost_usd: float = 0.0
+    tokens: int = 0
+
 # Document Schemas
 class DocumentUploadResponse(BaseModel):
     id: UUID
@@ -369,6 +417,8 @@ class DocumentResponse(BaseModel):
     file_type: str
     file_size: Optional[str]
     upload_status: str
+    upload_error: Optional[str] = None
+    version: int = 1
     created_at: datetime
     updated_at: datetime
 
@@ -386,3 +436,12 @@ class DocumentSearchResult(BaseModel):
     filename: str
     content: str
     similarity: float
+
+class DocumentBatchSearchRequest(BaseModel):
+    queries: List[str] = Field(..., min_length=1, max_length=32)
+    entity_id: Optional[UUID] = None
+    top_k: int = Field(5, ge=1, le=50)
+
+class DocumentBatchSearchResult(BaseModel):
+    query: str
+    results: List[DocumentSearchResult]
@@ -1,5 +1,5 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc, func
+from sqlalchemy import String, literal, select, desc, func
 from fastapi import HTTPException
 from uuid import UUID, uuid4
 from arq import create_pool
@@ -11,9 +11,22 @@ from src.ai.models import (
 from src.ai.schemas import (
     HierarchicalEntityCreate, HierarchicalEntityUpdate, ExecutionRunCreate
 )
+from src.ai import counters
+from src.ai.plan_compiler import get_plan_cache
 from datetime import datetime
+from typing import List, Optional
 import json
 
+
+def entity_model_name():
+    """
+    ``logic_gate -> 'reasoning_config' ->> 'model_name'``, with the keys
+    rendered inline so the expression matches ix_hierarchical_entities_model_name.
+    """
+    def key(name):
+        return literal(name, literal_execute=True)
+    return HierarchicalEntity.logic_gate.op("->")(key("reasoning_config")).op("->>", return_type=String)(key("model_name"))
+
 class AIService:
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -26,34 +39,40 @@ class AIService:
         # Flatten identity if provided as nested model to JSONB column
         entity = HierarchicalEntity(**entity_data, company_id=company_id)
         self.db.add(entity)
+        await counters.record_entities(self.db, company_id, 1)
         await self.db.commit()
-        
-        # Reload with relationships for schema
-        from sqlalchemy.orm import selectinload
-        result = await self.db.execute(
-            select(HierarchicalEntity)
-            .options(
-                selectinload(HierarchicalEntity.execution_runs)
-            )
-            .where(HierarchicalEntity.id == entity.id)
-        )
-        return result.scalar_one()
+        await self.db.refresh(entity)
+        return entity
 
-    async def get_entities(self, company_id: UUID, type: EntityType = None) -> list[HierarchicalEntity]:
-        from sqlalchemy.orm import selectinload
-        query = select(HierarchicalEntity).where(HierarchicalEntity.company_id == company_id)
+    @staticmethod
+    def _filter_entities(query, type=None, status=None, tag: Optional[str] = None, model_name: Optional[str] = None):
+        """Entity list filters; tag and model_name are served by JSONB indexes."""
         if type:
             query = query.where(HierarchicalEntity.type == type)
-        
-        query = query.options(selectinload(HierarchicalEntity.execution_runs))
+        if status:
+            query = query.where(HierarchicalEntity.status == status)
+        if tag:
+            query = query.where(HierarchicalEntity.tags.contains([tag]))
+        if model_name:
+            query = query.where(entity_model_name() == model_name)
+        return query
+
+    async def get_entities(
+        self,
+        company_id: UUID,
+        type: EntityType = None,
+        tag: Optional[str] = None,
+        model_name: Optional[str] = None
+    ) -> list[HierarchicalEntity]:
+        query = select(HierarchicalEntity).where(HierarchicalEntity.company_id == company_id)
+        query = self._filter_entities(query, type=type, tag=tag, model_name=model_name)
+
         result = await self.db.execute(query)
         return result.scalars().all()
 
     async def get_entity(self, entity_id: UUID, company_id: UUID) -> HierarchicalEntity:
-        from sqlalchemy.orm import selectinload
         result = await self.db.execute(
             select(HierarchicalEntity)
-            .options(selectinload(HierarchicalEntity.execution_runs))
             .where(HierarchicalEntity.id == entity_id, HierarchicalEntity.company_id == company_id)
         )
         entity = result.scalar_one_or_none()
@@ -61,6 +80,98 @@ class AIService:
             raise HTTPException(status_code=404, detail="Entity not found")
         return entity
 
+    async def get_entity_library(
+        self,
+        company_id: UUID,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        type: Optional[str] = None,
+        status: Optional[str] = None,
+        tag: Optional[str] = None,
+        model_name: Optional[str] = None,
+        include_stats: bool = False
+    ) -> dict:
+        """
+        One page of entity summaries for the library view, newest first.
+
+        Selects only the summary columns plus the model name and step count
+        extracted in SQL, never the full config documents or the entity's
+        runs. With ``include_stats``, run count, last run and success rate
+        come from one grouped query over the page's entities.
+
+        Returns:
+            Dict with items and next_cursor (None on the last page)
+        """
+        from sqlalchemy import case, tuple_
+        from src.ai.pagination import decode_cursor, encode_cursor
+
+        steps = HierarchicalEntity.planning["static_plan"]["steps"]
+        query = (
+            select(
+                HierarchicalEntity.id,
+                HierarchicalEntity.name,
+                HierarchicalEntity.display_name,
+                HierarchicalEntity.description,
+                HierarchicalEntity.type,
+                HierarchicalEntity.version,
+                HierarchicalEntity.status,
+                HierarchicalEntity.tags,
+                HierarchicalEntity.parent_id,
+                HierarchicalEntity.created_at,
+                HierarchicalEntity.updated_at,
+                entity_model_name().label("model_name"),
+                case((func.jsonb_typeof(steps) == "array", func.jsonb_array_length(steps)), else_=0).label("step_count"),
+            )
+            .where(HierarchicalEntity.company_id == company_id)
+        )
+        query = self._filter_entities(query, type=type, status=status, tag=tag, model_name=model_name)
+        if cursor:
+            cursor_created_at, cursor_id = decode_cursor(cursor)
+            query = query.where(
+                tuple_(HierarchicalEntity.created_at, HierarchicalEntity.id) < tuple_(cursor_created_at, cursor_id)
+            )
+
+        result = await self.db.execute(
+            query.order_by(HierarchicalEntity.created_at.desc(), HierarchicalEntity.id.desc()).limit(limit + 1)
+        )
+        rows = result.mappings().all()
+        items = [dict(row) for row in rows[:limit]]
+
+        if include_stats:
+            stats = await self._entity_run_stats(company_id, [item["id"] for item in items])
+            for item in items:
+                item["stats"] = stats.get(item["id"], {"run_count": 0, "last_run_at": None, "success_rate": None})
+
+        next_cursor = encode_cursor(items[-1]["created_at"], items[-1]["id"]) if len(rows) > limit else None
+        return {"items": items, "next_cursor": next_cursor}
+
+    async def _entity_run_stats(self, company_id: UUID, entity_ids: List[UUID]) -> dict:
+        """Run count, last run time and success rate (of finished runs) per entity."""
+        if not entity_ids:
+            return {}
+        from sqlalchemy import case
+
+        completed = func.count(case((ExecutionRun.status == "COMPLETED", 1)))
+        finished = func.count(case((ExecutionRun.status.in_(["COMPLETED", "FAILED"]), 1)))
+        result = await self.db.execute(
+            select(
+                ExecutionRun.entity_id,
+                func.count(ExecutionRun.id).label("run_count"),
+                func.max(ExecutionRun.created_at).label("last_run_at"),
+                (completed * 1.0 / func.nullif(finished, 0)).label("success_rate"),
+            )
+            .where(ExecutionRun.company_id == company_id, ExecutionRun.entity_id.in_(entity_ids))
+            .group_by(ExecutionRun.entity_id)
+        )
+        return {
+            row.entity_id: {
+                "run_count": row.run_count,
+                "last_run_at": row.last_run_at,
+                "success_rate": round(float(row.success_rate), 4) if row.success_rate is not None else None,
+            }
+            for row in result
+        }
+
     async def update_entity(self, entity_id: UUID, entity_in: HierarchicalEntityUpdate, company_id: UUID) -> HierarchicalEntity:
         entity = await self.get_entity(entity_id, company_id)
         
@@ -70,13 +181,17 @@ class AIService:
             
         self.db.add(entity)
         await self.db.commit()
+        # Workers see the new updated_at and recompile; this drops the stale plan here
+        get_plan_cache().invalidate(entity_id)
         await self.db.refresh(entity)
         return entity
 
     async def delete_entity(self, entity_id: UUID, company_id: UUID):
         entity = await self.get_entity(entity_id, company_id)
         await self.db.delete(entity)
+        await counters.record_entities(self.db, company_id, -1)
         await self.db.commit()
+        get_plan_cache().invalidate(entity_id)
 
     # Execution
     async def trigger_execution(self, execution_in: ExecutionRunCreate, company_id: UUID) -> ExecutionRun:
@@ -86,9 +201,11 @@ class AIService:
             entity_id=execution_in.entity_id,
             input_data=execution_in.input_data,
             status="PENDING",
-            trace_id=uuid4() # Initialize root trace
+            trace_id=uuid4(), # Initialize root trace
+            created_at=datetime.utcnow()
         )
         self.db.add(execution)
+        await counters.record_run_created(self.db, execution)
         await self.db.commit()
         
         # Load relationships for response schema
@@ -112,42 +229,106 @@ class AIService:
         return execution
 
     async def get_execution(self, execution_id: UUID, company_id: UUID) -> ExecutionRun:
-        from sqlalchemy.orm import selectinload, joinedload
-        
-        # Load detailed trace with logs and approvals
-        result = await self.db.execute(
-            select(ExecutionRun)
-            .options(
-                joinedload(ExecutionRun.entity),
-                selectinload(ExecutionRun.llm_logs),
-                selectinload(ExecutionRun.tool_logs),
-                selectinload(ExecutionRun.human_approvals),
-                selectinload(ExecutionRun.child_runs).selectinload(ExecutionRun.entity),
-                selectinload(ExecutionRun.child_runs).selectinload(ExecutionRun.llm_logs),
-                selectinload(ExecutionRun.child_runs).selectinload(ExecutionRun.tool_logs),
-                selectinload(ExecutionRun.child_runs).selectinload(ExecutionRun.human_approvals),
-                selectinload(ExecutionRun.child_runs).selectinload(ExecutionRun.child_runs).selectinload(ExecutionRun.entity),
-                selectinload(ExecutionRun.child_runs).selectinload(ExecutionRun.child_runs).selectinload(ExecutionRun.llm_logs)
-            )
-            .where(ExecutionRun.id == execution_id, ExecutionRun.company_id == company_id)
-        )
-        execution = result.scalar_one_or_none()
+        from src.ai.trace_loader import load_trace
+
+        # Whole run tree with logs and approvals, in a fixed number of queries
+        execution = await load_trace(self.db, execution_id, company_id)
         if not execution:
             raise HTTPException(status_code=404, detail="Execution not found")
         return execution
 
-    async def get_executions(self, company_id: UUID) -> list[ExecutionRun]:
-        from sqlalchemy.orm import joinedload
-        result = await self.db.execute(
+    async def get_execution_artifact(self, execution_id: UUID, digest: str, company_id: UUID) -> dict:
+        """Full body of an artifact referenced from an execution's trace (loaded on demand)."""
+        from src.ai.artifact_store import REFERENCE_KEY, get_artifact_store, trace_references
+
+        execution = await self.get_execution(execution_id, company_id)
+        # Only artifacts this trace points at are readable through it
+        for reference in trace_references(execution):
+            if reference[REFERENCE_KEY] == digest:
+                return {
+                    "digest": digest,
+                    "kind": reference["kind"],
+                    "size": reference["size"],
+                    "content": await get_artifact_store().load(reference)
+                }
+        raise HTTPException(status_code=404, detail="Artifact not found")
+
+    async def get_executions(
+        self,
+        company_id: UUID,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        status: Optional[str] = None,
+        entity_id: Optional[UUID] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        min_cost: Optional[float] = None,
+        input_key: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> dict:
+        """
+        One page of root executions, newest first.
+
+        Pages are keyset-paginated on (created_at, id), so the cost of a page
+        does not depend on how far back it is. Only the requested ``fields``
+        (ExecutionRunSummary names; all by default) are loaded and returned.
+
+        Returns:
+            Dict with items (list of field dicts) and next_cursor (None on the last page)
+        """
+        from sqlalchemy import tuple_
+        from sqlalchemy.orm import joinedload, load_only
+        from fastapi.encoders import jsonable_encoder
+        from decimal import Decimal
+        from src.ai.pagination import decode_cursor, encode_cursor, to_naive_utc
+        from src.ai.schemas import ExecutionRunSummary, HierarchicalEntityResponse
+
+        available = list(ExecutionRunSummary.model_fields)
+        fields = fields or available
+        unknown = sorted(set(fields) - set(available))
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+
+        columns = [getattr(ExecutionRun, field) for field in fields if field != "entity"]
+        query = (
             select(ExecutionRun)
-            .options(
-                joinedload(ExecutionRun.entity)
-            )
+            .options(load_only(ExecutionRun.id, ExecutionRun.created_at, *columns))
             .where(ExecutionRun.company_id == company_id)
-            .where(ExecutionRun.parent_run_id.is_(None)) # Only show root executions in list
-            .order_by(ExecutionRun.created_at.desc())
+            .where(ExecutionRun.parent_run_id.is_(None))  # Only show root executions in list
         )
-        return result.scalars().all()
+        if "entity" in fields:
+            query = query.options(joinedload(ExecutionRun.entity))
+        if status:
+            query = query.where(ExecutionRun.status == status)
+        if entity_id:
+            query = query.where(ExecutionRun.entity_id == entity_id)
+        if created_after:
+            query = query.where(ExecutionRun.created_at >= to_naive_utc(created_after))
+        if created_before:
+            query = query.where(ExecutionRun.created_at < to_naive_utc(created_before))
+        if min_cost is not None:
+            query = query.where(ExecutionRun.total_cost_usd >= Decimal(str(min_cost)))
+        if input_key:
+            query = query.where(ExecutionRun.input_data.has_key(input_key))
+        if cursor:
+            cursor_created_at, cursor_id = decode_cursor(cursor)
+            query = query.where(tuple_(ExecutionRun.created_at, ExecutionRun.id) < tuple_(cursor_created_at, cursor_id))
+
+        result = await self.db.execute(
+            query.order_by(ExecutionRun.created_at.desc(), ExecutionRun.id.desc()).limit(limit + 1)
+        )
+        runs = result.scalars().all()
+        page = runs[:limit]
+
+        items = []
+        for run in page:
+            item = {field: getattr(run, field) for field in fields if field != "entity"}
+            if "entity" in fields:
+                item["entity"] = HierarchicalEntityResponse.model_validate(run.entity) if run.entity else None
+            items.append(jsonable_encoder(item))
+
+        next_cursor = encode_cursor(page[-1].created_at, page[-1].id) if len(runs) > limit else None
+        return {"items": items, "next_cursor": next_cursor}
 
     # HITL Management
     async def get_pending_approvals(self, company_id: UUID) -> list[HumanApproval]:
@@ -178,41 +359,30 @@ class AIService:
         return approval
 
     async def get_dashboard_stats(self, company_id: UUID) -> dict:
-        # Active Entities count
-        entities_count = await self.db.execute(
-            select(func.count(HierarchicalEntity.id))
-            .where(HierarchicalEntity.company_id == company_id)
-        )
-        
-        # Executions count (today)
-        today = datetime.now().date()
-        executions_count = await self.db.execute(
-            select(func.count(ExecutionRun.id))
-            .where(ExecutionRun.company_id == company_id)
-            .where(func.date(ExecutionRun.created_at) == today)
-        )
-        
-        # Documents count
-        documents_count = await self.db.execute(select(func.count(Document.id)).where(Document.company_id == company_id))
-        
-        return {
-            "entities_total": entities_count.scalar() or 0,
-            "executions_today": executions_count.scalar() or 0,
-            "documents_total": documents_count.scalar() or 0
-        }
+        # Precomputed counters, briefly cached per process
+        cache = counters.get_stats_cache()
+        stats = cache.get(company_id)
+        if stats is None:
+            stats = await counters.read_dashboard_stats(self.db, company_id)
+            cache.set(company_id, stats)
+        return stats
+
+    async def get_stats_timeseries(self, company_id: UUID, days: int = 30) -> list[dict]:
+        return await counters.read_timeseries(self.db, company_id, days)
 
     # Document & RAG Methods
-    async def upload_document(self, file_content: bytes, filename: str, file_type: str, company_id: UUID, entity_id: UUID = None):
+    async def upload_document(self, blob_key: str, file_size: int, filename: str, file_type: str, company_id: UUID, entity_id: UUID = None):
         # Create document record
         document = Document(
             company_id=company_id,
             entity_id=entity_id,
             filename=filename,
             file_type=file_type,
-            file_size=str(len(file_content)),
+            file_size=str(file_size),
             upload_status="processing"
         )
         self.db.add(document)
+        await counters.record_documents(self.db, company_id, 1)
         await self.db.commit()
         await self.db.refresh(document)
         
@@ -221,7 +391,7 @@ class AIService:
         await redis.enqueue_job(
             'process_document', 
             str(document.id),
-            file_content,
+            blob_key,
             file_type,
             filename
         )
@@ -229,70 +399,122 @@ class AIService:
         
         return document
     
-    async def search_documents(self, query: str, company_id: UUID, entity_id: UUID = None, top_k: int = 5):
-        from src.ai.models import DocumentChunk
-        from src.config.service import ConfigService
-        import httpx
-        from sqlalchemy import text
+    async def update_document(self, document_id: UUID, blob_key: str, file_size: int, filename: str, file_type: str, company_id: UUID):
+        """Queue an incremental re-index of an existing document from a new upload."""
+        result = await self.db.execute(
+            select(Document).where(Document.id == document_id, Document.company_id == company_id)
+        )
+        document = result.scalar_one_or_none()
+        if not document:
+            raise HTTPException(status_code=404, detail="Document not found")
+        if document.upload_status == "processing":
+            raise HTTPException(status_code=409, detail="Document is already being processed")
         
-        # Get query embedding
-        config_service = ConfigService(self.db)
-        gemini_api_key = await config_service.get_api_key_by_sku(company_id, "gemini-embedding-004")
+        # Restored by the job if the re-index fails
+        previous_status = document.upload_status
+        document.upload_status = "processing"
+        document.upload_error = None
+        await self.db.commit()
+        await self.db.refresh(document)
         
-        if not gemini_api_key:
-            # Fallback to general gemini SKU if specific embedding SKU is not found
-            gemini_api_key = await config_service.get_api_key_by_sku(company_id, "gemini-api-key")
-            
-        if not gemini_api_key:
-            raise HTTPException(status_code=500, detail="Gemini API Key not found in Integrations for this company")
+        # The current version stays searchable until the re-index commits
+        redis = await create_pool(RedisSettings())
+        await redis.enqueue_job(
+            'reindex_document',
+            str(document.id),
+            blob_key,
+            file_type,
+            filename,
+            file_size,
+            previous_status
+        )
+        await redis.close()
         
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            url = f"https://generativelanguage.googleapis.com/v1beta/models/text-embedding-004:embedContent?key={gemini_api_key}"
-            response = await client.post(
-                url,
-                headers={"Content-Type": "application/json"},
-                json={
-                    "model": "models/text-embedding-004",
-                    "content": {
-                        "parts": [{"text": query}]
-                    }
-                }
-            )
-            
-            if response.status_code != 200:
-                raise HTTPException(status_code=500, detail=f"Gemini Embedding API Error: {response.text}")
+        return document
+    
+    async def _embed_queries(self, queries: List[str], company_id: UUID) -> List[List[float]]:
+        """Embed search queries in one provider batch, serving repeats from the cache."""
+        from src.ai.embedding_cache import get_query_embedding_cache
+        from src.ai.embedding_providers import (
+            EmbeddingProviderError, get_embedding_model, get_embedding_provider
+        )
+        
+        async def embed_batch(texts: List[str]) -> List[List[float]]:
+            try:
+                provider = await get_embedding_provider(self.db, company_id)
+            except EmbeddingProviderError as e:
+                raise HTTPException(status_code=500, detail=str(e)) from e
             
-            data = response.json()
-            query_embedding = data["embedding"]["values"]
+            async with provider:
+                vectors = await provider.embed(texts)
+            if any(vector is None for vector in vectors):
+                raise HTTPException(status_code=500, detail=f"Embedding provider {provider.model} failed")
+            return vectors
         
-        # Search using cosine similarity
-        sql = text("""
-            SELECT 
-                dc.id as chunk_id,
-                dc.document_id,
-                d.filename,
-                dc.content,
-                1 - (dc.embedding <=> :query_embedding::vector) as similarity
-            FROM document_chunks dc
-            JOIN documents d ON dc.document_id = d.id
-            WHERE d.company_id = :company_id
-            AND (:entity_id::uuid IS NULL OR d.entity_id = :entity_id)
-            ORDER BY dc.embedding <=> :query_embedding::vector
-            LIMIT :top_k
-        """)
+        # Repeated queries are served from the LRU/Redis cache instead of the provider
+        cache = get_query_embedding_cache()
+        return await cache.get_many_or_compute(get_embedding_model(), queries, embed_batch)
+    
+    async def _search_params(self, mode: str, company_id: UUID, entity_id: Optional[UUID], top_k: int) -> dict:
+        """Shared search parameters; quantized modes also widen hnsw.ef_search."""
+        from src.ai.vector_search import candidate_count, ef_search_sql
+        from src.common.config import settings
         
-        result = await self.db.execute(
-            sql,
-            {
-                "query_embedding": str(query_embedding),
-                "company_id": str(company_id),
-                "entity_id": str(entity_id) if entity_id else None,
-                "top_k": top_k
-            }
-        )
+        from src.ai.embedding_providers import get_embedding_model
+        
+        params = {
+            "company_id": str(company_id),
+            "entity_id": str(entity_id) if entity_id else None,
+            "embedding_model": get_embedding_model(),
+            "top_k": top_k
+        }
+        # Quantized modes search a compact index, then rescore at full precision
+        if mode != "full":
+            params["candidates"] = candidate_count(top_k, settings.VECTOR_CANDIDATE_MULTIPLIER)
+            await self.db.execute(ef_search_sql(params["candidates"]))
+        return params
+    
+    async def search_documents(self, query: str, company_id: UUID, entity_id: UUID = None, top_k: int = 5):
+        from src.ai.vector_search import build_search_sql, resolve_search_mode
+        from src.common.config import settings
+        
+        query_embedding = (await self._embed_queries([query], company_id))[0]
+        
+        mode = await resolve_search_mode(self.db, settings.VECTOR_SEARCH_MODE)
+        params = await self._search_params(mode, company_id, entity_id, top_k)
+        params["query_embedding"] = str(query_embedding)
+        result = await self.db.execute(build_search_sql(mode), params)
         
         return result.fetchall()
     
+    async def search_documents_batch(
+        self,
+        queries: List[str],
+        company_id: UUID,
+        entity_id: UUID = None,
+        top_k: int = 5
+    ) -> List[list]:
+        """
+        Search several queries with one embedding batch and one SQL statement.
+        
+        Returns:
+            One list of result rows per query, in the order of queries
+        """
+        from src.ai.vector_search import build_batch_search_sql, resolve_search_mode
+        from src.common.config import settings
+        
+        embeddings = await self._embed_queries(queries, company_id)
+        
+        mode = await resolve_search_mode(self.db, settings.VECTOR_SEARCH_MODE)
+        params = await self._search_params(mode, company_id, entity_id, top_k)
+        params["query_embeddings"] = [str(embedding) for embedding in embeddings]
+        result = await self.db.execute(build_batch_search_sql(mode), params)
+        
+        grouped = [[] for _ in queries]
+        for row in result.fetchall():
+            grouped[row.query_index].append(row)
+        return grouped
+    
     async def get_documents(self, company_id: UUID, entity_id: UUID = None):
         query = select(Document).where(Document.company_id == company_id)
         if entity_id:
@@ -0,0 +1,165 @@
+"""
+Compiled ``{{var.path}}`` prompt templates.
+
+A template is parsed once into literal and accessor segments, so rendering
+is a join over the segments instead of a regex substitution per call.
+
+Syntax::
+
+    {{ user.name }}                  dotted lookup through dicts
+    {{ items.0.title }}              list index (also items[0], items[-1])
+    {{ user.nickname | default("friend") }}   value used when the path is missing
+    {{ order | json }}               JSON-encode the value instead of str()
+    \\{{ literal }}                   escaped, rendered as "{{ literal }}"
+
+Unresolved variables without a default are left in place, as
+``parse_variables`` always did. So are tags with an unknown filter or an
+invalid default: stored prompts written before filters existed (say
+``{{ x | upper }}``) keep rendering as before instead of failing the run.
+"""
+
+from functools import lru_cache
+from typing import Any, FrozenSet, List, Optional, Tuple, Union
+import ast
+import json
+import re
+
+_TAG = re.compile(r"(\\?)\{\{(.*?)\}\}")
+_PATH_PART = re.compile(r"\[(-?\d+)\]|([^.\[\]]+)")
+_FILTER = re.compile(r"^(\w+)\s*(?:\((.*)\))?$", re.DOTALL)
+_INDEX = re.compile(r"^-?\d+$")
+
+_MISSING = object()
+
+PathKey = Union[str, int]
+
+
+def _split_filters(expression: str) -> List[str]:
+    """Split on ``|`` outside quotes and brackets."""
+    parts, current, quote, depth = [], [], None, 0
+    previous = ""
+    for char in expression:
+        if quote:
+            if char == quote and previous != "\\":
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif char in "([{":
+            depth += 1
+        elif char in ")]}":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            parts.append("".join(current).strip())
+            current, previous = [], ""
+            continue
+        current.append(char)
+        previous = char
+    parts.append("".join(current).strip())
+    return parts
+
+
+def _parse_path(path: str) -> Tuple[PathKey, ...]:
+    keys: List[PathKey] = []
+    for index, name in _PATH_PART.findall(path):
+        keys.append(int(index) if index else name.strip())
+    return tuple(key for key in keys if key != "")
+
+
+class Accessor:
+    """One ``{{ ... }}`` segment: a path lookup plus its filters."""
+
+    __slots__ = ("placeholder", "path", "default", "as_json")
+
+    def __init__(self, placeholder: str, expression: str):
+        self.placeholder = placeholder
+        self.default: Any = _MISSING
+        self.as_json = False
+
+        path, *filters = _split_filters(expression)
+        self.path = _parse_path(path)
+        for text in filters:
+            match = _FILTER.match(text)
+            name, argument = (match.group(1), match.group(2)) if match else (text, None)
+            if name == "default" and argument is not None:
+                try:
+                    self.default = ast.literal_eval(argument.strip())
+                except (ValueError, SyntaxError) as exc:
+                    raise ValueError(f"Invalid default in template tag {placeholder}") from exc
+            elif name == "json" and argument is None:
+                self.as_json = True
+            else:
+                raise ValueError(f"Unknown template filter '{text}' in {placeholder}")
+
+    def resolve(self, variables: Any) -> Any:
+        if not self.path:
+            return _MISSING
+        value = variables
+        for key in self.path:
+            if isinstance(value, dict):
+                value = value.get(key if isinstance(key, str) else str(key), _MISSING)
+            elif isinstance(value, (list, tuple)) and (isinstance(key, int) or _INDEX.match(key)):
+                try:
+                    value = value[int(key)]
+                except IndexError:
+                    return _MISSING
+            else:
+                return _MISSING
+            if value is _MISSING:
+                return _MISSING
+        return value
+
+    def render(self, variables: Any) -> str:
+        value = self.resolve(variables)
+        if value is _MISSING:
+            value = self.default
+            if value is _MISSING:
+                return self.placeholder
+        if self.as_json:
+            return json.dumps(value, default=str, ensure_ascii=False)
+        return str(value)
+
+
+class Template:
+    """An immutable, pre-parsed template."""
+
+    __slots__ = ("source", "_segments")
+
+    def __init__(self, source: Optional[str]):
+        self.source = source or ""
+        segments: List[Union[str, Accessor]] = []
+        position = 0
+        for match in _TAG.finditer(self.source):
+            if match.start() > position:
+                segments.append(self.source[position:match.start()])
+            if match.group(1):
+                segments.append(match.group(0)[1:])
+            else:
+                try:
+                    segments.append(Accessor(match.group(0), match.group(2)))
+                except ValueError:
+                    # Not a tag this engine understands; render it verbatim
+                    segments.append(match.group(0))
+            position = match.end()
+        if position < len(self.source):
+            segments.append(self.source[position:])
+        self._segments = tuple(segments)
+
+    @property
+    def variables(self) -> FrozenSet[str]:
+        """Top-level context keys the template reads."""
+        return frozenset(
+            segment.path[0] for segment in self._segments
+            if isinstance(segment, Accessor) and segment.path and isinstance(segment.path[0], str)
+        )
+
+    def render(self, variables: dict) -> str:
+        return "".join([
+            segment if segment.__class__ is str else segment.render(variables)
+            for segment in self._segments
+        ])
+
+
+@lru_cache(maxsize=1024)
+def compile_template(source: str) -> Template:
+    """Template for ``source``, parsed once per process."""
+    return Template(source)
@@ -0,0 +1,29 @@
+"""Local token counting used for chunking and prompt budgeting."""
+
+from typing import List
+import re
+
+# Approximates BPE tokenizers: words are split into pieces of up to four
+# characters and every punctuation mark is its own token. Tracks cl100k-style
+# counts closely enough for budgeting without a network-loaded vocabulary.
+_TOKEN_PATTERN = re.compile(r"\w{1,4}|[^\w\s]")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into approximate tokens."""
+    return _TOKEN_PATTERN.findall(text or "")
+
+
+def count_tokens(text: str) -> int:
+    """Approximate number of LLM tokens in text."""
+    return sum(1 for _ in _TOKEN_PATTERN.finditer(text or ""))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Longest prefix of text holding at most max_tokens tokens."""
+    if max_tokens <= 0:
+        return ""
+    for i, match in enumerate(_TOKEN_PATTERN.finditer(text or "")):
+        if i == max_tokens - 1:
+            return text[:match.end()]
+    return text or ""
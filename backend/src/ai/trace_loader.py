@@ -0,0 +1,137 @@
+"""
+Loads a whole execution trace in a constant number of queries.
+
+The run tree comes from one recursive CTE on ``parent_run_id``; logs and
+approvals are then bulk-loaded by run id with one query per table and
+attached in memory. Depth and fan-out of the tree do not change the query
+count, unlike chained ``selectinload`` options, which need one query per
+level and stop at whatever depth they spell out.
+"""
+
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.attributes import set_committed_value
+
+from src.ai.models import ExecutionRun, HumanApproval, LLMInteractionLog, ToolInteractionLog
+from src.ai.partitions import month_start
+
+# Run rows are stamped by the API host and log rows by the worker host
+CLOCK_SKEW_MARGIN = timedelta(hours=1)
+
+
+def build_trace_query(execution_id: UUID, company_id: UUID):
+    """SELECT of the run and all of its descendants, with their entities."""
+    tree = (
+        select(ExecutionRun.id)
+        .where(ExecutionRun.id == execution_id, ExecutionRun.company_id == company_id)
+        .cte("run_tree", recursive=True)
+    )
+    # UNION (not UNION ALL) also stops a corrupted parent cycle from looping
+    tree = tree.union(
+        select(ExecutionRun.id)
+        .where(ExecutionRun.parent_run_id == tree.c.id, ExecutionRun.company_id == company_id)
+    )
+    return (
+        select(ExecutionRun)
+        .join(tree, ExecutionRun.id == tree.c.id)
+        .options(joinedload(ExecutionRun.entity))
+        .order_by(ExecutionRun.created_at)
+    )
+
+
+def log_window_start(runs: Iterable[ExecutionRun]) -> Optional[datetime]:
+    """
+    Lower bound on the ``created_at`` of the runs' logs, for partition pruning.
+
+    The bound is the start of the month of the earliest run, less
+    ``CLOCK_SKEW_MARGIN``, so a log stamped slightly before its run on a
+    host with a skewed clock is still loaded; only whole older partitions
+    are skipped.
+    """
+    started = min((run.created_at for run in runs if run.created_at is not None), default=None)
+    if started is None:
+        return None
+    return datetime.combine(month_start((started - CLOCK_SKEW_MARGIN).date()), time.min)
+
+
+def _group_by_run(rows: Iterable) -> Dict[UUID, list]:
+    grouped = defaultdict(list)
+    for row in rows:
+        grouped[row.run_id].append(row)
+    return grouped
+
+
+def assemble_tree(
+    runs: List[ExecutionRun],
+    llm_logs: Iterable[LLMInteractionLog],
+    tool_logs: Iterable[ToolInteractionLog],
+    approvals: Iterable[HumanApproval],
+    root_id: UUID
+) -> Optional[ExecutionRun]:
+    """
+    Attach logs, approvals and child runs to the loaded runs.
+
+    Collections are set as already-loaded state, so reading them (including
+    response serialization) never triggers a lazy load.
+
+    Returns:
+        The root run, or None if it is not among ``runs``
+    """
+    llm_by_run = _group_by_run(llm_logs)
+    tools_by_run = _group_by_run(tool_logs)
+    approvals_by_run = _group_by_run(approvals)
+    children = defaultdict(list)
+    for run in runs:
+        if run.id != root_id:
+            children[run.parent_run_id].append(run)
+
+    root = None
+    for run in runs:
+        set_committed_value(run, "llm_logs", llm_by_run.get(run.id, []))
+        set_committed_value(run, "tool_logs", tools_by_run.get(run.id, []))
+        set_committed_value(run, "human_approvals", approvals_by_run.get(run.id, []))
+        set_committed_value(run, "child_runs", children.get(run.id, []))
+        if run.id == root_id:
+            root = run
+    return root
+
+
+async def load_trace(db: AsyncSession, execution_id: UUID, company_id: UUID) -> Optional[ExecutionRun]:
+    """
+    Load a run with its full subtree, logs and approvals (four queries).
+
+    Returns:
+        The root run, or None if it does not exist for this company
+    """
+    result = await db.execute(build_trace_query(execution_id, company_id))
+    runs = result.scalars().unique().all()
+    if not runs:
+        return None
+
+    run_ids = [run.id for run in runs]
+    llm_query = select(LLMInteractionLog).where(LLMInteractionLog.run_id.in_(run_ids))
+    tool_query = select(ToolInteractionLog).where(ToolInteractionLog.run_id.in_(run_ids))
+    # Bounding the partition key lets Postgres skip the monthly log
+    # partitions before the trace
+    started = log_window_start(runs)
+    if started is not None:
+        llm_query = llm_query.where(LLMInteractionLog.created_at >= started)
+        tool_query = tool_query.where(ToolInteractionLog.created_at >= started)
+    llm_logs = await db.execute(llm_query.order_by(LLMInteractionLog.created_at))
+    tool_logs = await db.execute(tool_query.order_by(ToolInteractionLog.created_at))
+    approvals = await db.execute(
+        select(HumanApproval).where(HumanApproval.run_id.in_(run_ids)).order_by(HumanApproval.requested_at)
+    )
+    return assemble_tree(
+        runs,
+        llm_logs.scalars().all(),
+        tool_logs.scalars().all(),
+        approvals.scalars().all(),
+        execution_id
+    )
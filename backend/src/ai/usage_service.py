@@ -49,7 +49,7 @@ class UsageService:
 
         usage_log = UsageLog(
             company_id=company_id,
-            execution_id=execution_id,
+            run_id=execution_id,
             sku_id=registry_entry.id,
             raw_quantity=Decimal(str(raw_quantity)),
             calculated_cost=calculated_cost,
@@ -0,0 +1,173 @@
+"""SQL for document chunk similarity search, with quantized candidate search."""
+
+import logging
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIMENSIONS = 768
+
+# full:    exact cosine distance over the full-precision vectors
+# halfvec: HNSW over embedding::halfvec (2 bytes/dim), rescored with full vectors
+# binary:  HNSW over binary_quantize(embedding) (1 bit/dim), rescored with full vectors
+VECTOR_SEARCH_MODES = ("full", "halfvec", "binary")
+
+# Must match the index expressions created in migration c5d2a8f4e617.
+# {query} is the query vector expression (a bound parameter or lateral column).
+_CANDIDATE_ORDER = {
+    "halfvec": "dc.embedding::halfvec(768) <=> {query}::halfvec(768)",
+    "binary": "binary_quantize(dc.embedding)::bit(768) <~> binary_quantize({query})",
+}
+
+# Created by migration c5d2a8f4e617, which skips them on pgvector < 0.7
+_CANDIDATE_INDEXES = {
+    "halfvec": "ix_document_chunks_embedding_halfvec",
+    "binary": "ix_document_chunks_embedding_binary",
+}
+
+# mode -> mode actually searched, resolved once per process
+_resolved_modes: dict = {}
+
+_QUERY_PARAM = "CAST(:query_embedding AS vector(768))"
+
+_FILTERS = """
+    d.company_id = :company_id
+    AND dc.embedding_model = :embedding_model
+    AND (CAST(:entity_id AS uuid) IS NULL OR d.entity_id = CAST(:entity_id AS uuid))
+"""
+
+_EXACT_SQL = """
+    SELECT
+        dc.id as chunk_id,
+        dc.document_id,
+        d.filename,
+        dc.content,
+        1 - (dc.embedding <=> {query}) as similarity
+    FROM document_chunks dc
+    JOIN documents d ON dc.document_id = d.id
+    WHERE {filters}
+    ORDER BY dc.embedding <=> {query}
+    LIMIT :top_k
+"""
+
+_RESCORED_SQL = """
+    SELECT
+        dc.id as chunk_id,
+        dc.document_id,
+        d.filename,
+        dc.content,
+        1 - (dc.embedding <=> {query}) as similarity
+    FROM (
+        SELECT dc.id
+        FROM document_chunks dc
+        JOIN documents d ON dc.document_id = d.id
+        WHERE {filters}
+        ORDER BY {candidate_order}
+        LIMIT :candidates
+    ) candidates
+    JOIN document_chunks dc ON dc.id = candidates.id
+    JOIN documents d ON dc.document_id = d.id
+    ORDER BY dc.embedding <=> {query}
+    LIMIT :top_k
+"""
+
+# One statement for many queries: each query vector drives its own top-k
+# lookup through a lateral join, so the index is probed once per query.
+_BATCH_SQL = """
+    WITH queries AS (
+        SELECT (q.ordinality - 1)::int AS query_index, CAST(q.embedding AS vector(768)) AS embedding
+        FROM unnest(CAST(:query_embeddings AS text[])) WITH ORDINALITY AS q(embedding, ordinality)
+    )
+    SELECT
+        q.query_index,
+        r.chunk_id,
+        r.document_id,
+        r.filename,
+        r.content,
+        r.similarity
+    FROM queries q
+    CROSS JOIN LATERAL ({search}) r
+    ORDER BY q.query_index, r.similarity DESC
+"""
+
+
+def _search_sql(mode: str, query: str) -> str:
+    if mode == "full":
+        return _EXACT_SQL.format(query=query, filters=_FILTERS)
+    if mode not in _CANDIDATE_ORDER:
+        raise ValueError(f"Unknown vector search mode: {mode}")
+    return _RESCORED_SQL.format(
+        query=query,
+        filters=_FILTERS,
+        candidate_order=_CANDIDATE_ORDER[mode].format(query=query)
+    )
+
+
+def build_search_sql(mode: str = "full"):
+    """
+    Build the similarity search statement for a storage mode.
+
+    Quantized modes fetch ``:candidates`` rows from the compact index and
+    re-rank them by exact cosine distance, so the final top-k is ordered by
+    full-precision similarity.
+
+    Args:
+        mode: One of VECTOR_SEARCH_MODES
+
+    Returns:
+        A text() statement taking query_embedding, company_id, entity_id,
+        embedding_model, top_k and (for quantized modes) candidates
+    """
+    return text(_search_sql(mode, _QUERY_PARAM))
+
+
+def build_batch_search_sql(mode: str = "full"):
+    """
+    Build a statement that searches several query vectors at once.
+
+    Args:
+        mode: One of VECTOR_SEARCH_MODES
+
+    Returns:
+        A text() statement taking query_embeddings (list of vector literals),
+        company_id, entity_id, embedding_model, top_k and (for quantized
+        modes) candidates.
+        Rows carry a zero-based query_index.
+    """
+    return text(_BATCH_SQL.format(search=_search_sql(mode, "q.embedding")))
+
+
+def candidate_count(top_k: int, multiplier: int) -> int:
+    """Number of ANN candidates to rescore; bounded by hnsw.ef_search's max of 1000."""
+    return max(top_k, min(top_k * multiplier, 1000))
+
+
+def ef_search_sql(candidates: int):
+    """SET LOCAL statement so the HNSW scan can return all requested candidates."""
+    return text(f"SET LOCAL hnsw.ef_search = {max(40, min(int(candidates), 1000))}")
+
+
+async def resolve_search_mode(db, mode: str) -> str:
+    """
+    The mode to search with: ``mode``, or "full" when its quantized index is missing.
+
+    The quantized indexes are only built on pgvector >= 0.7, so a database
+    that skipped them keeps serving exact search instead of failing.
+    """
+    if mode not in _CANDIDATE_INDEXES:
+        return mode
+    if mode not in _resolved_modes:
+        result = await db.execute(
+            text("SELECT to_regclass(:index_name) IS NOT NULL"),
+            {"index_name": _CANDIDATE_INDEXES[mode]}
+        )
+        if result.scalar():
+            _resolved_modes[mode] = mode
+        else:
+            logger.warning(
+                f"VECTOR_SEARCH_MODE={mode} but index {_CANDIDATE_INDEXES[mode]} does not exist "
+                f"(pgvector < 0.7?); using exact search"
+            )
+            _resolved_modes[mode] = "full"
+    return _resolved_modes[mode]
@@ -1,12 +1,12 @@
-from arq import Worker
+from arq import Worker, cron
+from contextlib import asynccontextmanager
 from arq.connections import RedisSettings
 from sqlalchemy import select, update
-from sqlalchemy.orm import selectinload
 from uuid import UUID, uuid4
 from datetime import datetime
 from decimal import Decimal
 from typing import Dict, List, Optional, Any
-from src.common.database import AsyncSessionLocal
+from src.common.database import AsyncSessionLocal, engine as db_engine
 from src.ai.models import (
     ExecutionRun, HierarchicalEntity, LLMInteractionLog, EntityType, 
     RunStatus, Document, DocumentChunk, ToolInteractionLog, HumanApproval
@@ -18,29 +18,33 @@ from src.ai.schemas import (
 from src.config.service import ConfigService
 from src.ai.usage_service import UsageService
 from src.ai.tool_executor import ToolExecutor
+from src.ai.llm_providers import get_llm_provider
+from src.ai.service import AIService
+from src.ai import counters, partitions
+from src.ai.artifact_store import ArtifactStore, get_artifact_store
+from src.ai.plan_compiler import CompiledPlan, CompiledStep, compile_plan, get_plan_cache
+from src.ai.templating import compile_template
+from src.ai.context_assembler import assemble_context
+from src.ai.tokens import count_tokens
+from src.ai.embedding_providers import get_embedding_provider
+from src.ai.embedding_store import ChunkDiff, EmbeddingStore, LOOKUP_BATCH_SIZE, content_hash
+from src.ai.ingest import batched
+from src.ai.ingest_pool import extract_chunks_to_file, get_ingest_pool
+from src.common.blob_store import get_blob_store
+from src.common.config import settings
 import src.auth.models
 import src.config.models
 import httpx
 import json
-import re
 import asyncio
+import os
+import tempfile
 
 # --- Helper Functions ---
 
 def parse_variables(text: str, variables: dict) -> str:
     """Replaces {{variable}} in text with values from variables dict."""
-    if not text:
-        return ""
-    def replace(match):
-        key = match.group(1).strip()
-        val = variables
-        for k in key.split('.'):
-            if isinstance(val, dict):
-                val = val.get(k, match.group(0))
-            else:
-                return match.group(0)
-        return str(val)
-    return re.sub(r'\{\{(.*?)\}\}', replace, text)
+    return compile_template(text or "").render(variables)
 
 async def call_llm_unified(config: Dict[str, Any], system_prompt: str, user_prompt: str, api_key: str) -> dict:
     """Unified LLM call with support for reasoning modes and provider routing."""
@@ -57,65 +61,17 @@ async def call_llm_unified(config: Dict[str, Any], system_prompt: str, user_prom
     elif reasoning_mode == "REFLECTION":
         final_system += "\nAfter providing your answer, critique it for accuracy and completeness."
 
+    llm_provider = get_llm_provider(provider)
     async with httpx.AsyncClient(timeout=120.0) as client:
         start_time = datetime.utcnow()
-        
-        if provider == "openai":
-            response = await client.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
-                json={
-                    "model": model,
-                    "messages": [
-                        {"role": "system", "content": final_system},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    "temperature": temperature,
-                    "max_tokens": max_tokens
-                }
-            )
-        elif provider == "google":
-            url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={api_key}"
-            response = await client.post(
-                url,
-                headers={"Content-Type": "application/json"},
-                json={
-                    "contents": [{
-                        "parts": [{"text": f"{final_system}\n\nUser: {user_prompt}"}]
-                    }],
-                    "generationConfig": {
-                        "temperature": temperature,
-                        "maxOutputTokens": max_tokens
-                    }
-                }
-            )
-        else:
-            raise Exception(f"Unsupported provider: {provider}")
-
+        result = await llm_provider.complete(
+            client, api_key, model, final_system, user_prompt,
+            temperature=temperature, max_tokens=max_tokens
+        )
         latency = (datetime.utcnow() - start_time).total_seconds() * 1000
-        
-        if response.status_code != 200:
-            raise Exception(f"{provider.capitalize()} API Error: {response.text}")
-        
-        data = response.json()
-        if provider == "openai":
-            content = data["choices"][0]["message"]["content"]
-            usage = data.get("usage", {})
-            return {
-                "output": content,
-                "prompt_tokens": usage.get("prompt_tokens", 0),
-                "completion_tokens": usage.get("completion_tokens", 0),
-                "latency_ms": int(latency)
-            }
-        else: # google
-            content = data["candidates"][0]["content"]["parts"][0]["text"]
-            usage = data.get("usageMetadata", {})
-            return {
-                "output": content,
-                "prompt_tokens": usage.get("promptTokenCount", 0),
-                "completion_tokens": usage.get("candidatesTokenCount", 0),
-                "latency_ms": int(latency)
-            }
+    
+    result["latency_ms"] = int(latency)
+    return result
 
 # --- Execution Engine ---
 
@@ -125,20 +81,22 @@ class ExecutionEngine:
         self.redis = redis_pool
         self.config_service = ConfigService(db)
         self.usage_service = UsageService(db)
+        # (run_id, query, entity_id, top_k) -> retrieved chunks
+        self._retrieval_cache: Dict[tuple, List[dict]] = {}
 
     async def execute_run(self, run_id: UUID) -> dict:
-        # 1. Fetch Run and Entity
-        result = await self.db.execute(
-            select(ExecutionRun)
-            .options(selectinload(ExecutionRun.entity))
-            .where(ExecutionRun.id == run_id)
-        )
+        # 1. Fetch Run and Entity version (the entity itself only on a plan cache miss)
+        result = await self.db.execute(select(ExecutionRun).where(ExecutionRun.id == run_id))
         run = result.scalar_one_or_none()
         if not run:
             raise Exception(f"Run {run_id} not found")
 
-        entity = run.entity
-        if not entity:
+        result = await self.db.execute(
+            select(HierarchicalEntity.version, HierarchicalEntity.updated_at)
+            .where(HierarchicalEntity.id == run.entity_id)
+        )
+        entity_version = result.one_or_none()
+        if not entity_version:
             raise Exception(f"Entity for run {run_id} not found")
 
         # 2. Update Status and Initialize Trace
@@ -157,23 +115,27 @@ class ExecutionEngine:
             all_step_results = []
             
             # 3. Plan Generation/Reconciliation
-            plan = await self._get_reconciled_plan(entity, run.input_data)
-            run.dynamic_plan = plan # Store the actual plan used
+            plan = await self._get_reconciled_plan(run.entity_id, tuple(entity_version), run.input_data)
+            run.dynamic_plan = dict(plan.document) # Store the actual plan used
             await self.db.commit()
 
             # 4. Execute Plan Steps
-            for step in plan.get("steps", []):
-                step_obj = PlanStep(**step)
+            for compiled_step in plan.steps:
+                step_obj = compiled_step.step
                 
                 # HITL Checkpoint (Simplified for MVP)
                 # await self._check_hitl_checkpoint(run, step_obj)
 
                 # Execute Step
-                step_result = await self._execute_step(run, entity, step_obj, context_state)
+                step_start = datetime.utcnow()
+                step_result = await self._execute_step(run, plan, compiled_step, context_state)
                 
                 # Review Mechanism
-                if entity.logic_gate and entity.logic_gate.get("review_mechanism", {}).get("enabled"):
-                    step_result = await self._review_step_output(run, entity, step_obj, step_result)
+                if plan.review_enabled:
+                    step_result = await self._review_step_output(run, plan, step_obj, step_result)
+                
+                if isinstance(step_result, dict):
+                    step_result["latency_ms"] = int((datetime.utcnow() - step_start).total_seconds() * 1000)
 
                 all_step_results.append(step_result)
                 
@@ -186,44 +148,59 @@ class ExecutionEngine:
                     break
 
             # 5. Finalize
+            result_data = {"output": context_state.get(plan.final_step) if plan.steps else "Success", "steps": all_step_results}
+            artifacts = self._artifact_store(plan)
             run.status = RunStatus.COMPLETED
-            run.result_data = {"output": context_state.get(plan["steps"][-1]["name"]) if plan["steps"] else "Success", "steps": all_step_results}
-            run.context_state = context_state
+            run.result_data = await artifacts.offload_tree(result_data) if artifacts else result_data
+            run.context_state = await artifacts.offload_tree(context_state) if artifacts else context_state
             run.completed_at = datetime.utcnow()
             run.execution_time_ms = int((run.completed_at - run.started_at).total_seconds() * 1000)
+            await counters.record_run_finished(self.db, run, succeeded=True)
             
             await self.db.commit()
-            await self.redis.publish(channel, json.dumps({"status": "COMPLETED", "result": run.result_data}))
-            return run.result_data
+            await self.redis.publish(channel, json.dumps({"status": "COMPLETED", "result": result_data}))
+            return result_data
 
         except Exception as e:
             run.status = RunStatus.FAILED
             run.error_message = str(e)
             run.completed_at = datetime.utcnow()
+            await counters.record_run_finished(self.db, run, succeeded=False)
             await self.db.commit()
             await self.redis.publish(channel, json.dumps({"status": "FAILED", "error": str(e)}))
             raise e
 
-    async def _get_reconciled_plan(self, entity: HierarchicalEntity, input_data: dict) -> dict:
-        """Merges static and dynamic plans based on strategy."""
-        static_plan = entity.planning.get("static_plan", {}) if entity.planning else {}
-        dynamic_config = entity.planning.get("dynamic_planning", {}) if entity.planning else {}
-        
-        if not dynamic_config.get("enabled"):
-            return static_plan
+    def _artifact_store(self, plan: CompiledPlan) -> Optional[ArtifactStore]:
+        """The artifact store if the entity keeps large payloads by reference, else None (stored inline)."""
+        return get_artifact_store() if plan.store_artifacts else None
 
-        # Generate dynamic plan via LLM (Simplified for MVP)
+    async def _get_reconciled_plan(self, entity_id: UUID, version_key: tuple, input_data: dict) -> CompiledPlan:
+        """Merges static and dynamic plans based on strategy."""
+        cache = get_plan_cache()
+        plan = cache.get(entity_id, version_key)
+        if plan is None:
+            entity = await self.db.get(HierarchicalEntity, entity_id)
+            if entity is None:
+                raise Exception(f"Entity {entity_id} not found")
+            plan = compile_plan(entity)
+            cache.put(plan)
+
+        # Dynamic planning (entity.planning.dynamic_planning) would reconcile
+        # an LLM-generated plan with the static one here
         # TODO: Implement full LLM-based planning reconciliation
-        return static_plan
+        return plan
 
-    async def _execute_step(self, run: ExecutionRun, entity: HierarchicalEntity, step: PlanStep, context: dict) -> dict:
+    async def _execute_step(self, run: ExecutionRun, plan: CompiledPlan, compiled_step: CompiledStep, context: dict) -> dict:
         """Routes execution to specific step handler."""
+        step = compiled_step.step
         if step.type == StepType.CHILD_ENTITY_INVOCATION:
             return await self._execute_child_invocation(run, step, context)
         elif step.type == StepType.TOOL_CALL:
-            return await self._execute_tool_call(run, entity, step, context)
+            return await self._execute_tool_call(run, plan, step, context)
+        elif step.type == StepType.RETRIEVAL:
+            return await self._execute_retrieval(run, plan, compiled_step, context)
         elif step.type == StepType.THOUGHT or step.type == StepType.ACTION:
-            return await self._execute_thought(run, entity, step, context)
+            return await self._execute_thought(run, plan, compiled_step, context)
         return {"error": "Unknown step type"}
 
     async def _execute_child_invocation(self, run: ExecutionRun, step: PlanStep, context: dict) -> dict:
@@ -253,7 +230,7 @@ class ExecutionEngine:
         
         return {"step": step.name, "output": child_result.get("output"), "child_run_id": str(child_run.id)}
 
-    async def _execute_tool_call(self, run: ExecutionRun, entity: HierarchicalEntity, step: PlanStep, context: dict) -> dict:
+    async def _execute_tool_call(self, run: ExecutionRun, plan: CompiledPlan, step: PlanStep, context: dict) -> dict:
         tool_id = step.target.tool_id
         if not tool_id:
             raise Exception(f"Tool call missing tool_id for step {step.name}")
@@ -268,12 +245,17 @@ class ExecutionEngine:
             latency = int((datetime.utcnow() - start_time).total_seconds() * 1000)
             
             # Log Tool Call
+            input_parameters, output_result = {"input": raw_input}, tool_result
+            artifacts = self._artifact_store(plan)
+            if artifacts:
+                input_parameters = await artifacts.offload_tree(input_parameters)
+                output_result = await artifacts.offload_tree(output_result)
             log = ToolInteractionLog(
                 run_id=run.id,
                 tool_id=tool_id,
                 tool_name=tool_id,
-                input_parameters={"input": raw_input},
-                output_result=tool_result,
+                input_parameters=input_parameters,
+                output_result=output_result,
                 success=tool_result.get("success", False),
                 latency_ms=latency
             )
@@ -284,13 +266,85 @@ class ExecutionEngine:
         except Exception as e:
             return {"step": step.name, "error": str(e), "success": False}
 
-    async def _execute_thought(self, run: ExecutionRun, entity: HierarchicalEntity, step: PlanStep, context: dict) -> dict:
-        # 1. Resolve Config
-        logic_gate = entity.logic_gate or {}
-        config = logic_gate.get("reasoning_config", {})
-        if not config:
-            # Fallback to legacy llm_config
-            config = entity.llm_config or {"model_provider": "openai", "model_name": "gpt-4o"}
+    async def _execute_retrieval(self, run: ExecutionRun, plan: CompiledPlan, compiled_step: CompiledStep, context: dict) -> dict:
+        step = compiled_step.step
+        query = compiled_step.query.render(context).strip()
+        if not query:
+            raise Exception(f"Retrieval step {step.name} has an empty query")
+        
+        start_time = datetime.utcnow()
+        cache_key = (run.id, query, step.target.entity_id, step.target.top_k)
+        cached = cache_key in self._retrieval_cache
+        try:
+            if not cached:
+                # Search in-process; no HTTP hop through the API
+                rows = await AIService(self.db).search_documents(
+                    query=query,
+                    company_id=run.company_id,
+                    entity_id=step.target.entity_id,
+                    top_k=step.target.top_k
+                )
+                self._retrieval_cache[cache_key] = [
+                    {
+                        "chunk_id": str(r.chunk_id),
+                        "document_id": str(r.document_id),
+                        "filename": r.filename,
+                        "content": r.content,
+                        "similarity": float(r.similarity)
+                    }
+                    for r in rows
+                ]
+            chunks = self._retrieval_cache[cache_key]
+            
+            # Inject the most similar chunks that fit the entity's context budget
+            max_tokens = plan.max_context_tokens
+            selected, used_tokens = [], 0
+            for chunk in chunks:
+                tokens = count_tokens(chunk["content"])
+                if used_tokens + tokens > max_tokens:
+                    break
+                selected.append(chunk)
+                used_tokens += tokens
+            output = "\n\n".join(f"[{c['filename']}]\n{c['content']}" for c in selected)
+            
+            latency = int((datetime.utcnow() - start_time).total_seconds() * 1000)
+            log = ToolInteractionLog(
+                run_id=run.id,
+                tool_id="retrieval",
+                tool_name=step.name,
+                provider="pgvector",
+                input_parameters={
+                    "query": query,
+                    "entity_id": str(step.target.entity_id) if step.target.entity_id else None,
+                    "top_k": step.target.top_k
+                },
+                output_result={
+                    "chunk_ids": [c["chunk_id"] for c in selected],
+                    "tokens": used_tokens,
+                    "truncated": len(selected) < len(chunks)
+                },
+                success=True,
+                latency_ms=latency,
+                log_metadata={"cached": cached, "max_context_tokens": max_tokens}
+            )
+            self.db.add(log)
+            await self.db.commit()
+            
+            return {
+                "step": step.name,
+                "output": output,
+                "sources": [
+                    {"document_id": c["document_id"], "filename": c["filename"], "similarity": c["similarity"]}
+                    for c in selected
+                ]
+            }
+        except Exception as e:
+            return {"step": step.name, "error": str(e), "success": False}
+
+    async def _execute_thought(self, run: ExecutionRun, plan: CompiledPlan, compiled_step: CompiledStep, context: dict) -> dict:
+        # 1. Resolve Config (reasoning_config, or legacy llm_config, resolved at compile time)
+        step = compiled_step.step
+        config = plan.model_config
         
         # 2. Get API Key
         service_sku = config.get("model_name", "gpt-4o")
@@ -301,24 +355,37 @@ class ExecutionEngine:
             raise Exception(f"API Key not found for {config.get('model_provider')}")
 
         # 3. Prepare Prompts
-        system_prompt = entity.identity.get("persona", {}).get("system_prompt", "You are a helpful assistant.") if entity.identity else "You are a helpful assistant."
-        user_prompt = step.target.prompt_template or str(context)
-        user_prompt = parse_variables(user_prompt, context)
+        system_prompt = plan.system_prompt
+        assembled = None
+        if compiled_step.prompt:
+            user_prompt = compiled_step.prompt.render(context)
+        else:
+            assembled = assemble_context(plan, compiled_step, context)
+            user_prompt = assembled.prompt
 
         # 4. Call LLM
         llm_result = await call_llm_unified(config, system_prompt, user_prompt, api_key)
         
         # 5. Log Interaction & Track Usage
+        texts = {"input_prompt": f"System: {system_prompt}\nUser: {user_prompt}", "output_response": llm_result["output"]}
+        references = {}
+        artifacts = self._artifact_store(plan)
+        if artifacts:
+            texts, references = await artifacts.offload_texts(texts)
+        log_metadata = {"artifacts": references} if references else {}
+        if assembled:
+            log_metadata["context"] = {"tokens": assembled.tokens, "reduced": list(assembled.reduced)}
         log = LLMInteractionLog(
             run_id=run.id,
             model_provider=config.get("model_provider"),
             model_name=config.get("model_name"),
-            input_prompt=f"System: {system_prompt}\nUser: {user_prompt}",
-            output_response=llm_result["output"],
+            input_prompt=texts["input_prompt"],
+            output_response=texts["output_response"],
             prompt_tokens=llm_result["prompt_tokens"],
             completion_tokens=llm_result["completion_tokens"],
             latency_ms=llm_result["latency_ms"],
-            reasoning_mode=config.get("reasoning_mode")
+            reasoning_mode=config.get("reasoning_mode"),
+            log_metadata=log_metadata or None
         )
         self.db.add(log)
         
@@ -338,7 +405,7 @@ class ExecutionEngine:
         await self.db.commit()
         return {"step": step.name, "output": llm_result["output"]}
 
-    async def _review_step_output(self, run, entity, step, result) -> dict:
+    async def _review_step_output(self, run, plan, step, result) -> dict:
         """Self-critique review mechanism."""
         # TODO: Implement full self-review logic with LLM feedback loop
         return result
@@ -367,72 +434,226 @@ async def run_execution_recursive(ctx, run_id_str: str):
     
     await redis_pool.close()
 
-async def process_document(ctx, document_id_str: str, file_content: bytes, file_type: str, filename: str):
+class _ChunkSpool:
+    """Chunk texts spooled to disk; each iteration reads them from the start."""
+
+    def __init__(self, spool):
+        self._spool = spool
+
+    def __iter__(self):
+        self._spool.seek(0)
+        return (json.loads(line) for line in self._spool)
+
+@asynccontextmanager
+async def _extracted_chunks(blob_key: str, file_type: str):
+    """
+    Parse and chunk a staged blob, yielding an iterable of chunk texts.
+
+    Parsing and chunking are CPU-bound, so they run in a child process that
+    streams chunks to a spool file on disk; callers consume them lazily,
+    keeping memory flat regardless of document length. The iterable can be
+    walked more than once.
+    """
+    fd, spool_path = tempfile.mkstemp(prefix="ingest-", suffix=".jsonl")
+    os.close(fd)
+    try:
+        await get_ingest_pool().run(
+            extract_chunks_to_file,
+            blob_key,
+            file_type,
+            settings.DOCUMENT_CHUNK_TOKENS,
+            settings.DOCUMENT_CHUNK_OVERLAP_TOKENS,
+            spool_path
+        )
+        with open(spool_path, encoding="utf-8") as spool:
+            yield _ChunkSpool(spool)
+    finally:
+        os.remove(spool_path)
+
+async def process_document(ctx, document_id_str: str, blob_key: str, file_type: str, filename: str):
     from src.ai.models import Document, DocumentChunk
-    import io
     
     document_id = UUID(document_id_str)
+    blob_store = get_blob_store()
     async with AsyncSessionLocal() as db:
         result = await db.execute(select(Document).where(Document.id == document_id))
         document = result.scalar_one_or_none()
         if not document:
+            await blob_store.delete(blob_key)
             return
             
         try:
-            if file_type == "txt":
-                text = file_content.decode("utf-8")
-            elif file_type == "pdf":
-                import PyPDF2
-                pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
-                text = ""
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-            elif file_type == "docx":
-                import docx
-                doc = docx.Document(io.BytesIO(file_content))
-                text = "\n".join([p.text for p in doc.paragraphs])
-            else:
-                text = file_content.decode("utf-8", errors="ignore")
+            provider = await get_embedding_provider(db, document.company_id)
+
+            async with provider, _extracted_chunks(blob_key, file_type) as chunk_stream:
+                store = EmbeddingStore(db, document.company_id, provider.model)
+                idx = 0
+                # Embed and flush in fixed-size batches
+                for batch in batched(chunk_stream, settings.EMBEDDING_BATCH_SIZE):
+                    # Only chunks whose content has never been embedded hit the API
+                    embedded = await store.embed_chunks(batch, provider.embed)
+                    for chunk_text, (chunk_hash, embedding) in zip(batch, embedded):
+                        if embedding is not None:
+                            db.add(DocumentChunk(
+                                document_id=document.id,
+                                chunk_index=str(idx),
+                                content=chunk_text,
+                                embedding=embedding,
+                                content_hash=chunk_hash,
+                                embedding_model=provider.model
+                            ))
+                        idx += 1
+                    # Flush (not commit) so the document becomes visible atomically
+                    await db.flush()
+            
+            document.upload_status = "completed"
+            await db.commit()
+            
+        except Exception as e:
+            reason = str(e)
+            await db.rollback()
+            await db.execute(
+                update(Document)
+                .where(Document.id == document_id)
+                .values(upload_status="failed", upload_error=reason)
+            )
+            await db.commit()
+            print(f"Doc processing failed: {reason}")
+        finally:
+            await blob_store.delete(blob_key)
+
+async def reindex_document(
+    ctx, document_id_str: str, blob_key: str, file_type: str, filename: str, file_size: int,
+    previous_status: str = "completed"
+):
+    """
+    Replace a document's content with a new upload, re-embedding only what changed.
+
+    New chunks are matched to existing ones by content hash. Matches keep their
+    row and embedding (only chunk_index moves), unmatched new chunks are
+    embedded and inserted, and leftover old chunks are deleted in bulk.
+
+    Embedding happens first, without a lock, for the chunks missing from a
+    snapshot of the current rows. The document row is then locked only for
+    the diff, insert, delete and version swap, in one transaction, so searches
+    see either the old or the new version, never a mix. On failure the
+    document goes back to ``previous_status``, the status it had before the
+    update was queued.
+    """
+    from src.ai.models import Document, DocumentChunk
+    from sqlalchemy import delete
+    
+    document_id = UUID(document_id_str)
+    blob_store = get_blob_store()
+    async with AsyncSessionLocal() as db:
+        try:
+            result = await db.execute(select(Document).where(Document.id == document_id))
+            document = result.scalar_one_or_none()
+            if not document:
+                return
+            
+            provider = await get_embedding_provider(db, document.company_id)
+            
+            async with provider, _extracted_chunks(blob_key, file_type) as chunks:
+                store = EmbeddingStore(db, document.company_id, provider.model)
+                
+                # Embed outside the lock; chunks already stored need no vector
+                result = await db.execute(
+                    select(DocumentChunk.content_hash)
+                    .where(DocumentChunk.document_id == document_id, DocumentChunk.embedding_model == provider.model)
+                )
+                stored = set(result.scalars().all())
+                # content hash -> embedding, None where embedding failed
+                embeddings: Dict[str, Optional[list]] = {}
+                for batch in batched(chunks, settings.EMBEDDING_BATCH_SIZE):
+                    texts = [
+                        text for text in batch
+                        if content_hash(text) not in stored and content_hash(text) not in embeddings
+                    ]
+                    if texts:
+                        embeddings.update(await store.embed_chunks(texts, provider.embed))
+                await db.commit()
                 
-            chunk_size = 500
-            chunks = [text[i:i+chunk_size] for i in range(0, len(text), chunk_size)]
+                # Row lock serializes concurrent updates of the same document
+                result = await db.execute(
+                    select(Document).where(Document.id == document_id).with_for_update()
+                )
+                document = result.scalar_one_or_none()
+                if not document:
+                    return
+                result = await db.execute(
+                    select(DocumentChunk.id, DocumentChunk.content_hash, DocumentChunk.chunk_index, DocumentChunk.embedding_model)
+                    .where(DocumentChunk.document_id == document_id)
+                )
+                # Rows embedded by another model can never be reused, so they end up stale
+                diff = ChunkDiff(
+                    (chunk_id, chunk_hash if model == provider.model else None, chunk_index)
+                    for chunk_id, chunk_hash, chunk_index, model in result.all()
+                )
+                added = 0
+                for batch in batched(enumerate(chunks), settings.EMBEDDING_BATCH_SIZE):
+                    new_chunks = [(idx, text) for idx, text in batch if not diff.match(idx, text)]
+                    # Content another update removed since the snapshot is resolved here
+                    late = [text for _, text in new_chunks if content_hash(text) not in embeddings]
+                    if late:
+                        embeddings.update(await store.embed_chunks(late, provider.embed))
+                    for chunk_idx, chunk_text in new_chunks:
+                        chunk_hash = content_hash(chunk_text)
+                        if embeddings[chunk_hash] is not None:
+                            db.add(DocumentChunk(
+                                document_id=document.id,
+                                chunk_index=str(chunk_idx),
+                                content=chunk_text,
+                                embedding=embeddings[chunk_hash],
+                                content_hash=chunk_hash,
+                                embedding_model=provider.model
+                            ))
+                            added += 1
+                    await db.flush()
             
-            config_service = ConfigService(db)
-            gemini_api_key = await config_service.get_api_key_by_sku(document.company_id, "gemini-embedding-004") or \
-                             await config_service.get_api_key_by_sku(document.company_id, "gemini-api-key")
-                             
-            if not gemini_api_key:
-                 raise Exception("Gemini API Key not found")
-
-            async with httpx.AsyncClient() as client:
-                for idx, chunk_text in enumerate(chunks):
-                    url = f"https://generativelanguage.googleapis.com/v1beta/models/text-embedding-004:embedContent?key={gemini_api_key}"
-                    response = await client.post(
-                        url,
-                        headers={"Content-Type": "application/json"},
-                        json={
-                            "model": "models/text-embedding-004",
-                            "content": {"parts": [{"text": chunk_text}]}
-                        }
-                    )
-                    if response.status_code == 200:
-                        embedding = response.json()["embedding"]["values"]
-                        chunk = DocumentChunk(
-                            document_id=document.id,
-                            chunk_index=str(idx),
-                            content=chunk_text,
-                            embedding=embedding
-                        )
-                        db.add(chunk)
+            stale = diff.stale()
+            for ids in batched(stale, LOOKUP_BATCH_SIZE):
+                await db.execute(delete(DocumentChunk).where(DocumentChunk.id.in_(ids)))
+            if diff.moved:
+                await db.execute(update(DocumentChunk), diff.moved)
             
+            document.filename = filename
+            document.file_type = file_type
+            document.file_size = str(file_size)
+            document.version += 1
             document.upload_status = "completed"
+            document.upload_error = None
             await db.commit()
+            print(f"Reindexed {document_id} to v{document.version}: {added} added, {len(stale)} removed, {len(diff.moved)} moved")
             
         except Exception as e:
-            document.upload_status = "failed"
+            reason = str(e)
+            await db.rollback()
+            # The previous version is untouched; a document that had failed
+            # before has no chunks, so it must not come back as completed
+            await db.execute(
+                update(Document)
+                .where(Document.id == document_id)
+                .values(upload_status=previous_status, upload_error=f"Update failed: {reason}")
+            )
+            await db.commit()
+            print(f"Reindex of document {document_id} failed: {reason}")
+        finally:
+            await blob_store.delete(blob_key)
+
+async def maintain_log_partitions(ctx):
+    """Create upcoming log partitions and archive the expired ones."""
+    async with partitions.maintenance_lock(db_engine) as locked:
+        if not locked:
+            print("Log partitions: maintenance already running on another worker, skipped")
+            return
+        async with AsyncSessionLocal() as db:
+            created = await partitions.ensure_partitions(db)
             await db.commit()
-            print(f"Doc processing failed: {e}")
+            archived = await partitions.archive_expired_partitions(db)
+    print(f"Log partitions: {len(created)} created, {len(archived)} archived")
 
 class WorkerSettings:
-    functions = [run_execution_recursive, process_document]
+    functions = [run_execution_recursive, process_document, reindex_document]
+    cron_jobs = [cron(maintain_log_partitions, hour={3}, minute={15}, unique=True)]
     redis_settings = RedisSettings(host="localhost", port=6379)
@@ -0,0 +1,129 @@
+"""Blob staging storage for uploads and other large binary payloads."""
+
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import AsyncIterator, BinaryIO, ContextManager, Iterator, Optional
+from uuid import uuid4
+import asyncio
+import mmap
+import os
+import re
+
+_KEY_PATTERN = re.compile(r"^[A-Za-z0-9_\-]+(/[A-Za-z0-9_\-.]+)*$")
+
+
+class BlobStore(ABC):
+    """
+    Storage backend for binary blobs referenced by key.
+
+    Callers stream data in and get back an opaque key that is safe to pass
+    through the job queue; readers open the blob by key on the other side.
+    """
+
+    @abstractmethod
+    async def write_stream(self, chunks: AsyncIterator[bytes], key: Optional[str] = None) -> tuple[str, int]:
+        """Persist streamed chunks and return (key, size_in_bytes)."""
+
+    @abstractmethod
+    def open(self, key: str) -> ContextManager[BinaryIO]:
+        """Open a blob for streaming reads as a seekable binary file object."""
+
+    @abstractmethod
+    def open_mmap(self, key: str) -> ContextManager[BinaryIO]:
+        """Open a blob for random-access reads without copying it into memory."""
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        pass
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        pass
+
+
+class LocalBlobStore(BlobStore):
+    """
+    Stores blobs as files under a root directory.
+
+    The API and the arq workers must share this directory (same host or a
+    shared volume). Readers either stream the file or memory-map it, so large
+    files are paged in on demand instead of being loaded into the Python heap.
+    """
+
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+        os.makedirs(root_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        if not _KEY_PATTERN.match(key):
+            raise ValueError(f"Invalid blob key: {key}")
+        return os.path.join(self.root_dir, key)
+
+    async def write_stream(self, chunks: AsyncIterator[bytes], key: Optional[str] = None) -> tuple[str, int]:
+        key = key or uuid4().hex
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.part"
+        size = 0
+        f = await asyncio.to_thread(open, tmp_path, "wb")
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                await asyncio.to_thread(f.write, chunk)
+        except BaseException:
+            f.close()
+            os.remove(tmp_path)
+            raise
+        f.close()
+        # Publish atomically so readers never see a partially written blob
+        os.replace(tmp_path, path)
+        return key, size
+
+    @contextmanager
+    def open(self, key: str) -> Iterator[BinaryIO]:
+        with open(self._path(key), "rb") as f:
+            yield f
+
+    @contextmanager
+    def open_mmap(self, key: str) -> Iterator[BinaryIO]:
+        with open(self._path(key), "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # mmap cannot map empty files
+                yield f
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield mapped
+
+    async def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    async def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+async def iter_upload(upload, chunk_size: int = 1024 * 1024) -> AsyncIterator[bytes]:
+    """Yield a FastAPI UploadFile in fixed-size chunks."""
+    while True:
+        chunk = await upload.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+_blob_store: Optional[BlobStore] = None
+
+
+def get_blob_store() -> BlobStore:
+    """Return the configured blob store backend."""
+    global _blob_store
+    if _blob_store is None:
+        from src.common.config import settings
+
+        if settings.BLOB_STORAGE_BACKEND == "local":
+            _blob_store = LocalBlobStore(settings.BLOB_STORAGE_DIR)
+        else:
+            raise ValueError(f"Unsupported blob storage backend: {settings.BLOB_STORAGE_BACKEND}")
+    return _blob_store
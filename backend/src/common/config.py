@@ -10,6 +10,46 @@ class Settings(BaseSettings):
     STRIPE_WEBHOOK_SECRET: str = ""
     ENCRYPTION_MASTER_KEY: str = "your-default-dev-key-must-be-32-bytes" # Overridden by env
 
+    # Blob staging (uploads are streamed here; jobs carry only the key)
+    BLOB_STORAGE_BACKEND: str = "local"
+    BLOB_STORAGE_DIR: str = "storage/blobs"  # must not be under the public /uploads mount
+
+    # LLM providers (point at the mock LLM server for load tests)
+    OPENAI_BASE_URL: str = "https://api.openai.com/v1"
+    GEMINI_BASE_URL: str = "https://generativelanguage.googleapis.com/v1beta"
+
+    # RAG / Embeddings
+    EMBEDDING_PROVIDER: str = "gemini"  # gemini | local
+    LOCAL_EMBEDDING_LATENCY_MS: float = 0
+    QUERY_EMBEDDING_CACHE_SIZE: int = 2048
+    QUERY_EMBEDDING_CACHE_TTL_SECONDS: int = 86400
+    DOCUMENT_CHUNK_TOKENS: int = 400
+    DOCUMENT_CHUNK_OVERLAP_TOKENS: int = 50
+    EMBEDDING_BATCH_SIZE: int = 64
+    INGEST_MAX_WORKERS: int = 2
+    DOCUMENT_PARSE_TIMEOUT_SECONDS: int = 300
+    VECTOR_SEARCH_MODE: str = "full"  # full | halfvec | binary
+    VECTOR_CANDIDATE_MULTIPLIER: int = 8
+
+    # Dashboard counters
+    DASHBOARD_STATS_CACHE_TTL_SECONDS: float = 5  # 0 disables the in-process cache
+
+    # Compiled execution plans cached per worker process (see src/ai/plan_compiler.py)
+    PLAN_CACHE_SIZE: int = 256
+
+    # Artifact store for large prompts/responses (see src/ai/artifact_store.py)
+    ARTIFACT_INLINE_MAX_BYTES: int = 4096
+    ARTIFACT_PREVIEW_CHARS: int = 280
+
+    # Log table partitions (see src/ai/partitions.py)
+    LOG_PARTITION_PREMAKE_MONTHS: int = 3
+    LOG_RETENTION_MONTHS: int = 12  # 0 keeps every partition
+    LOG_ARCHIVE_DIR: str = "storage/log_archive"
+
+    # Request profiling (X-DB-Queries / X-Event-Loop-Lag-Ms headers for load tests)
+    REQUEST_PROFILING_ENABLED: bool = False
+    EVENT_LOOP_LAG_INTERVAL_MS: float = 25
+
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
 settings = Settings()
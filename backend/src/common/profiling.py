@@ -0,0 +1,137 @@
+"""
+Per-request profiling headers for load tests.
+
+When REQUEST_PROFILING_ENABLED is set, every HTTP response carries:
+
+    X-DB-Queries         statements executed on the app engine for this request
+    X-DB-Time-Ms         time spent inside those statements
+    X-Event-Loop-Lag-Ms  worst event-loop lag observed while the request ran
+
+The counters are attached when the response starts, so for streaming
+responses (SSE) they cover the work done before the first byte only.
+"""
+
+from collections import deque
+from contextvars import ContextVar
+from typing import Optional
+import asyncio
+import time
+
+from sqlalchemy import event
+
+
+class _RequestStats:
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+_current_stats: ContextVar[Optional[_RequestStats]] = ContextVar("request_profiling_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("profiling_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["profiling_query_start"].pop()
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += time.perf_counter() - started
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("profiling_query_start"):
+        conn.info["profiling_query_start"].pop()
+
+
+def instrument_engine(engine) -> None:
+    """Count statements executed on an (async) engine against the current request."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(sync_engine, "handle_error", _handle_error)
+
+
+class EventLoopLagMonitor:
+    """
+    Measures event-loop lag by sleeping for a fixed interval and recording
+    how late each wake-up is. Anything that blocks the loop (sync I/O, CPU
+    work, long-running callbacks) shows up as lag on every in-flight request.
+
+    Args:
+        interval_ms: Sampling interval
+        history: Number of samples kept for per-request lookups
+    """
+
+    def __init__(self, interval_ms: float = 25, history: int = 4096):
+        self.interval = interval_ms / 1000
+        self._samples = deque(maxlen=history)
+        self._task: Optional[asyncio.Task] = None
+        self._expected: Optional[float] = None
+
+    def ensure_started(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            now = loop.time()
+            self._samples.append((now, now - self._expected))
+
+    def max_lag_since(self, since: float) -> float:
+        """
+        Worst lag in seconds among samples taken at or after loop time
+        ``since``, including a stall still in progress (the monitor has not
+        woken up yet because the caller itself is blocking the loop).
+        """
+        pending = 0.0
+        if self._expected is not None:
+            pending = max(0.0, asyncio.get_running_loop().time() - self._expected)
+        return max([pending] + [lag for at, lag in self._samples if at >= since])
+
+
+class RequestProfilingMiddleware:
+    """
+    Pure ASGI middleware (so streaming responses are not buffered) that adds
+    the profiling headers. Call instrument_engine() on the engines to count.
+    """
+
+    def __init__(self, app, lag_interval_ms: float = 25):
+        self.app = app
+        self.monitor = EventLoopLagMonitor(lag_interval_ms)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        self.monitor.ensure_started()
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        stats = _RequestStats()
+        token = _current_stats.set(stats)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.extend([
+                    (b"x-db-queries", str(stats.queries).encode()),
+                    (b"x-db-time-ms", f"{stats.db_seconds * 1000:.2f}".encode()),
+                    (b"x-event-loop-lag-ms", f"{self.monitor.max_lag_since(started) * 1000:.2f}".encode()),
+                ])
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _current_stats.reset(token)
@@ -22,6 +22,13 @@ app.add_middleware(
 from src.common.middleware import CompanySuspensionMiddleware
 app.add_middleware(CompanySuspensionMiddleware)
 
+from src.common.config import settings
+if settings.REQUEST_PROFILING_ENABLED:
+    # Outermost, so the suspension check's query is counted too
+    from src.common.profiling import RequestProfilingMiddleware, instrument_engine
+    instrument_engine(engine)
+    app.add_middleware(RequestProfilingMiddleware, lag_interval_ms=settings.EVENT_LOOP_LAG_INTERVAL_MS)
+
 
 
 app.include_router(auth_router, prefix="/api/v1")
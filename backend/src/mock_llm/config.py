@@ -0,0 +1,23 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Optional
+
+class MockLLMSettings(BaseSettings):
+    # Time to first token: fixed | uniform | normal | lognormal
+    LATENCY_DISTRIBUTION: str = "fixed"
+    LATENCY_MS: float = 200  # fixed value, mean (uniform/normal) or median (lognormal)
+    LATENCY_SPREAD_MS: float = 50  # uniform half-width or normal stddev
+    LATENCY_SIGMA: float = 0.5  # lognormal shape
+    TOKEN_DELAY_MS: float = 0  # added per completion token (and between stream chunks)
+    COMPLETION_TOKENS: int = 64  # length of generated filler replies
+
+    # Error injection, as fractions of requests
+    RATE_LIMIT_ERROR_RATE: float = 0.0
+    SERVER_ERROR_RATE: float = 0.0
+    RETRY_AFTER_SECONDS: int = 1
+
+    SCRIPT_FILE: Optional[str] = None  # JSON scripted responses, see src/mock_llm/main.py
+    SEED: Optional[int] = None
+
+    model_config = SettingsConfigDict(env_prefix="MOCK_LLM_", env_file=".env", extra="ignore")
+
+settings = MockLLMSettings()
@@ -0,0 +1,428 @@
+"""
+Mock LLM provider speaking the OpenAI and Gemini wire formats.
+
+Run it with ``uvicorn src.mock_llm.main:app --port 8090``, then point the
+backend at it:
+
+    OPENAI_BASE_URL=http://localhost:8090/v1
+    GEMINI_BASE_URL=http://localhost:8090/v1beta
+
+Behaviour is tuned through MOCK_LLM_* settings (see config.py), at runtime
+via PATCH /_mock/config, or per request with headers:
+
+    X-Mock-Error: 429 | 500          force an error response
+    X-Mock-Latency-Ms: <ms>          override time to first token
+
+Scripted responses come from MOCK_LLM_SCRIPT_FILE or PUT /_mock/script:
+
+    {"rules": [
+        {"match": "weather", "responses": ["TOOL:web_search:weather today", "It is sunny."]},
+        {"match": "add", "tool_calls": [{"name": "calculator", "arguments": {"input": "2+2"}}]},
+        {"match": "overload", "status": 429}
+    ]}
+
+The first rule whose regex matches the prompt wins; ``responses`` are
+returned in turn. Unmatched prompts get deterministic filler text of
+COMPLETION_TOKENS tokens.
+"""
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+from src.ai.embedding_providers import LocalEmbeddingProvider
+from src.ai.tokens import count_tokens
+from src.mock_llm.config import MockLLMSettings, settings
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+
+_FILLER_WORDS = (
+    "the agent reviewed context and produced a concise answer based on "
+    "available information with clear reasoning steps for each requirement"
+).split()
+
+_embedder = LocalEmbeddingProvider()
+
+
+class MockState:
+    """Mutable server state: settings, scripted rules and counters."""
+
+    def __init__(self, config: MockLLMSettings):
+        self.reset(config)
+
+    def reset(self, config: MockLLMSettings) -> None:
+        self.config = config.model_copy()
+        self.rng = random.Random(config.SEED)
+        self.rules: List[Dict[str, Any]] = []
+        self.rule_turns: Dict[int, int] = {}
+        self.stats: Dict[str, Any] = {"requests": {}, "errors": {}, "in_flight": 0, "max_in_flight": 0}
+        if config.SCRIPT_FILE:
+            with open(config.SCRIPT_FILE, encoding="utf-8") as f:
+                self.set_script(json.load(f))
+
+    def set_script(self, script: Dict[str, Any]) -> None:
+        rules = script.get("rules", [])
+        for rule in rules:
+            re.compile(rule.get("match", ".*"))
+        self.rules = rules
+        self.rule_turns = {}
+
+    def latency_seconds(self, request: Request) -> float:
+        override = request.headers.get("x-mock-latency-ms")
+        if override is not None:
+            return max(0.0, float(override)) / 1000
+
+        c = self.config
+        if c.LATENCY_DISTRIBUTION == "uniform":
+            ms = self.rng.uniform(c.LATENCY_MS - c.LATENCY_SPREAD_MS, c.LATENCY_MS + c.LATENCY_SPREAD_MS)
+        elif c.LATENCY_DISTRIBUTION == "normal":
+            ms = self.rng.gauss(c.LATENCY_MS, c.LATENCY_SPREAD_MS)
+        elif c.LATENCY_DISTRIBUTION == "lognormal":
+            ms = c.LATENCY_MS * self.rng.lognormvariate(0, c.LATENCY_SIGMA)
+        else:
+            ms = c.LATENCY_MS
+        return max(0.0, ms) / 1000
+
+    def injected_error(self, request: Request, rule: Optional[Dict[str, Any]]) -> Optional[int]:
+        forced = request.headers.get("x-mock-error") or (rule or {}).get("status")
+        if forced:
+            return int(forced)
+        roll = self.rng.random()
+        if roll < self.config.RATE_LIMIT_ERROR_RATE:
+            return 429
+        if roll < self.config.RATE_LIMIT_ERROR_RATE + self.config.SERVER_ERROR_RATE:
+            return 500
+        return None
+
+    def match_rule(self, prompt: str) -> Optional[Dict[str, Any]]:
+        for i, rule in enumerate(self.rules):
+            if re.search(rule.get("match", ".*"), prompt, re.IGNORECASE | re.DOTALL):
+                return {**rule, "_index": i}
+        return None
+
+    def reply(self, prompt: str, rule: Optional[Dict[str, Any]], max_tokens: Optional[int]) -> Dict[str, Any]:
+        """Build the assistant turn: {"text", "tool_calls", "finish_reason"}."""
+        if rule and rule.get("tool_calls"):
+            return {"text": None, "tool_calls": rule["tool_calls"], "finish_reason": "tool_calls"}
+
+        if rule and rule.get("responses"):
+            turn = self.rule_turns.get(rule["_index"], 0)
+            self.rule_turns[rule["_index"]] = turn + 1
+            responses = rule["responses"]
+            text = responses[turn % len(responses)]
+        else:
+            text = _filler(prompt, self.config.COMPLETION_TOKENS)
+
+        finish_reason = "stop"
+        if max_tokens and count_tokens(text) > max_tokens:
+            text = _truncate(text, max_tokens)
+            finish_reason = "length"
+        return {"text": text, "tool_calls": None, "finish_reason": finish_reason}
+
+    def count(self, bucket: str, key: str) -> None:
+        self.stats[bucket][key] = self.stats[bucket].get(key, 0) + 1
+
+
+state = MockState(settings)
+
+app = FastAPI(title="HireBuddha Mock LLM")
+
+
+def _filler(prompt: str, tokens: int) -> str:
+    seed = int.from_bytes(hashlib.sha256(prompt.encode("utf-8")).digest()[:8], "little")
+    rng = random.Random(seed)
+    words: List[str] = []
+    total = 0
+    while total < tokens:
+        word = rng.choice(_FILLER_WORDS)
+        words.append(word)
+        total += count_tokens(word)
+    return " ".join(words) + "."
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    pieces, total = [], 0
+    for piece in _pieces(text):
+        total += count_tokens(piece)
+        if total > max_tokens:
+            break
+        pieces.append(piece)
+    return "".join(pieces).rstrip()
+
+
+def _pieces(text: str) -> List[str]:
+    """Split text into stream deltas (one word plus trailing whitespace each)."""
+    return re.findall(r"\S+\s*", text) or [text]
+
+
+async def _simulate_latency(request: Request, reply: Dict[str, Any], streaming: bool) -> None:
+    await asyncio.sleep(state.latency_seconds(request))
+    if not streaming and reply["text"]:
+        await asyncio.sleep(count_tokens(reply["text"]) * state.config.TOKEN_DELAY_MS / 1000)
+
+
+def _track(endpoint: str):
+    state.count("requests", endpoint)
+    state.stats["in_flight"] += 1
+    state.stats["max_in_flight"] = max(state.stats["max_in_flight"], state.stats["in_flight"])
+
+
+def _untrack():
+    state.stats["in_flight"] -= 1
+
+
+# --- OpenAI ---
+
+def _openai_error(status: int) -> JSONResponse:
+    state.count("errors", str(status))
+    if status == 429:
+        return JSONResponse(
+            status_code=429,
+            headers={"Retry-After": str(state.config.RETRY_AFTER_SECONDS)},
+            content={"error": {"message": "Rate limit reached (mock)", "type": "requests", "code": "rate_limit_exceeded"}}
+        )
+    return JSONResponse(
+        status_code=status,
+        content={"error": {"message": "The server had an error (mock)", "type": "server_error", "code": None}}
+    )
+
+
+def _openai_tool_calls(tool_calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": f"call_{uuid4().hex[:24]}",
+            "type": "function",
+            "function": {"name": call["name"], "arguments": json.dumps(call.get("arguments", {}))}
+        }
+        for call in tool_calls
+    ]
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    messages = body.get("messages", [])
+    prompt = "\n".join(str(m.get("content") or "") for m in messages)
+    model = body.get("model", "mock")
+
+    _track("openai.chat")
+    try:
+        rule = state.match_rule(prompt)
+        error = state.injected_error(request, rule)
+        if error:
+            await asyncio.sleep(state.latency_seconds(request))
+            return _openai_error(error)
+        reply = state.reply(prompt, rule, body.get("max_tokens"))
+        await _simulate_latency(request, reply, streaming=bool(body.get("stream")))
+    finally:
+        _untrack()
+
+    prompt_tokens = count_tokens(prompt)
+    completion_tokens = count_tokens(reply["text"] or json.dumps(reply["tool_calls"]))
+    usage = {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens
+    }
+    completion_id = f"chatcmpl-{uuid4().hex}"
+    created = int(time.time())
+    tool_calls = _openai_tool_calls(reply["tool_calls"]) if reply["tool_calls"] else None
+
+    if not body.get("stream"):
+        message: Dict[str, Any] = {"role": "assistant", "content": reply["text"]}
+        if tool_calls:
+            message["tool_calls"] = tool_calls
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "message": message, "finish_reason": reply["finish_reason"]}],
+            "usage": usage
+        }
+
+    include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+
+    def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None, chunk_usage=None) -> str:
+        payload = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}] if delta is not None else []
+        }
+        if chunk_usage:
+            payload["usage"] = chunk_usage
+        return f"data: {json.dumps(payload)}\n\n"
+
+    async def events():
+        yield chunk({"role": "assistant", "content": ""})
+        if tool_calls:
+            yield chunk({"tool_calls": [{"index": i, **call} for i, call in enumerate(tool_calls)]})
+        else:
+            for piece in _pieces(reply["text"]):
+                await asyncio.sleep(count_tokens(piece) * state.config.TOKEN_DELAY_MS / 1000)
+                yield chunk({"content": piece})
+        yield chunk({}, reply["finish_reason"])
+        if include_usage:
+            yield chunk(None, chunk_usage=usage)
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+# --- Gemini ---
+
+_GEMINI_STATUS = {429: "RESOURCE_EXHAUSTED", 500: "INTERNAL", 503: "UNAVAILABLE"}
+_GEMINI_FINISH = {"stop": "STOP", "length": "MAX_TOKENS", "tool_calls": "STOP"}
+
+
+def _gemini_error(status: int) -> JSONResponse:
+    state.count("errors", str(status))
+    headers = {"Retry-After": str(state.config.RETRY_AFTER_SECONDS)} if status == 429 else None
+    return JSONResponse(
+        status_code=status,
+        headers=headers,
+        content={"error": {"code": status, "message": "Injected error (mock)", "status": _GEMINI_STATUS.get(status, "UNKNOWN")}}
+    )
+
+
+def _gemini_prompt(body: Dict[str, Any]) -> str:
+    texts = []
+    for content in body.get("contents", []):
+        for part in content.get("parts", []):
+            if "text" in part:
+                texts.append(part["text"])
+    return "\n".join(texts)
+
+
+def _gemini_parts(reply: Dict[str, Any], text: Optional[str] = None) -> List[Dict[str, Any]]:
+    if reply["tool_calls"]:
+        return [{"functionCall": {"name": c["name"], "args": c.get("arguments", {})}} for c in reply["tool_calls"]]
+    return [{"text": reply["text"] if text is None else text}]
+
+
+async def _generate_content(request: Request, model: str, body: Dict[str, Any], streaming: bool):
+    prompt = _gemini_prompt(body)
+    max_tokens = (body.get("generationConfig") or {}).get("maxOutputTokens")
+
+    _track("gemini.stream" if streaming else "gemini.generate")
+    try:
+        rule = state.match_rule(prompt)
+        error = state.injected_error(request, rule)
+        if error:
+            await asyncio.sleep(state.latency_seconds(request))
+            return _gemini_error(error)
+        reply = state.reply(prompt, rule, max_tokens)
+        await _simulate_latency(request, reply, streaming=streaming)
+    finally:
+        _untrack()
+
+    prompt_tokens = count_tokens(prompt)
+    completion_tokens = count_tokens(reply["text"] or json.dumps(reply["tool_calls"]))
+    usage = {
+        "promptTokenCount": prompt_tokens,
+        "candidatesTokenCount": completion_tokens,
+        "totalTokenCount": prompt_tokens + completion_tokens
+    }
+
+    def response(parts, finish_reason=None) -> Dict[str, Any]:
+        candidate: Dict[str, Any] = {"content": {"role": "model", "parts": parts}, "index": 0}
+        if finish_reason:
+            candidate["finishReason"] = finish_reason
+        return {"candidates": [candidate], "usageMetadata": usage, "modelVersion": model}
+
+    finish = _GEMINI_FINISH[reply["finish_reason"]]
+    if not streaming:
+        return response(_gemini_parts(reply), finish)
+
+    pieces = [None] if reply["tool_calls"] else _pieces(reply["text"])
+
+    async def events():
+        for i, piece in enumerate(pieces):
+            if piece is not None:
+                await asyncio.sleep(count_tokens(piece) * state.config.TOKEN_DELAY_MS / 1000)
+            last = i == len(pieces) - 1
+            yield response(_gemini_parts(reply, piece), finish if last else None)
+
+    if request.query_params.get("alt") == "sse":
+        async def sse():
+            async for event in events():
+                yield f"data: {json.dumps(event)}\n\n"
+        return StreamingResponse(sse(), media_type="text/event-stream")
+
+    # Without alt=sse Gemini streams one JSON array
+    async def json_array():
+        yield "["
+        first = True
+        async for event in events():
+            yield ("" if first else ",") + json.dumps(event)
+            first = False
+        yield "]"
+    return StreamingResponse(json_array(), media_type="application/json")
+
+
+@app.post("/v1beta/models/{target}")
+async def gemini_models(target: str, request: Request):
+    model, _, action = target.partition(":")
+    body = await request.json()
+
+    if action == "generateContent":
+        return await _generate_content(request, model, body, streaming=False)
+    if action == "streamGenerateContent":
+        return await _generate_content(request, model, body, streaming=True)
+    if action in ("embedContent", "batchEmbedContents"):
+        requests = body.get("requests") if action == "batchEmbedContents" else [body]
+        texts = [" ".join(p.get("text", "") for p in r.get("content", {}).get("parts", [])) for r in requests]
+
+        _track(f"gemini.{action}")
+        try:
+            error = state.injected_error(request, None)
+            await asyncio.sleep(state.latency_seconds(request))
+            if error:
+                return _gemini_error(error)
+        finally:
+            _untrack()
+
+        embeddings = [{"values": _embedder.embed_one(text)} for text in texts]
+        return {"embeddings": embeddings} if action == "batchEmbedContents" else {"embedding": embeddings[0]}
+
+    return JSONResponse(status_code=404, content={"error": {"code": 404, "message": f"Unknown action: {action}", "status": "NOT_FOUND"}})
+
+
+# --- Control ---
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
+
+
+@app.get("/_mock/stats")
+async def get_stats():
+    return state.stats
+
+
+@app.put("/_mock/script")
+async def put_script(script: Dict[str, Any]):
+    try:
+        state.set_script(script)
+    except re.error as e:
+        return JSONResponse(status_code=400, content={"detail": f"Invalid match pattern: {e}"})
+    return {"rules": len(state.rules)}
+
+
+@app.patch("/_mock/config")
+async def patch_config(changes: Dict[str, Any]):
+    state.config = MockLLMSettings(**{**state.config.model_dump(), **changes})
+    if "SEED" in changes:
+        state.rng = random.Random(state.config.SEED)
+    return state.config.model_dump()
+
+
+@app.post("/_mock/reset")
+async def reset():
+    state.reset(settings)
+    return {"status": "reset"}
@@ -0,0 +1,81 @@
+"""Shared fakes for service tests that inspect statements without a database."""
+
+import pytest
+
+
+class FakeResult:
+    """Canned rows behind the result accessors the services use."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalars(self):
+        return self
+
+    def mappings(self):
+        return self
+
+    def unique(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+    def scalar_one_or_none(self):
+        return self.rows[0] if self.rows else None
+
+    def scalar(self):
+        return self.rows[0] if self.rows else None
+
+    def __iter__(self):
+        return iter(self.rows)
+
+
+class FakeSession:
+    """
+    Records executed statements and replies with ``results`` in order.
+
+    Each result is a list of rows; once they run out, statements get no
+    rows. ``objects`` answers ``get`` by ``(model, key)`` and added objects
+    are kept in ``added``.
+    """
+
+    def __init__(self, *results, objects=None):
+        self.results = list(results)
+        self.objects = objects or {}
+        self.statements = []
+        self.added = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement, params=None):
+        self.statements.append(statement)
+        return FakeResult(self.results.pop(0) if self.results else [])
+
+    async def get(self, model, key):
+        return self.objects.get((model, key))
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    async def flush(self):
+        pass
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+    async def refresh(self, obj):
+        pass
+
+
+@pytest.fixture
+def fake_session():
+    """Factory for sessions: ``fake_session(*results, objects=None)``."""
+    return FakeSession
@@ -0,0 +1,128 @@
+"""Tests for the content-addressed artifact store."""
+
+from uuid import uuid4
+import pytest
+from fastapi import HTTPException
+import src.config.models  # noqa: F401 - registers IntegrationRegistry for relationship mapping
+from src.ai.artifact_store import ArtifactStore, is_reference, uses_references
+from src.ai.models import ExecutionRun, LLMInteractionLog
+from src.ai.service import AIService
+from src.common.blob_store import LocalBlobStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ArtifactStore(LocalBlobStore(str(tmp_path)), inline_max_bytes=64, preview_chars=16, codec="zlib")
+
+
+def stored_files(tmp_path):
+    return [path for path in (tmp_path / "artifacts").rglob("*") if path.is_file()]
+
+
+@pytest.mark.asyncio
+async def test_small_values_stay_inline(store, tmp_path):
+    """Test values under the inline limit are returned unchanged and nothing is written."""
+    assert await store.offload("short") == "short"
+    assert await store.offload({"a": 1}) == {"a": 1}
+    assert not (tmp_path / "artifacts").exists()
+
+
+@pytest.mark.asyncio
+async def test_text_roundtrip_with_preview(store):
+    """Test a large text becomes a reference with a preview and loads back in full."""
+    text = "lorem ipsum " * 100
+
+    reference = await store.offload(text)
+
+    assert is_reference(reference)
+    assert reference["kind"] == "text" and reference["size"] == len(text)
+    assert reference["preview"] == text[:16] + "…"
+    assert await store.load(reference) == text
+
+
+@pytest.mark.asyncio
+async def test_json_roundtrip(store):
+    """Test a large JSON value loads back as the same structure."""
+    value = {"rows": [{"id": i, "name": f"row-{i}"} for i in range(20)]}
+
+    reference = await store.offload(value)
+
+    assert reference["kind"] == "json"
+    assert await store.load(reference) == value
+
+
+@pytest.mark.asyncio
+async def test_duplicate_outputs_are_stored_once(store, tmp_path):
+    """Test a step output repeated in result_data and context_state shares one blob."""
+    output = "step output " * 50
+    result_data = {"output": output, "steps": [{"step": "draft", "output": output, "latency_ms": 5}]}
+    context_state = {"input": "hi", "draft": output}
+
+    result_refs = await store.offload_tree(result_data)
+    context_refs = await store.offload_tree(context_state)
+
+    assert result_refs["steps"][0]["latency_ms"] == 5
+    assert context_refs["input"] == "hi"
+    assert result_refs["output"]["$artifact"] == context_refs["draft"]["$artifact"]
+    assert len(stored_files(tmp_path)) == 1
+    assert await store.offload_tree(result_refs) == result_refs
+
+
+@pytest.mark.asyncio
+async def test_offload_texts_keeps_previews_in_columns(store):
+    """Test text columns get previews and the references are returned by column."""
+    columns, references = await store.offload_texts({"input_prompt": "x" * 100, "output_response": "ok"})
+
+    assert columns == {"input_prompt": "x" * 16 + "…", "output_response": "ok"}
+    assert list(references) == ["input_prompt"]
+
+
+@pytest.mark.asyncio
+async def test_zstd_codec_when_available(tmp_path):
+    """Test zstd artifacts round-trip when zstandard is installed."""
+    pytest.importorskip("zstandard")
+    store = ArtifactStore(LocalBlobStore(str(tmp_path)), inline_max_bytes=8, codec="zstd")
+
+    reference = await store.offload("z" * 1000)
+
+    assert reference["codec"] == "zstd"
+    assert await store.load(reference) == "z" * 1000
+
+
+@pytest.mark.parametrize("capabilities, expected", [
+    (None, True),
+    ({"context_engineering": {"artifact_handling": {"artifact_reference_mode": "INLINE"}}}, False),
+    ({"context_engineering": {"artifact_handling": {"store_large_objects": False}}}, False),
+])
+def test_uses_references(capabilities, expected):
+    """Test REFERENCE mode (the default) is required to offload payloads."""
+    assert uses_references(capabilities) is expected
+
+
+def make_trace(reference):
+    run = ExecutionRun(id=uuid4(), company_id=uuid4(), entity_id=uuid4())
+    run.llm_logs = [LLMInteractionLog(id=uuid4(), log_metadata={"artifacts": {"output_response": reference}})]
+    run.tool_logs = []
+    run.child_runs = []
+    return run
+
+
+@pytest.mark.asyncio
+async def test_execution_artifact_must_belong_to_trace(store, monkeypatch):
+    """Test artifact bodies load only through an execution that references them."""
+    reference = await store.offload("answer " * 50)
+    run = make_trace(reference)
+
+    async def get_execution(self, execution_id, company_id):
+        return run
+
+    monkeypatch.setattr(AIService, "get_execution", get_execution)
+    monkeypatch.setattr("src.ai.artifact_store.get_artifact_store", lambda: store)
+    service = AIService(None)
+
+    artifact = await service.get_execution_artifact(run.id, reference["$artifact"], run.company_id)
+    assert artifact["content"] == "answer " * 50
+
+    with pytest.raises(HTTPException) as exc:
+        await service.get_execution_artifact(run.id, "0" * 64, run.company_id)
+    assert exc.value.status_code == 404
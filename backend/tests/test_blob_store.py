@@ -0,0 +1,100 @@
+"""Tests for the local blob staging store."""
+
+import pytest
+from src.common.blob_store import LocalBlobStore
+
+
+async def _chunks(data: bytes, size: int = 4):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+@pytest.mark.asyncio
+async def test_write_stream_and_read_back(tmp_path):
+    """Test streamed chunks are persisted and readable by key."""
+    store = LocalBlobStore(str(tmp_path))
+
+    key, size = await store.write_stream(_chunks(b"hello blob store"))
+
+    assert size == 16
+    with store.open(key) as f:
+        assert f.read() == b"hello blob store"
+    with store.open_mmap(key) as f:
+        assert f[6:10] == b"blob"
+
+
+@pytest.mark.asyncio
+async def test_open_mmap_handles_empty_blob(tmp_path):
+    """Test empty uploads can still be opened."""
+    store = LocalBlobStore(str(tmp_path))
+
+    key, size = await store.write_stream(_chunks(b""))
+
+    assert size == 0
+    with store.open_mmap(key) as f:
+        assert f.read() == b""
+
+
+@pytest.mark.asyncio
+async def test_failed_stream_leaves_no_blob(tmp_path):
+    """Test a broken upload stream does not publish a partial blob."""
+    store = LocalBlobStore(str(tmp_path))
+
+    async def broken():
+        yield b"partial"
+        raise IOError("client disconnected")
+
+    with pytest.raises(IOError):
+        await store.write_stream(broken(), key="upload")
+
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_delete_is_idempotent(tmp_path):
+    """Test deleting a missing blob is a no-op."""
+    store = LocalBlobStore(str(tmp_path))
+    key, _ = await store.write_stream(_chunks(b"data"))
+
+    await store.delete(key)
+    await store.delete(key)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_rejects_path_traversal_keys(tmp_path):
+    """Test keys cannot escape the storage root."""
+    store = LocalBlobStore(str(tmp_path))
+
+    with pytest.raises(ValueError):
+        store._path("../etc/passwd")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("endpoint, service_method, kwargs", [
+    ("upload_document", "upload_document", {"entity_id": None}),
+    ("update_document", "update_document", {"document_id": None}),
+])
+async def test_failed_document_save_removes_blob(tmp_path, monkeypatch, endpoint, service_method, kwargs):
+    """Test an upload whose document row cannot be saved does not leave its blob behind."""
+    from io import BytesIO
+    from types import SimpleNamespace
+    from fastapi import UploadFile
+    import src.config.models  # noqa: F401 - registers IntegrationRegistry for relationship mapping
+    from src.ai import router
+    from src.ai.service import AIService
+
+    store = LocalBlobStore(str(tmp_path))
+
+    async def fail(self, **kwargs):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(router, "get_blob_store", lambda: store)
+    monkeypatch.setattr(AIService, service_method, fail)
+    upload = UploadFile(BytesIO(b"report body"), filename="report.txt")
+
+    with pytest.raises(RuntimeError):
+        await getattr(router, endpoint)(
+            file=upload, db=None, current_user=SimpleNamespace(company_id=None), **kwargs
+        )
+    assert [path for path in tmp_path.rglob("*") if path.is_file()] == []
@@ -0,0 +1,114 @@
+"""Tests for token-budgeted context assembly."""
+
+from datetime import datetime
+from types import SimpleNamespace
+from uuid import uuid4
+import pytest
+from src.ai.context_assembler import ELLIPSIS, assemble_context, summarize
+from src.ai.plan_compiler import compile_plan
+from src.ai.tokens import count_tokens, truncate_to_tokens
+
+SYSTEM_PROMPT = "You are a careful analyst."
+LONG_OUTPUT = " ".join(f"Finding number {i} is documented in detail." for i in range(200))
+
+
+def make_plan(step_names, max_context_tokens=4096, context_priority=None, loop_control=None):
+    context_engineering = {"max_context_tokens": max_context_tokens}
+    if context_priority is not None:
+        context_engineering["context_priority"] = context_priority
+    entity = SimpleNamespace(
+        id=uuid4(), version="1.0.0", updated_at=datetime(2026, 10, 1), logic_gate=None, llm_config=None,
+        identity={"persona": {"system_prompt": SYSTEM_PROMPT}},
+        capabilities={"context_engineering": context_engineering},
+        planning={
+            "static_plan": {"steps": [
+                {"step_id": str(uuid4()), "order": i, "name": name, "type": "THOUGHT", "target": {}}
+                for i, name in enumerate(step_names)
+            ]},
+            "loop_control": loop_control or {},
+        },
+    )
+    return compile_plan(entity)
+
+
+def history_context(count, output=LONG_OUTPUT):
+    context = {"input": "Summarize the findings"}
+    context.update({f"step_{i}": f"[{i}] {output}" for i in range(count)})
+    return context
+
+
+def test_small_context_is_sent_whole():
+    """Test nothing is cut when the context fits the budget."""
+    plan = make_plan(["research", "answer"])
+    context = {"input": "What is the tide?", "research": {"height_m": 2.5}}
+
+    assembled = assemble_context(plan, plan.steps[1], context)
+
+    assert assembled.reduced == ()
+    assert "input: What is the tide?" in assembled.prompt
+    assert '### research\n{"height_m": 2.5}' in assembled.prompt
+    assert "2. answer (THOUGHT) <- current" in assembled.prompt
+    assert assembled.tokens == count_tokens(SYSTEM_PROMPT) + count_tokens(assembled.prompt)
+
+
+@pytest.mark.parametrize("mode", ["FULL_HISTORY", "SUMMARIZED", "LAST_N"])
+def test_prompt_stays_within_budget(mode):
+    """Test long runs never exceed max_context_tokens, whatever the history mode."""
+    names = [f"step_{i}" for i in range(8)] + ["answer"]
+    plan = make_plan(names, max_context_tokens=500, loop_control={"iteration_context_mode": mode})
+
+    assembled = assemble_context(plan, plan.steps[-1], history_context(8))
+
+    assert assembled.tokens <= 500
+    assert count_tokens(SYSTEM_PROMPT) + count_tokens(assembled.prompt) == assembled.tokens
+    assert "STEP_HISTORY" in assembled.reduced
+    assert "Summarize the findings" in assembled.prompt
+
+
+def test_history_modes_select_outputs():
+    """Test LAST_N keeps only recent outputs and SUMMARIZED shortens all but the latest."""
+    names = [f"step_{i}" for i in range(5)] + ["answer"]
+    context = history_context(5)
+
+    last_n = make_plan(names, 100000, loop_control={"iteration_context_mode": "LAST_N", "last_n_iterations": 2})
+    prompt = assemble_context(last_n, last_n.steps[-1], context).prompt
+    assert "### step_2" not in prompt
+    assert "### step_3" in prompt and "### step_4" in prompt
+
+    summarized = make_plan(names, 100000, loop_control={"iteration_context_mode": "SUMMARIZED"})
+    prompt = assemble_context(summarized, summarized.steps[-1], context).prompt
+    assert prompt.count(ELLIPSIS) == 4
+    assert context["step_4"] in prompt
+
+
+def test_lower_priority_sections_are_cut_first():
+    """Test context_priority decides which section keeps its tokens."""
+    names = ["step_0", "answer"]
+    context = {"input": LONG_OUTPUT, "step_0": LONG_OUTPUT}
+
+    plan = make_plan(names, 4000, context_priority=["SYSTEM_PROMPT", "STEP_HISTORY", "USER_INPUT"])
+    assembled = assemble_context(plan, plan.steps[-1], context)
+    assert "STEP_HISTORY" not in assembled.reduced
+    assert "USER_INPUT" in assembled.reduced
+
+    plan = make_plan(names, 4000)
+    assembled = assemble_context(plan, plan.steps[-1], context)
+    assert "USER_INPUT" not in assembled.reduced
+    assert "STEP_HISTORY" in assembled.reduced
+
+
+def test_summarize_keeps_leading_sentences():
+    """Test summaries end on a sentence boundary within their token budget."""
+    summary = summarize(LONG_OUTPUT, max_tokens=30)
+
+    assert summary.startswith("Finding number 0 is documented in detail.")
+    assert summary.endswith("detail." + ELLIPSIS)
+    assert count_tokens(summary) <= 30
+    assert summarize("Short.") == "Short."
+
+
+def test_truncate_to_tokens():
+    """Test truncation keeps the longest prefix within the token count."""
+    assert truncate_to_tokens("Hello, wonderful world.", 3) == "Hello,"
+    assert truncate_to_tokens("Hello", 0) == ""
+    assert truncate_to_tokens("Hello", 10) == "Hello"
@@ -0,0 +1,94 @@
+"""Tests for the precomputed dashboard counters."""
+
+from datetime import date, datetime
+from decimal import Decimal
+from types import SimpleNamespace
+from uuid import uuid4
+import pytest
+from sqlalchemy.dialects import postgresql
+import src.config.models  # noqa: F401 - registers IntegrationRegistry for relationship mapping
+from src.ai import counters
+from src.ai.models import CompanyCounter, CompanyDailyStats
+
+
+def compiled(statement):
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def test_counter_upsert_adds_deltas():
+    """Test counters are incremented in place on conflict."""
+    sql = compiled(counters.company_counter_upsert(uuid4(), entities=-1))
+
+    assert "ON CONFLICT (company_id) DO UPDATE" in sql
+    assert "entities_total = (company_counters.entities_total + excluded.entities_total)" in sql
+    assert "updated_at =" in sql
+
+
+def test_daily_upsert_keys_on_company_and_day():
+    """Test daily rollups are keyed by (company_id, day)."""
+    sql = compiled(counters.daily_stats_upsert(uuid4(), date(2026, 10, 1), executions=1))
+
+    assert "ON CONFLICT (company_id, day) DO UPDATE" in sql
+    assert "tokens = (company_daily_stats.tokens + excluded.tokens)" in sql
+
+
+@pytest.mark.asyncio
+async def test_child_runs_are_not_counted(fake_session):
+    """Test only root runs are rolled up, since they include their children."""
+    db = fake_session()
+    child = SimpleNamespace(parent_run_id=uuid4(), company_id=uuid4(), created_at=datetime.utcnow())
+    root = SimpleNamespace(parent_run_id=None, company_id=uuid4(), created_at=datetime(2026, 10, 1, 23, 59),
+                           total_cost_usd=Decimal("0.5"), total_tokens=120)
+
+    await counters.record_run_created(db, child)
+    await counters.record_run_finished(db, child, succeeded=True)
+    await counters.record_run_finished(db, root, succeeded=False)
+
+    assert len(db.statements) == 1
+    params = db.statements[0].compile(dialect=postgresql.dialect()).params
+    assert params["day"] == date(2026, 10, 1)
+    assert params["failed"] == 1 and params["completed"] == 0
+    assert params["tokens"] == 120
+
+
+@pytest.mark.asyncio
+async def test_dashboard_stats_from_counter_rows(fake_session):
+    """Test stats come from the two counter rows, with zeros when missing."""
+    company_id, today = uuid4(), date(2026, 10, 1)
+    db = fake_session(objects={
+        (CompanyCounter, company_id): SimpleNamespace(entities_total=7, documents_total=3),
+        (CompanyDailyStats, (company_id, today)): SimpleNamespace(executions=12, cost_usd=Decimal("1.25"), tokens=900),
+    })
+
+    stats = await counters.read_dashboard_stats(db, company_id, today)
+    empty = await counters.read_dashboard_stats(fake_session(), uuid4(), today)
+
+    assert stats == {"entities_total": 7, "documents_total": 3, "executions_today": 12,
+                     "cost_today_usd": 1.25, "tokens_today": 900}
+    assert empty["executions_today"] == 0 and empty["entities_total"] == 0
+
+
+@pytest.mark.asyncio
+async def test_timeseries_is_zero_filled(fake_session):
+    """Test days without activity appear as zero points, oldest first."""
+    today = date(2026, 10, 3)
+    row = SimpleNamespace(day=date(2026, 10, 2), executions=4, completed=3, failed=1,
+                          cost_usd=Decimal("0.2"), tokens=50)
+
+    points = await counters.read_timeseries(fake_session([row]), uuid4(), 3, today)
+
+    assert [p["day"] for p in points] == [date(2026, 10, 1), date(2026, 10, 2), date(2026, 10, 3)]
+    assert [p["executions"] for p in points] == [0, 4, 0]
+
+
+def test_ttl_cache_expires(monkeypatch):
+    """Test cached stats are served until the TTL passes."""
+    now = [100.0]
+    monkeypatch.setattr(counters.time, "monotonic", lambda: now[0])
+    cache = counters.TTLCache(ttl_seconds=5)
+
+    cache.set("a", {"entities_total": 1})
+    now[0] += 4
+    assert cache.get("a") == {"entities_total": 1}
+    now[0] += 2
+    assert cache.get("a") is None
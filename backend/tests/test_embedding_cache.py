@@ -0,0 +1,123 @@
+"""Tests for the query embedding cache."""
+
+import pytest
+from src.ai.embedding_cache import (
+    EmbeddingCache, normalize_query, pack_embedding, unpack_embedding
+)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+        self.set_calls = []
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.set_calls.append((key, ex))
+        self.store[key] = value
+
+
+class BrokenRedis:
+    async def get(self, key):
+        raise ConnectionError("redis down")
+
+    async def set(self, key, value, ex=None):
+        raise ConnectionError("redis down")
+
+
+def test_pack_roundtrip_uses_float32():
+    """Test embeddings are stored as 4 bytes per dimension."""
+    vector = [0.5, -1.25, 3.0]
+    data = pack_embedding(vector)
+
+    assert len(data) == 12
+    assert unpack_embedding(data) == vector
+
+
+def test_normalize_query_collapses_whitespace():
+    """Test trivially different queries share a key."""
+    assert normalize_query("  senior   python\ndeveloper ") == "senior python developer"
+
+
+@pytest.mark.asyncio
+async def test_get_or_compute_hits_cache():
+    """Test a repeated query only computes the embedding once."""
+    cache = EmbeddingCache(redis_client=FakeRedis())
+    calls = []
+
+    async def compute(text):
+        calls.append(text)
+        return [0.25, 0.5]
+
+    first = await cache.get_or_compute("model-a", "hello  world", compute)
+    second = await cache.get_or_compute("model-a", "hello world", compute)
+
+    assert first == second == [0.25, 0.5]
+    assert calls == ["hello world"]
+
+
+@pytest.mark.asyncio
+async def test_cache_is_keyed_by_model():
+    """Test the same text under different models is cached separately."""
+    cache = EmbeddingCache()
+    await cache.set("model-a", "query", [1.0])
+
+    assert await cache.get("model-a", "query") == [1.0]
+    assert await cache.get("model-b", "query") is None
+
+
+@pytest.mark.asyncio
+async def test_redis_tier_shared_between_instances():
+    """Test a second process-local cache is warmed from Redis with a TTL."""
+    redis = FakeRedis()
+    writer = EmbeddingCache(redis_client=redis, ttl_seconds=60)
+    reader = EmbeddingCache(redis_client=redis, ttl_seconds=60)
+
+    await writer.set("model-a", "query", [1.5, 2.5])
+
+    assert redis.set_calls[0][1] == 60
+    assert await reader.get("model-a", "query") == [1.5, 2.5]
+
+
+@pytest.mark.asyncio
+async def test_lru_evicts_oldest_entry():
+    """Test the in-process tier is bounded."""
+    cache = EmbeddingCache(max_entries=2)
+    await cache.set("m", "a", [1.0])
+    await cache.set("m", "b", [2.0])
+    await cache.get("m", "a")
+    await cache.set("m", "c", [3.0])
+
+    assert await cache.get("m", "a") == [1.0]
+    assert await cache.get("m", "b") is None
+
+
+@pytest.mark.asyncio
+async def test_redis_errors_degrade_to_miss():
+    """Test an unavailable Redis does not break lookups."""
+    cache = EmbeddingCache(redis_client=BrokenRedis())
+
+    assert await cache.get("m", "query") is None
+    await cache.set("m", "query", [1.0])
+    assert await cache.get("m", "query") == [1.0]
+
+
+@pytest.mark.asyncio
+async def test_get_many_or_compute_batches_misses():
+    """Test only uncached, distinct queries are sent in one batch."""
+    cache = EmbeddingCache(redis_client=FakeRedis())
+    await cache.set("model-a", "cached", [1.0])
+    batches = []
+
+    async def compute_batch(texts):
+        batches.append(texts)
+        return [[float(len(text))] for text in texts]
+
+    result = await cache.get_many_or_compute(
+        "model-a", ["cached", "new  one", "new one", "other"], compute_batch
+    )
+
+    assert result == [[1.0], [7.0], [7.0], [5.0]]
+    assert batches == [["new one", "other"]]
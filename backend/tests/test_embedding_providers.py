@@ -0,0 +1,54 @@
+"""Tests for embedding providers."""
+
+import math
+import pytest
+from src.ai.embedding_providers import (
+    EmbeddingProviderError, LocalEmbeddingProvider, get_embedding_model, get_embedding_provider
+)
+from src.common.config import settings
+
+
+def cosine(a, b):
+    return sum(x * y for x, y in zip(a, b))
+
+
+@pytest.mark.asyncio
+async def test_local_provider_is_deterministic_and_normalized():
+    """Test local embeddings are stable, 768-dim and unit length."""
+    provider = LocalEmbeddingProvider()
+    first, second = await provider.embed(["refund policy", "refund policy"])
+
+    assert len(first) == 768
+    assert first == second
+    assert math.isclose(math.sqrt(sum(v * v for v in first)), 1.0, rel_tol=1e-9)
+    assert (await provider.embed([""]))[0][0] == 1.0
+
+
+@pytest.mark.asyncio
+async def test_local_provider_similarity_follows_vocabulary():
+    """Test texts sharing words are closer than unrelated texts."""
+    provider = LocalEmbeddingProvider()
+    query, related, unrelated = await provider.embed([
+        "employee vacation policy",
+        "the vacation policy for every employee",
+        "quarterly revenue forecast",
+    ])
+
+    assert cosine(query, related) > cosine(query, unrelated)
+
+
+@pytest.mark.asyncio
+async def test_provider_selected_from_settings(monkeypatch):
+    """Test EMBEDDING_PROVIDER selects the provider and its model name."""
+    monkeypatch.setattr(settings, "EMBEDDING_PROVIDER", "local")
+    monkeypatch.setattr(settings, "LOCAL_EMBEDDING_LATENCY_MS", 5)
+
+    provider = await get_embedding_provider(db=None, company_id=None)
+
+    assert isinstance(provider, LocalEmbeddingProvider)
+    assert provider.latency_ms == 5
+    assert get_embedding_model() == "local-hash-768"
+
+    monkeypatch.setattr(settings, "EMBEDDING_PROVIDER", "unknown")
+    with pytest.raises(EmbeddingProviderError):
+        get_embedding_model()
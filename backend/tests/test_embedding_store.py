@@ -0,0 +1,225 @@
+"""Tests for content-addressed embedding reuse."""
+
+import pytest
+from types import SimpleNamespace
+from uuid import uuid4
+from src.ai.embedding_store import ChunkDiff, EmbeddingStore, content_hash, normalize_chunk
+
+
+class InMemoryEmbeddingStore(EmbeddingStore):
+    """EmbeddingStore with the DB lookup replaced by a dict."""
+
+    def __init__(self, existing):
+        super().__init__(db=None, company_id=uuid4(), model="text-embedding-004")
+        self.existing = existing
+
+    async def lookup(self, hashes):
+        return {h: self.existing[h] for h in hashes if h in self.existing}
+
+
+def test_content_hash_ignores_whitespace_differences():
+    """Test reflowed text maps to the same hash."""
+    assert content_hash("Team  player,\nself starter") == content_hash("Team player, self starter")
+    assert content_hash("Team player") != content_hash("team player")
+
+
+def test_normalize_chunk_strips_edges():
+    """Test normalization trims and collapses whitespace."""
+    assert normalize_chunk("  a \t b\n") == "a b"
+
+
+@pytest.mark.asyncio
+async def test_embed_chunks_only_embeds_misses():
+    """Test known content is reused and only new content is embedded."""
+    boilerplate = "References available upon request."
+    store = InMemoryEmbeddingStore({content_hash(boilerplate): [1.0, 0.0]})
+    embedded_texts = []
+
+    async def embed(texts):
+        embedded_texts.extend(texts)
+        return [[0.0, 1.0] for _ in texts]
+
+    results = await store.embed_chunks([boilerplate, "Led a team of 5 engineers."], embed)
+
+    assert embedded_texts == ["Led a team of 5 engineers."]
+    assert results[0] == (content_hash(boilerplate), [1.0, 0.0])
+    assert results[1][1] == [0.0, 1.0]
+
+
+@pytest.mark.asyncio
+async def test_embed_chunks_dedupes_within_batch():
+    """Test repeated content in one document is embedded once."""
+    store = InMemoryEmbeddingStore({})
+    calls = []
+
+    async def embed(texts):
+        calls.append(list(texts))
+        return [[float(len(t))] for t in texts]
+
+    results = await store.embed_chunks(["same", "other", "same"], embed)
+
+    assert calls == [["same", "other"]]
+    assert [r[1] for r in results] == [[4.0], [5.0], [4.0]]
+
+
+@pytest.mark.asyncio
+async def test_embed_chunks_skips_embed_when_all_known():
+    """Test a fully known document makes no embedding calls."""
+    store = InMemoryEmbeddingStore({content_hash("x"): [0.5]})
+
+    async def embed(texts):
+        raise AssertionError("should not embed")
+
+    assert await store.embed_chunks(["x"], embed) == [(content_hash("x"), [0.5])]
+
+
+@pytest.mark.asyncio
+async def test_embed_chunks_propagates_failed_embeddings_as_none():
+    """Test a failed embedding is reported as None for that chunk."""
+    store = InMemoryEmbeddingStore({})
+
+    async def embed(texts):
+        return [None for _ in texts]
+
+    results = await store.embed_chunks(["x"], embed)
+
+    assert results == [(content_hash("x"), None)]
+
+
+def test_chunk_diff_reuses_unchanged_chunks():
+    """Test only edited chunks need embedding and removed ones are stale."""
+    diff = ChunkDiff([
+        ("id-0", content_hash("intro"), "0"),
+        ("id-1", content_hash("old policy"), "1"),
+        ("id-2", content_hash("appendix"), "2"),
+    ])
+
+    new_chunks = ["intro", "new section", "appendix"]
+    needs_embedding = [text for i, text in enumerate(new_chunks) if not diff.match(i, text)]
+
+    assert needs_embedding == ["new section"]
+    assert diff.stale() == ["id-1"]
+    assert diff.moved == []
+
+
+def test_chunk_diff_tracks_moved_and_duplicate_chunks():
+    """Test shifted chunks are re-positioned and duplicates claim one row each."""
+    diff = ChunkDiff([
+        ("id-0", content_hash("same"), "0"),
+        ("id-1", content_hash("tail"), "1"),
+    ])
+
+    assert diff.match(0, "inserted") is False
+    assert diff.match(1, "same") is True
+    assert diff.match(2, "same") is False
+    assert diff.match(3, "tail") is True
+    assert diff.moved == [
+        {"id": "id-0", "chunk_index": "1"},
+        {"id": "id-1", "chunk_index": "3"},
+    ]
+    assert diff.stale() == []
+
+
+class FailingReindexSession:
+    """Fails the document lookup and records the status restore that follows."""
+
+    def __init__(self):
+        self.statements = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        if len(self.statements) == 1:
+            raise RuntimeError("connection lost")
+
+    async def rollback(self):
+        pass
+
+    async def commit(self):
+        pass
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("previous_status", ["completed", "failed"])
+async def test_failed_reindex_restores_previous_status(monkeypatch, previous_status):
+    """Test a failed update puts the document back in the status it had, not always completed."""
+    import src.config.models  # noqa: F401 - registers IntegrationRegistry for relationship mapping
+    from src.ai import worker
+
+    session, deleted = FailingReindexSession(), []
+
+    async def delete(key):
+        deleted.append(key)
+
+    monkeypatch.setattr(worker, "AsyncSessionLocal", lambda: session)
+    monkeypatch.setattr(worker, "get_blob_store", lambda: SimpleNamespace(delete=delete))
+
+    await worker.reindex_document({}, str(uuid4()), "blob", "txt", "a.txt", 3, previous_status)
+
+    restore = session.statements[-1].compile().params
+    assert restore["upload_status"] == previous_status
+    assert restore["upload_error"] == "Update failed: connection lost"
+    assert deleted == ["blob"]
+
+
+class FakeProvider:
+    """Embedding provider that records when, relative to the session's statements, it embeds."""
+
+    model = "test-model"
+
+    def __init__(self, session):
+        self.session = session
+        self.calls = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def embed(self, texts):
+        self.calls.append((list(texts), len(self.session.statements)))
+        return [[0.5] for _ in texts]
+
+
+@pytest.mark.asyncio
+async def test_reindex_embeds_before_locking_the_document(monkeypatch, fake_session):
+    """Test new chunks are embedded before the row lock, which only covers the swap."""
+    from contextlib import asynccontextmanager
+    import src.config.models  # noqa: F401 - registers IntegrationRegistry for relationship mapping
+    from src.ai import worker
+
+    document = SimpleNamespace(id=uuid4(), company_id=uuid4(), version=1)
+    kept = content_hash("kept")
+    session = fake_session(
+        [document], [kept], [], [document], [("id-1", kept, "0", FakeProvider.model)]
+    )
+    provider = FakeProvider(session)
+
+    async def get_provider(db, company_id):
+        return provider
+
+    async def delete(key):
+        pass
+
+    @asynccontextmanager
+    async def extracted_chunks(blob_key, file_type):
+        yield ["new", "kept"]
+
+    monkeypatch.setattr(worker, "AsyncSessionLocal", lambda: session)
+    monkeypatch.setattr(worker, "get_blob_store", lambda: SimpleNamespace(delete=delete))
+    monkeypatch.setattr(worker, "get_embedding_provider", get_provider)
+    monkeypatch.setattr(worker, "_extracted_chunks", extracted_chunks)
+
+    await worker.reindex_document({}, str(document.id), "blob", "txt", "b.txt", 9)
+
+    locked = next(i for i, statement in enumerate(session.statements) if statement._for_update_arg is not None)
+    assert provider.calls == [(["new"], 3)]
+    assert locked == 3
+    assert [(chunk.content, chunk.chunk_index) for chunk in session.added] == [("new", "0")]
+    assert document.version == 2 and document.upload_status == "completed"
@@ -0,0 +1,78 @@
+"""Tests for the projection-based entity library listing."""
+
+from datetime import datetime, timedelta
+from uuid import uuid4
+import pytest
+from sqlalchemy.dialects import postgresql
+import src.config.models  # noqa: F401 - registers IntegrationRegistry for relationship mapping
+from src.ai.pagination import decode_cursor
+from src.ai.schemas import EntityLibraryPage
+from src.ai.service import AIService
+
+
+class StatsRow:
+    def __init__(self, entity_id, run_count, last_run_at, success_rate):
+        self.entity_id = entity_id
+        self.run_count = run_count
+        self.last_run_at = last_run_at
+        self.success_rate = success_rate
+
+
+def make_rows(count):
+    now = datetime(2026, 10, 1, 12, 0)
+    return [
+        {
+            "id": uuid4(), "name": f"entity-{i}", "display_name": None, "description": None,
+            "type": "AGENT", "version": "1.0.0", "status": "ACTIVE", "tags": ["sales"], "parent_id": None,
+            "created_at": now - timedelta(minutes=i), "updated_at": now,
+            "model_name": "gpt-4o", "step_count": 3,
+        }
+        for i in range(count)
+    ]
+
+
+def compiled(statement):
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.asyncio
+async def test_library_is_a_projection(fake_session):
+    """Test the listing selects summary columns only and never touches runs."""
+    db = fake_session(make_rows(1))
+
+    await AIService(db).get_entity_library(uuid4(), type="AGENT", tag="sales")
+    sql = compiled(db.statements[0])
+
+    assert len(db.statements) == 1
+    assert "execution_runs" not in sql
+    assert "hierarchical_entities.planning," not in sql
+    assert "jsonb_array_length" in sql
+    assert "hierarchical_entities.tags @>" in sql
+
+
+@pytest.mark.asyncio
+async def test_model_name_filter_matches_expression_index(fake_session):
+    """Test the model name filter renders the indexed expression with inline keys."""
+    db = fake_session(make_rows(1))
+
+    await AIService(db).get_entity_library(uuid4(), model_name="gpt-4o")
+    sql = str(db.statements[0].compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+    assert "((hierarchical_entities.logic_gate -> 'reasoning_config') ->> 'model_name') = 'gpt-4o'" in sql
+
+
+@pytest.mark.asyncio
+async def test_library_pages_and_stats(fake_session):
+    """Test paging and per-entity run stats from one grouped query."""
+    rows = make_rows(3)
+    last_run = datetime(2026, 10, 1, 11, 0)
+    db = fake_session(rows, [StatsRow(rows[0]["id"], 4, last_run, 0.75)])
+
+    page = await AIService(db).get_entity_library(uuid4(), limit=2, include_stats=True)
+    EntityLibraryPage.model_validate(page)
+
+    assert len(page["items"]) == 2
+    assert page["items"][0]["stats"] == {"run_count": 4, "last_run_at": last_run, "success_rate": 0.75}
+    assert page["items"][1]["stats"]["run_count"] == 0
+    assert decode_cursor(page["next_cursor"]) == (rows[1]["created_at"], rows[1]["id"])
+    assert "GROUP BY execution_runs.entity_id" in compiled(db.statements[1])
@@ -0,0 +1,99 @@
+"""Tests for keyset pagination of the execution history."""
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from uuid import uuid4
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+import src.config.models  # noqa: F401 - registers IntegrationRegistry for relationship mapping
+from src.ai.models import ExecutionRun
+from src.ai.pagination import decode_cursor, encode_cursor, to_naive_utc
+from src.ai.service import AIService
+
+
+def make_runs(count):
+    now = datetime(2026, 10, 1, 12, 0)
+    return [
+        ExecutionRun(
+            id=uuid4(), entity_id=uuid4(), company_id=uuid4(), status="COMPLETED",
+            total_cost_usd=Decimal("0.0125"), total_tokens=10, created_at=now - timedelta(minutes=i)
+        )
+        for i in range(count)
+    ]
+
+
+def compiled(statement):
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def test_cursor_roundtrip():
+    """Test a cursor decodes back to the (created_at, id) it was made from."""
+    created_at, run_id = datetime(2026, 10, 1, 12, 0, 0, 123456), uuid4()
+
+    assert decode_cursor(encode_cursor(created_at, run_id)) == (created_at, run_id)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor(datetime.utcnow(), uuid4())[:-3], ""])
+def test_invalid_cursor_is_400(cursor):
+    """Test malformed cursors are rejected as client errors."""
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor)
+    assert exc.value.status_code == 400
+
+
+def test_aware_filters_become_naive_utc():
+    """Test timezone-aware filter values match the naive UTC columns."""
+    aware = datetime(2026, 10, 1, 14, 0, tzinfo=timezone(timedelta(hours=2)))
+
+    assert to_naive_utc(aware) == datetime(2026, 10, 1, 12, 0)
+
+
+@pytest.mark.asyncio
+async def test_page_has_next_cursor_when_more_rows(fake_session):
+    """Test a full page fetches limit + 1 rows and points the cursor at the last item."""
+    runs = make_runs(3)
+    db = fake_session(runs)
+
+    page = await AIService(db).get_executions(uuid4(), limit=2, fields=["id", "status", "total_cost_usd"])
+
+    assert [item["id"] for item in page["items"]] == [str(runs[0].id), str(runs[1].id)]
+    assert set(page["items"][0]) == {"id", "status", "total_cost_usd"}
+    assert page["items"][0]["total_cost_usd"] == 0.0125
+    assert decode_cursor(page["next_cursor"]) == (runs[1].created_at, runs[1].id)
+    assert "LIMIT" in compiled(db.statements[0])
+
+
+@pytest.mark.asyncio
+async def test_last_page_has_no_cursor(fake_session):
+    """Test a short page ends the listing."""
+    page = await AIService(fake_session(make_runs(1))).get_executions(uuid4(), limit=2, fields=["id"])
+
+    assert page["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_cursor_and_filters_in_query(fake_session):
+    """Test the cursor becomes a row comparison and filters are applied."""
+    db = fake_session([])
+    cursor = encode_cursor(datetime(2026, 10, 1), uuid4())
+
+    await AIService(db).get_executions(
+        uuid4(), cursor=cursor, status="FAILED", entity_id=uuid4(), min_cost=0.5, input_key="ticket_id", fields=["id"]
+    )
+    sql = compiled(db.statements[0])
+
+    assert "(execution_runs.created_at, execution_runs.id) < (" in sql
+    assert "execution_runs.status =" in sql
+    assert "execution_runs.total_cost_usd >=" in sql
+    assert "execution_runs.input_data ? " in sql
+    assert "ORDER BY execution_runs.created_at DESC, execution_runs.id DESC" in sql
+    assert "hierarchical_entities" not in sql
+
+
+@pytest.mark.asyncio
+async def test_unknown_field_is_400(fake_session):
+    """Test sparse field selection only accepts summary fields."""
+    with pytest.raises(HTTPException) as exc:
+        await AIService(fake_session([])).get_executions(uuid4(), fields=["id", "input_data"])
+    assert exc.value.status_code == 400
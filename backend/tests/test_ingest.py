@@ -0,0 +1,92 @@
+"""Tests for streaming extraction and token-aware chunking."""
+
+import io
+import pytest
+from src.ai.ingest import TextChunker, batched, iter_document_text
+from src.ai.tokens import count_tokens
+
+
+def test_chunks_respect_token_budget():
+    """Test no chunk exceeds the configured token size."""
+    text = " ".join(f"Sentence number {i} talks about hiring." for i in range(200))
+    chunker = TextChunker(chunk_tokens=50, overlap_tokens=10)
+
+    chunks = list(chunker.chunk([text]))
+
+    assert len(chunks) > 1
+    assert all(count_tokens(c) <= 50 for c in chunks)
+
+
+def test_chunks_break_on_sentence_boundaries():
+    """Test chunks start and end on whole sentences."""
+    text = " ".join(f"Candidate {i} has strong skills." for i in range(40))
+    chunker = TextChunker(chunk_tokens=30, overlap_tokens=0)
+
+    for chunk in chunker.chunk([text]):
+        assert chunk.startswith("Candidate")
+        assert chunk.endswith(".")
+
+
+def test_overlap_repeats_trailing_sentences():
+    """Test consecutive chunks share trailing context."""
+    text = " ".join(f"Fact {i} is here." for i in range(30))
+    chunker = TextChunker(chunk_tokens=20, overlap_tokens=8)
+
+    chunks = list(chunker.chunk([text]))
+
+    last_sentence = chunks[0].split(". ")[-1]
+    assert chunks[1].startswith(last_sentence.rstrip("."))
+
+
+def test_paragraph_breaks_are_preserved():
+    """Test paragraphs within a chunk stay separated."""
+    chunker = TextChunker(chunk_tokens=100, overlap_tokens=0)
+
+    chunks = list(chunker.chunk(["First paragraph.\n\nSecond paragraph.", "Next page."]))
+
+    assert chunks == ["First paragraph.\n\nSecond paragraph.\n\nNext page."]
+
+
+def test_long_sentence_is_split_on_words():
+    """Test a sentence larger than a chunk is split rather than dropped."""
+    chunker = TextChunker(chunk_tokens=10, overlap_tokens=0)
+    sentence = " ".join(["word"] * 35)
+
+    chunks = list(chunker.chunk([sentence]))
+
+    assert " ".join(chunks) == sentence
+    assert all(count_tokens(c) <= 10 for c in chunks)
+
+
+def test_chunking_is_lazy():
+    """Test segments are consumed incrementally, not all up front."""
+    consumed = []
+
+    def pages():
+        for i in range(1000):
+            consumed.append(i)
+            yield f"Page {i} has one sentence."
+
+    chunks = TextChunker(chunk_tokens=20, overlap_tokens=0).chunk(pages())
+    next(chunks)
+
+    assert len(consumed) < 10
+
+
+def test_invalid_overlap_rejected():
+    """Test overlap must be smaller than the chunk size."""
+    with pytest.raises(ValueError):
+        TextChunker(chunk_tokens=10, overlap_tokens=10)
+
+
+def test_iter_document_text_streams_txt_blocks():
+    """Test plain text is yielded paragraph by paragraph."""
+    data = io.BytesIO(b"Line one\nline two\n\nSecond block\n")
+
+    assert list(iter_document_text(data, "txt")) == ["Line one\nline two\n", "Second block\n"]
+    assert not data.closed
+
+
+def test_batched():
+    """Test batching of a stream."""
+    assert list(batched(range(5), 2)) == [[0, 1], [2, 3], [4]]
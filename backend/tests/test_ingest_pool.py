@@ -0,0 +1,89 @@
+"""Tests for out-of-process document parsing."""
+
+import os
+import signal
+import time
+import pytest
+from src.ai.ingest_pool import IngestError, IngestProcessPool
+
+
+def _square(x):
+    return x * x
+
+
+def _fail():
+    raise ValueError("corrupt xref table")
+
+
+def _hang():
+    time.sleep(60)
+
+
+def _crash():
+    os.kill(os.getpid(), signal.SIGKILL)
+
+
+@pytest.mark.asyncio
+async def test_run_returns_child_result():
+    """Test work runs in a child process and returns its result."""
+    pool = IngestProcessPool(max_workers=1)
+
+    assert await pool.run(_square, 7) == 49
+
+
+@pytest.mark.asyncio
+async def test_child_exception_becomes_ingest_error():
+    """Test parser exceptions are reported with a reason."""
+    pool = IngestProcessPool(max_workers=1)
+
+    with pytest.raises(IngestError, match="ValueError: corrupt xref table"):
+        await pool.run(_fail)
+
+
+@pytest.mark.asyncio
+async def test_timeout_kills_child():
+    """Test a hanging parser is killed after the timeout."""
+    pool = IngestProcessPool(max_workers=1)
+    start = time.monotonic()
+
+    with pytest.raises(IngestError, match="timed out"):
+        await pool.run(_hang, timeout=1)
+
+    assert time.monotonic() - start < 30
+
+
+@pytest.mark.asyncio
+async def test_crash_is_isolated():
+    """Test a crashing parser does not take down the caller."""
+    pool = IngestProcessPool(max_workers=1)
+
+    with pytest.raises(IngestError, match="crashed"):
+        await pool.run(_crash)
+
+    assert await pool.run(_square, 3) == 9
+
+
+@pytest.mark.asyncio
+async def test_extract_chunks_to_file_in_child(tmp_path, monkeypatch):
+    """Test a staged text blob is chunked to a spool file by a child process."""
+    import json
+    from src.ai.ingest_pool import extract_chunks_to_file
+    from src.common.blob_store import LocalBlobStore
+
+    monkeypatch.setenv("BLOB_STORAGE_DIR", str(tmp_path / "blobs"))
+    store = LocalBlobStore(str(tmp_path / "blobs"))
+
+    async def upload():
+        yield b"First paragraph here.\n\nSecond paragraph here.\n"
+
+    key, _ = await store.write_stream(upload())
+    spool_path = str(tmp_path / "chunks.jsonl")
+
+    count = await IngestProcessPool(max_workers=1).run(
+        extract_chunks_to_file, key, "txt", 100, 10, spool_path
+    )
+
+    with open(spool_path) as spool:
+        chunks = [json.loads(line) for line in spool]
+    assert count == 1
+    assert chunks == ["First paragraph here.\n\nSecond paragraph here."]
@@ -0,0 +1,97 @@
+"""Tests for the mock LLM server and the provider clients against it."""
+
+import httpx
+import json
+import pytest
+from src.ai.llm_providers import GoogleProvider, OpenAIProvider
+from src.mock_llm.config import settings
+from src.mock_llm.main import app, state
+
+
+@pytest.fixture
+def client():
+    state.reset(settings.model_copy(update={"LATENCY_MS": 0, "SEED": 1}))
+    transport = httpx.ASGITransport(app=app)
+    return httpx.AsyncClient(transport=transport, base_url="http://mock")
+
+
+@pytest.mark.asyncio
+async def test_openai_provider_roundtrip(client):
+    """Test the OpenAI provider parses mock completions and token usage."""
+    provider = OpenAIProvider("http://mock/v1")
+    result = await provider.complete(client, "key", "gpt-4o", "system", "Summarize the report")
+
+    assert result["output"]
+    assert result["prompt_tokens"] > 0
+    assert result["completion_tokens"] >= settings.COMPLETION_TOKENS
+
+
+@pytest.mark.asyncio
+async def test_google_provider_scripted_tool_call(client):
+    """Test scripted responses, including TOOL: calls, cycle per rule."""
+    state.set_script({"rules": [
+        {"match": "weather", "responses": ["TOOL:web_search:weather today", "It is sunny."]}
+    ]})
+    provider = GoogleProvider("http://mock/v1beta")
+
+    first = await provider.complete(client, "key", "gemini-pro", "system", "What is the weather?")
+    second = await provider.complete(client, "key", "gemini-pro", "system", "What is the weather?")
+
+    assert first["output"] == "TOOL:web_search:weather today"
+    assert second["output"] == "It is sunny."
+
+
+@pytest.mark.asyncio
+async def test_error_injection(client):
+    """Test forced 429s use provider error formats and surface as exceptions."""
+    response = await client.post(
+        "/v1/chat/completions",
+        headers={"X-Mock-Error": "429"},
+        json={"model": "gpt-4o", "messages": [{"role": "user", "content": "hi"}]}
+    )
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == str(settings.RETRY_AFTER_SECONDS)
+    assert response.json()["error"]["code"] == "rate_limit_exceeded"
+
+    state.config.SERVER_ERROR_RATE = 1.0
+    with pytest.raises(Exception, match="Google API Error"):
+        await GoogleProvider("http://mock/v1beta").complete(client, "key", "gemini-pro", "s", "u")
+    assert state.stats["errors"] == {"429": 1, "500": 1}
+
+
+@pytest.mark.asyncio
+async def test_openai_streaming_and_max_tokens(client):
+    """Test SSE streaming reassembles the reply and max_tokens truncates it."""
+    response = await client.post(
+        "/v1/chat/completions",
+        json={
+            "model": "gpt-4o",
+            "stream": True,
+            "stream_options": {"include_usage": True},
+            "max_tokens": 5,
+            "messages": [{"role": "user", "content": "tell me a story"}]
+        }
+    )
+    events = [line[6:] for line in response.text.splitlines() if line.startswith("data: ")]
+    assert events[-1] == "[DONE]"
+    chunks = [json.loads(e) for e in events[:-1]]
+    text = "".join(c["choices"][0]["delta"].get("content", "") for c in chunks if c["choices"])
+
+    assert 0 < len(text.split()) <= 5
+    assert chunks[-2]["choices"][0]["finish_reason"] == "length"
+    assert chunks[-1]["usage"]["completion_tokens"] <= 5
+
+
+@pytest.mark.asyncio
+async def test_gemini_batch_embeddings(client):
+    """Test batchEmbedContents returns one deterministic 768-dim vector per request."""
+    body = {"requests": [
+        {"model": "models/text-embedding-004", "content": {"parts": [{"text": t}]}}
+        for t in ["alpha", "beta", "alpha"]
+    ]}
+    response = await client.post("/v1beta/models/text-embedding-004:batchEmbedContents", json=body)
+    embeddings = response.json()["embeddings"]
+
+    assert len(embeddings) == 3
+    assert len(embeddings[0]["values"]) == 768
+    assert embeddings[0] == embeddings[2] != embeddings[1]
@@ -0,0 +1,173 @@
+"""Tests for monthly log partition maintenance."""
+
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+import pytest
+from sqlalchemy.dialects import postgresql
+import src.config.models  # noqa: F401 - registers IntegrationRegistry for relationship mapping
+from src.ai import partitions
+from src.ai.models import ExecutionRun
+from src.ai.trace_loader import load_trace
+
+
+@pytest.fixture
+def existing_partitions(monkeypatch):
+    """Partition names reported by list_partitions, in place of the pg_inherits lookup."""
+    names = []
+
+    async def list_partitions(db, table):
+        return [name for name in names if name.startswith(table + "_y")]
+
+    monkeypatch.setattr(partitions, "list_partitions", list_partitions)
+    return names
+
+
+def test_add_months_crosses_years():
+    """Test month arithmetic wraps around the year in both directions."""
+    assert partitions.add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+    assert partitions.add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+
+
+def test_partition_name_roundtrip():
+    """Test partition names encode their month and non-partitions are ignored."""
+    name = partitions.partition_name("usage_logs", date(2026, 3, 1))
+
+    assert name == "usage_logs_y2026m03"
+    assert partitions.partition_month(name) == date(2026, 3, 1)
+    assert partitions.partition_month("usage_logs") is None
+
+
+def test_create_partition_sql_bounds():
+    """Test a partition covers exactly one month, upper bound exclusive."""
+    sql = partitions.create_partition_sql("llm_interaction_logs", date(2026, 12, 1))
+
+    assert "llm_interaction_logs_y2026m12 PARTITION OF llm_interaction_logs" in sql
+    assert "FROM ('2026-12-01') TO ('2027-01-01')" in sql
+
+
+def test_expired_partitions_keeps_retention_window():
+    """Test only months before the retention window expire, oldest first."""
+    names = [f"usage_logs_y2026m{month:02d}" for month in range(12, 0, -1)]
+
+    expired = partitions.expired_partitions(names, date(2026, 10, 19), retention_months=6)
+
+    assert expired == ["usage_logs_y2026m01", "usage_logs_y2026m02", "usage_logs_y2026m03"]
+    assert partitions.expired_partitions(names, date(2026, 10, 19), retention_months=0) == []
+
+
+@pytest.mark.asyncio
+async def test_ensure_partitions_creates_only_missing_months(fake_session, existing_partitions):
+    """Test upcoming partitions are created for every table unless they already exist."""
+    existing_partitions.extend(["llm_interaction_logs_y2026m10", "llm_interaction_logs_y2026m11"])
+    db = fake_session()
+
+    created = await partitions.ensure_partitions(db, today=date(2026, 10, 19), months_ahead=2)
+
+    assert created == [
+        "llm_interaction_logs_y2026m12",
+        "tool_interaction_logs_y2026m10", "tool_interaction_logs_y2026m11", "tool_interaction_logs_y2026m12",
+        "usage_logs_y2026m10", "usage_logs_y2026m11", "usage_logs_y2026m12",
+    ]
+    assert len(db.statements) == len(created)
+
+
+@pytest.mark.asyncio
+async def test_archive_exports_before_detaching(monkeypatch, tmp_path, fake_session, existing_partitions):
+    """Test an expired partition is exported, then detached and dropped, and a failed export keeps it attached."""
+    existing_partitions.extend(["tool_interaction_logs_y2025m01", "tool_interaction_logs_y2026m10"])
+    db = fake_session()
+    exported = []
+
+    async def export(session, name, archive_dir):
+        exported.append((name, len(session.statements)))
+        return tmp_path / f"{name}.csv.gz"
+
+    monkeypatch.setattr(partitions, "export_partition", export)
+    archived = await partitions.archive_expired_partitions(db, date(2026, 10, 19), 12, str(tmp_path))
+
+    assert archived == [tmp_path / "tool_interaction_logs_y2025m01.csv.gz"]
+    assert exported == [("tool_interaction_logs_y2025m01", 0)]
+    assert [str(statement) for statement in db.statements] == [
+        "ALTER TABLE tool_interaction_logs DETACH PARTITION tool_interaction_logs_y2025m01",
+        "DROP TABLE tool_interaction_logs_y2025m01",
+    ]
+
+    async def failing_export(session, name, archive_dir):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(partitions, "export_partition", failing_export)
+    db.statements.clear()
+    with pytest.raises(OSError):
+        await partitions.archive_expired_partitions(db, date(2026, 10, 19), 12, str(tmp_path))
+    assert db.statements == []
+
+
+@pytest.mark.asyncio
+async def test_trace_log_queries_bound_partition_key(fake_session):
+    """Test trace log loads start at the earliest run's month, less the clock skew margin."""
+    started = datetime(2026, 10, 1, 0, 30)
+    root = ExecutionRun(id=uuid4(), company_id=uuid4(), entity_id=uuid4(), created_at=started)
+    child = ExecutionRun(
+        id=uuid4(), company_id=root.company_id, entity_id=uuid4(),
+        parent_run_id=root.id, created_at=started + timedelta(seconds=5)
+    )
+    db = fake_session([root, child])
+
+    await load_trace(db, root.id, root.company_id)
+    llm_sql, tool_sql = (
+        statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+        for statement in db.statements[1:3]
+    )
+
+    assert "llm_interaction_logs.created_at >= '2026-09-01 00:00:00'" in str(llm_sql)
+    assert "tool_interaction_logs.created_at >= '2026-09-01 00:00:00'" in str(tool_sql)
+
+
+
+class LockConnection:
+    def __init__(self, granted):
+        self.granted = granted
+        self.unlocked = False
+
+    async def scalar(self, statement, params):
+        return self.granted
+
+    async def execute(self, statement, params):
+        self.unlocked = "pg_advisory_unlock" in str(statement)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("granted", [True, False])
+async def test_maintenance_runs_on_one_worker(monkeypatch, fake_session, granted):
+    """Test replicas that do not win the advisory lock skip partition maintenance."""
+    from src.ai import worker
+
+    connection, calls = LockConnection(granted), []
+
+    @asynccontextmanager
+    async def connect():
+        yield connection
+
+    @asynccontextmanager
+    async def session():
+        yield fake_session()
+
+    async def ensure_partitions(db):
+        calls.append("ensure")
+        return []
+
+    async def archive_expired_partitions(db):
+        calls.append("archive")
+        return []
+
+    monkeypatch.setattr(worker, "db_engine", SimpleNamespace(connect=connect))
+    monkeypatch.setattr(worker, "AsyncSessionLocal", session)
+    monkeypatch.setattr(partitions, "ensure_partitions", ensure_partitions)
+    monkeypatch.setattr(partitions, "archive_expired_partitions", archive_expired_partitions)
+
+    await worker.maintain_log_partitions({})
+
+    assert calls == (["ensure", "archive"] if granted else [])
+    assert connection.unlocked is granted
@@ -0,0 +1,175 @@
+"""Tests for compiled, cached entity execution plans."""
+
+from dataclasses import FrozenInstanceError
+from datetime import datetime
+from types import SimpleNamespace
+from uuid import uuid4
+import pytest
+import src.config.models  # noqa: F401 - registers IntegrationRegistry for relationship mapping
+from src.ai import service as service_module
+from src.ai.plan_compiler import PlanCache, compile_plan, version_key
+from src.ai.schemas import HierarchicalEntityUpdate
+from src.ai.service import AIService
+from src.ai.templating import Template
+from src.ai.worker import ExecutionEngine
+from benchmarks.template_bench import legacy_parse_variables
+
+
+def step(name, type="THOUGHT", **target):
+    return {"step_id": str(uuid4()), "order": 1, "name": name, "type": type, "target": target}
+
+
+def make_entity(steps=(), **fields):
+    values = dict(
+        id=uuid4(), version="1.0.0", updated_at=datetime(2026, 10, 1), logic_gate=None, llm_config=None,
+        identity=None, capabilities=None, planning={"static_plan": {"steps": list(steps)}}
+    )
+    values.update(fields)
+    return SimpleNamespace(**values)
+
+
+def test_compile_resolves_entity_settings():
+    """Test model config, persona prompt and context settings are resolved once."""
+    entity = make_entity(
+        [step("draft", prompt_template="Write about {{topic}}")],
+        llm_config={"model_provider": "gemini", "model_name": "gemini-pro"},
+        identity={"persona": {"system_prompt": "You are terse."}},
+        capabilities={"context_engineering": {"max_context_tokens": 1000}},
+    )
+
+    plan = compile_plan(entity)
+
+    assert plan.model_config["model_name"] == "gemini-pro"
+    assert plan.system_prompt == "You are terse."
+    assert plan.max_context_tokens == 1000
+    assert plan.store_artifacts is True
+    assert plan.final_step == "draft"
+    assert plan.steps[0].prompt.render({"topic": "tides"}) == "Write about tides"
+
+
+def test_compile_defaults_and_templates():
+    """Test defaults apply and each step gets the templates it renders."""
+    entity = make_entity([
+        step("research", "RETRIEVAL"),
+        step("outline", prompt_template="Outline {{research}} for {{audience}}"),
+        step("draft"),
+        step("polish", prompt_template="Polish {{draft.text}}"),
+    ])
+
+    plan = compile_plan(entity)
+
+    assert plan.model_config["model_name"] == "gpt-4o"
+    assert plan.system_prompt == "You are a helpful assistant."
+    assert [(compiled.prompt is not None, compiled.query is not None) for compiled in plan.steps] == [
+        (False, True), (True, False), (False, False), (True, False)
+    ]
+    assert plan.steps[0].query.render({"input": "tides"}) == "tides"
+
+
+def test_stored_prompt_with_unknown_filter_still_compiles():
+    """Test prompts saved before filters existed keep compiling and render their tags verbatim."""
+    plan = compile_plan(make_entity([step("draft", prompt_template="Shout {{ topic | upper }} about {{topic}}")]))
+
+    assert plan.steps[0].prompt.render({"topic": "tides"}) == "Shout {{ topic | upper }} about tides"
+
+
+def test_plan_is_immutable():
+    """Test compiled plans cannot be changed by a run."""
+    plan = compile_plan(make_entity([step("draft")], logic_gate={"reasoning_config": {"model_name": "gpt-4o"}}))
+
+    with pytest.raises(FrozenInstanceError):
+        plan.system_prompt = "changed"
+    with pytest.raises(TypeError):
+        plan.model_config["model_name"] = "other"
+
+
+def test_invalid_step_fails_compilation():
+    """Test steps are validated when the plan is compiled."""
+    with pytest.raises(ValueError):
+        compile_plan(make_entity([{"name": "broken"}]))
+
+
+def test_cache_is_keyed_by_version():
+    """Test a cached plan is only returned for the entity version it was compiled from."""
+    entity = make_entity([step("draft")])
+    cache = PlanCache(max_entries=2)
+    cache.put(compile_plan(entity))
+
+    assert cache.get(entity.id, version_key(entity)) is not None
+    assert cache.get(entity.id, ("1.0.0", datetime(2026, 10, 2))) is None
+
+    cache.invalidate(entity.id)
+    assert cache.get(entity.id, version_key(entity)) is None
+
+
+def test_cache_evicts_least_recently_used():
+    """Test the cache is bounded."""
+    entities = [make_entity() for _ in range(3)]
+    cache = PlanCache(max_entries=2)
+    cache.put(compile_plan(entities[0]))
+    cache.put(compile_plan(entities[1]))
+    cache.get(entities[0].id, version_key(entities[0]))
+    cache.put(compile_plan(entities[2]))
+
+    assert cache.get(entities[1].id, version_key(entities[1])) is None
+    assert cache.get(entities[0].id, version_key(entities[0])) is not None
+
+
+class CountingSession:
+    def __init__(self, entity):
+        self.entity = entity
+        self.gets = 0
+
+    async def get(self, model, entity_id):
+        self.gets += 1
+        return self.entity
+
+
+@pytest.mark.asyncio
+async def test_engine_loads_entity_only_on_cache_miss(monkeypatch):
+    """Test hot entities reuse their compiled plan across runs."""
+    cache = PlanCache()
+    monkeypatch.setattr("src.ai.worker.get_plan_cache", lambda: cache)
+    entity = make_entity([step("draft")])
+    db = CountingSession(entity)
+    engine = ExecutionEngine(db, redis_pool=None)
+
+    first = await engine._get_reconciled_plan(entity.id, version_key(entity), {})
+    second = await engine._get_reconciled_plan(entity.id, version_key(entity), {})
+    entity.updated_at = datetime(2026, 10, 2)
+    third = await engine._get_reconciled_plan(entity.id, version_key(entity), {})
+
+    assert first is second
+    assert third is not first
+    assert db.gets == 2
+
+
+@pytest.mark.asyncio
+async def test_update_entity_invalidates_plan(monkeypatch, fake_session):
+    """Test editing an entity drops its cached plan."""
+    cache = PlanCache()
+    entity = make_entity([step("draft")])
+    cache.put(compile_plan(entity))
+
+    async def get_entity(self, entity_id, company_id):
+        return entity
+
+    monkeypatch.setattr(service_module, "get_plan_cache", lambda: cache)
+    monkeypatch.setattr(AIService, "get_entity", get_entity)
+    await AIService(fake_session()).update_entity(entity.id, HierarchicalEntityUpdate(name="renamed"), uuid4())
+
+    assert cache.get(entity.id, version_key(entity)) is None
+
+
+@pytest.mark.parametrize("source, variables", [
+    ("Hello {{name}}", {"name": "Ada"}),
+    ("{{ user.profile.city }} / {{user.missing}}", {"user": {"profile": {"city": "Oslo"}}}),
+    ("{{a.b}} and {{a}}", {"a": "flat"}),
+    ("no variables", {}),
+    ("", {"x": 1}),
+    ("{{}} {{ }} {{x.y.z}}", {"x": {"y": 5}}),
+    ("{{ n }} {{ flag }}", {"n": None, "flag": False}),
+])
+def test_template_matches_parse_variables(source, variables):
+    """Test compiled templates render exactly like the regex parse_variables they replaced."""
+    assert Template(source).render(variables) == legacy_parse_variables(source, variables)
@@ -0,0 +1,55 @@
+"""Tests for the request profiling middleware."""
+
+import asyncio
+import time
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import create_engine, text
+from src.common.profiling import RequestProfilingMiddleware, instrument_engine
+
+db_engine = create_engine("sqlite://")
+instrument_engine(db_engine)
+
+app = FastAPI()
+app.add_middleware(RequestProfilingMiddleware, lag_interval_ms=5)
+
+
+@app.get("/queries/{count}")
+async def run_queries(count: int):
+    with db_engine.connect() as conn:
+        for _ in range(count):
+            conn.execute(text("SELECT 1"))
+    return {"ok": True}
+
+
+@app.get("/block")
+async def block_loop():
+    time.sleep(0.05)
+    return {"ok": True}
+
+
+@pytest.fixture
+def client():
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://app")
+
+
+@pytest.mark.asyncio
+async def test_counts_queries_per_request(client):
+    """Test X-DB-Queries counts only the statements of the current request."""
+    first = await client.get("/queries/3")
+    second = await client.get("/queries/1")
+
+    assert first.headers["x-db-queries"] == "3"
+    assert second.headers["x-db-queries"] == "1"
+    assert float(first.headers["x-db-time-ms"]) >= 0
+
+
+@pytest.mark.asyncio
+async def test_reports_event_loop_lag(client):
+    """Test a request that blocks the event loop reports the stall it caused."""
+    await client.get("/queries/0")  # start the monitor
+    await asyncio.sleep(0.02)
+    blocked = await client.get("/block")
+
+    assert float(blocked.headers["x-event-loop-lag-ms"]) >= 30
@@ -0,0 +1,133 @@
+"""
+EXPLAIN-based regression tests for the hot AI queries.
+
+Each query is captured from the service code that issues it and planned
+against TEST_DATABASE_URL (default DATABASE_URL) with migrations applied.
+Sequential scans are disabled for the session, so the planner picks an index
+whenever one can serve the query; a Seq Scan left in the plan means no index
+matches the query's shape. Skipped when no database is reachable.
+"""
+
+from datetime import datetime, timedelta
+from uuid import uuid4
+import json
+import os
+import re
+import pytest
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+import src.config.models  # noqa: F401 - registers IntegrationRegistry for relationship mapping
+from src.ai.models import ExecutionRun, UsageLog
+from src.ai.service import AIService
+from src.ai.trace_loader import load_trace
+from src.config.service import ConfigService
+
+HOT_TABLES = {
+    "execution_runs", "llm_interaction_logs", "tool_interaction_logs", "human_approvals",
+    "hierarchical_entities", "documents", "document_chunks", "integration_registry", "usage_logs",
+}
+
+
+class Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+async def build_queries(fake_session) -> dict:
+    """Statements issued by the service code, captured with canned replies."""
+    async def capture(call, *results) -> list:
+        db = fake_session(*results)
+        await call(db)
+        return db.statements
+
+    company_id, entity_id = uuid4(), uuid4()
+    now = datetime.utcnow()
+    run = ExecutionRun(id=uuid4(), company_id=company_id, entity_id=entity_id, created_at=now)
+
+    queries = {}
+    queries["execution_history"], = await capture(
+        lambda db: AIService(db).get_executions(company_id, fields=["id", "status", "created_at"]))
+    queries["execution_history_by_status"], = await capture(
+        lambda db: AIService(db).get_executions(company_id, status="FAILED", fields=["id"]))
+    queries["execution_history_by_entity"], = await capture(
+        lambda db: AIService(db).get_executions(company_id, entity_id=entity_id, fields=["id"]))
+    (
+        queries["trace_tree"], queries["trace_llm_logs"],
+        queries["trace_tool_logs"], queries["trace_approvals"]
+    ) = await capture(lambda db: load_trace(db, run.id, company_id), [run])
+    queries["entity_library"], queries["entity_run_stats"] = await capture(
+        lambda db: AIService(db).get_entity_library(company_id, include_stats=True),
+        [{"id": entity_id, "created_at": now}])
+    queries["entities_by_type"], = await capture(lambda db: AIService(db).get_entities(company_id, "AGENT"))
+    queries["entities_by_tag"], = await capture(lambda db: AIService(db).get_entities(company_id, tag="sales"))
+    queries["entities_by_model_name"], = await capture(
+        lambda db: AIService(db).get_entities(company_id, model_name="gpt-4o"))
+    queries["execution_history_by_input_key"], = await capture(
+        lambda db: AIService(db).get_executions(company_id, input_key="ticket_id", fields=["id"]))
+    queries["pending_approvals"], = await capture(lambda db: AIService(db).get_pending_approvals(company_id))
+    queries["documents"], = await capture(lambda db: AIService(db).get_documents(company_id, entity_id))
+    queries["api_key_by_sku"], = await capture(lambda db: ConfigService(db).get_api_key_by_sku(company_id, "gpt-4o"))
+    queries["usage_by_period"] = (
+        select(func.sum(UsageLog.calculated_cost))
+        .where(UsageLog.company_id == company_id, UsageLog.timestamp >= now - timedelta(days=30), UsageLog.timestamp < now)
+    )
+    return queries
+
+
+QUERY_NAMES = [
+    "execution_history", "execution_history_by_status", "execution_history_by_entity",
+    "trace_tree", "trace_llm_logs", "trace_tool_logs", "trace_approvals",
+    "entity_library", "entity_run_stats", "entities_by_type", "entities_by_tag", "entities_by_model_name",
+    "execution_history_by_input_key", "pending_approvals",
+    "documents", "api_key_by_sku", "usage_by_period",
+]
+
+
+def seq_scans(plan: dict) -> list:
+    """Table names of every Seq Scan node in a JSON plan tree, with monthly partitions mapped to their parent."""
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(re.sub(r"_y\d{4}m\d{2}$", "", plan.get("Relation Name", "")))
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child))
+    return found
+
+
+def test_every_query_is_checked(fake_session):
+    """Test the parametrized list covers every captured query."""
+    import asyncio
+
+    assert sorted(asyncio.run(build_queries(fake_session))) == sorted(QUERY_NAMES)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name", QUERY_NAMES)
+async def test_hot_query_uses_an_index(fake_session, name):
+    """Test a hot query is served by an index on every AI table it reads."""
+    url = os.environ.get("TEST_DATABASE_URL") or os.environ.get("DATABASE_URL")
+    engine = create_async_engine(url)
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SET enable_seqscan = off"))
+            statement = (await build_queries(fake_session))[name]
+            result = await conn.execute(Explain(statement))
+            plan = result.scalar()
+    except (OSError, SQLAlchemyError) as e:
+        pytest.skip(f"Database not reachable: {e}")
+    finally:
+        await engine.dispose()
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    scanned = sorted(set(seq_scans(plan[0]["Plan"])) & HOT_TABLES)
+    assert not scanned, f"{name} sequentially scans {scanned}:\n{json.dumps(plan, indent=2)}"
@@ -0,0 +1,81 @@
+"""Tests for the RETRIEVAL step in the execution engine."""
+
+from types import SimpleNamespace
+from uuid import uuid4
+import pytest
+from src.ai import worker
+from src.ai.plan_compiler import compile_plan
+from src.ai.schemas import PlanStep, StepType
+from src.ai.worker import ExecutionEngine
+
+
+def make_step(**target):
+    return PlanStep(
+        step_id=uuid4(),
+        order=1,
+        name="Retrieve",
+        type=StepType.RETRIEVAL,
+        target={"query_template": "{{question}}", **target}
+    )
+
+
+def make_plan(capabilities=None):
+    entity = SimpleNamespace(
+        id=uuid4(), version="1.0.0", updated_at=None, logic_gate=None, llm_config=None, identity=None,
+        capabilities=capabilities, planning={"static_plan": {"steps": [make_step().model_dump()]}}
+    )
+    plan = compile_plan(entity)
+    return plan, plan.steps[0]
+
+
+@pytest.fixture
+def search_calls(monkeypatch):
+    calls = []
+
+    async def fake_search(self, query, company_id, entity_id=None, top_k=5):
+        calls.append(query)
+        return [
+            SimpleNamespace(chunk_id=uuid4(), document_id=uuid4(), filename="a.txt",
+                            content="alpha " * 30, similarity=0.9),
+            SimpleNamespace(chunk_id=uuid4(), document_id=uuid4(), filename="b.txt",
+                            content="beta " * 30, similarity=0.8),
+        ]
+
+    monkeypatch.setattr(worker.AIService, "search_documents", fake_search)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_retrieval_respects_token_budget(fake_session, search_calls):
+    """Test retrieved chunks are cut off at max_context_tokens."""
+    db = fake_session()
+    engine = ExecutionEngine(db, redis_pool=None)
+    run = SimpleNamespace(id=uuid4(), company_id=uuid4())
+    plan, step = make_plan({"context_engineering": {"max_context_tokens": 70}})
+
+    result = await engine._execute_step(run, plan, step, {"question": "what is alpha?"})
+
+    assert search_calls == ["what is alpha?"]
+    assert "alpha" in result["output"] and "beta" not in result["output"]
+    assert len(result["sources"]) == 1
+    log = db.added[0]
+    assert log.tool_id == "retrieval"
+    assert log.output_result["truncated"] is True
+    assert log.latency_ms is not None
+
+
+@pytest.mark.asyncio
+async def test_retrieval_cached_per_run(fake_session, search_calls):
+    """Test repeated retrievals within a run reuse the first search."""
+    db = fake_session()
+    engine = ExecutionEngine(db, redis_pool=None)
+    run = SimpleNamespace(id=uuid4(), company_id=uuid4())
+    plan, step = make_plan()
+    context = {"question": "what is alpha?"}
+
+    first = await engine._execute_step(run, plan, step, context)
+    second = await engine._execute_step(run, plan, step, context)
+
+    assert first["output"] == second["output"]
+    assert len(search_calls) == 1
+    assert [log.log_metadata["cached"] for log in db.added] == [False, True]
@@ -0,0 +1,67 @@
+"""Tests for compiled prompt templates."""
+
+import pytest
+from src.ai.templating import Template, compile_template
+
+CONTEXT = {
+    "user": {"name": "Ada", "nickname": None},
+    "items": [{"title": "first"}, {"title": "second"}],
+    "order": {"id": 7, "lines": ["tea", "café"]},
+}
+
+
+@pytest.mark.parametrize("source, expected", [
+    ("{{ items.0.title }}", "first"),
+    ("{{ items[1].title }}", "second"),
+    ("{{ items[-1].title }}", "second"),
+    ("{{ items.5.title }}", "{{ items.5.title }}"),
+    ("{{ order.lines.1 }}", "café"),
+])
+def test_index_access(source, expected):
+    """Test list elements are reachable by dotted or bracketed index."""
+    assert Template(source).render(CONTEXT) == expected
+
+
+def test_default_applies_only_when_missing():
+    """Test defaults fill missing paths but not values that exist, even None."""
+    template = Template('{{ user.title | default("friend") }} {{ user.nickname | default("x") }}')
+
+    assert template.render(CONTEXT) == "friend None"
+    assert Template("{{ missing | default(3) }}").render({}) == "3"
+
+
+def test_json_filter():
+    """Test the json filter encodes structures instead of using their repr."""
+    assert Template("{{ order | json }}").render(CONTEXT) == '{"id": 7, "lines": ["tea", "café"]}'
+    assert Template("{{ missing | default([]) | json }}").render({}) == "[]"
+
+
+def test_default_argument_may_contain_pipes():
+    """Test filter arguments are not split on the pipe separator."""
+    assert Template("{{ missing | default('a | b') }}").render({}) == "a | b"
+
+
+def test_escaped_tag_is_literal():
+    """Test a backslash keeps a tag in the output unrendered."""
+    assert Template(r"\{{ user.name }} is {{ user.name }}").render(CONTEXT) == "{{ user.name }} is Ada"
+
+
+@pytest.mark.parametrize("source", ["{{ x | upper }}", "{{ x | default(unquoted) }}", "{{ x | json(1) }}"])
+def test_unknown_filters_render_verbatim(source):
+    """Test tags the engine does not understand are left as text, like parse_variables did."""
+    template = Template(f"Hi {source} {{{{ x }}}}")
+
+    assert template.render({"x": "Ada"}) == f"Hi {source} Ada"
+    assert template.variables == {"x"}
+
+
+def test_variables_lists_root_keys():
+    """Test the root keys read by accessors are exposed."""
+    template = Template(r"{{ items[0].title }} {{ user.name | json }} \{{ escaped }}")
+
+    assert template.variables == {"items", "user"}
+
+
+def test_compile_template_is_cached():
+    """Test the same source is parsed once."""
+    assert compile_template("Hi {{ user.name }}") is compile_template("Hi {{ user.name }}")
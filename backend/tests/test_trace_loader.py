@@ -0,0 +1,109 @@
+"""Tests for the recursive-CTE execution trace loader."""
+
+from datetime import datetime, timedelta
+from uuid import uuid4
+import pytest
+from sqlalchemy.dialects import postgresql
+import src.config.models  # noqa: F401 - registers IntegrationRegistry for relationship mapping
+from src.ai.models import ExecutionRun, LLMInteractionLog, ToolInteractionLog
+from src.ai.schemas import ExecutionRunResponse
+from src.ai.trace_loader import assemble_tree, build_trace_query, load_trace, log_window_start
+
+
+def make_run(parent=None):
+    return ExecutionRun(
+        id=uuid4(), entity_id=uuid4(), company_id=uuid4(), status="COMPLETED",
+        parent_run_id=parent.id if parent else None, created_at=datetime.utcnow(),
+        total_cost_usd=0, total_tokens=0
+    )
+
+
+def make_chain(depth):
+    runs = [make_run()]
+    for _ in range(depth - 1):
+        runs.append(make_run(runs[-1]))
+    return runs
+
+
+def llm_log(run):
+    return LLMInteractionLog(
+        id=uuid4(), run_id=run.id, model_provider="openai", model_name="gpt-4o",
+        input_prompt="in", output_response="out", prompt_tokens=1, completion_tokens=1,
+        latency_ms=1, cost_usd=0, created_at=datetime.utcnow()
+    )
+
+
+def test_trace_query_is_recursive_cte():
+    """Test the tree is selected with one recursive CTE on parent_run_id."""
+    sql = str(build_trace_query(uuid4(), uuid4()).compile(dialect=postgresql.dialect()))
+
+    assert "WITH RECURSIVE run_tree" in sql
+    assert "execution_runs.parent_run_id = run_tree.id" in sql
+
+
+def test_assemble_tree_keeps_every_level():
+    """Test runs deeper than the old three eager-load levels are attached."""
+    runs = make_chain(6)
+    sibling = make_run(runs[0])
+    logs = [llm_log(run) for run in runs]
+
+    root = assemble_tree(runs + [sibling], logs, [], [], runs[0].id)
+    response = ExecutionRunResponse.model_validate(root)
+
+    node, depth = response, 1
+    while node.child_runs:
+        assert len(node.llm_logs) == 1
+        node = node.child_runs[0]
+        depth += 1
+    assert depth == 6
+    assert len(response.child_runs) == 2
+
+
+def test_assemble_tree_subtree_root():
+    """Test loading from a child run treats it as the root of the tree."""
+    runs = make_chain(3)
+
+    root = assemble_tree(runs[1:], [], [], [], runs[1].id)
+
+    assert root is runs[1]
+    assert root.child_runs == [runs[2]]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("depth", [1, 8])
+async def test_query_count_is_constant(fake_session, depth):
+    """Test load_trace issues four queries whatever the tree depth."""
+    runs = make_chain(depth)
+    tool = ToolInteractionLog(id=uuid4(), run_id=runs[-1].id, tool_id="calculator", tool_name="Calculator")
+    db = fake_session(runs, [llm_log(run) for run in runs], [tool], [])
+
+    root = await load_trace(db, runs[0].id, runs[0].company_id)
+
+    assert len(db.statements) == 4
+    leaf = root
+    while leaf.child_runs:
+        leaf = leaf.child_runs[0]
+    assert leaf.tool_logs == [tool]
+
+
+@pytest.mark.asyncio
+async def test_missing_run_returns_none(fake_session):
+    """Test an unknown or foreign run stops after the tree query."""
+    db = fake_session([])
+
+    assert await load_trace(db, uuid4(), uuid4()) is None
+    assert len(db.statements) == 1
+
+
+@pytest.mark.parametrize("created_at", [datetime(2026, 10, 19, 12, 0), datetime(2026, 11, 1, 0, 0, 30)])
+def test_log_window_tolerates_clock_skew(created_at):
+    """Test a log stamped before its run by a skewed worker clock is inside the window."""
+    run = make_run()
+    run.created_at = created_at
+    log_time = created_at - timedelta(minutes=5)
+
+    start = log_window_start([run])
+
+    assert start <= log_time
+    assert start == datetime(log_time.year, log_time.month, 1)
+
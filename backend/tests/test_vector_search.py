@@ -0,0 +1,62 @@
+import pytest
+from src.ai import vector_search
+from src.ai.vector_search import (
+    build_batch_search_sql, build_search_sql, candidate_count, ef_search_sql, resolve_search_mode
+)
+
+
+def test_full_mode_binds_query_embedding():
+    """Test exact search binds the query vector via CAST."""
+    sql = build_search_sql("full")
+    assert {"query_embedding", "company_id", "entity_id", "top_k"} <= set(sql._bindparams)
+    assert "candidates" not in str(sql)
+
+
+@pytest.mark.parametrize("mode,operator", [("halfvec", "halfvec(768)"), ("binary", "binary_quantize")])
+def test_quantized_modes_rescore_candidates(mode, operator):
+    """Test quantized modes search candidates then rescore at full precision."""
+    sql = build_search_sql(mode)
+    statement = str(sql)
+    assert operator in statement
+    assert "candidates" in sql._bindparams
+    # Final ordering uses the full-precision vector
+    assert statement.rstrip().endswith("ORDER BY dc.embedding <=> CAST(:query_embedding AS vector(768))\n    LIMIT :top_k")
+
+
+@pytest.mark.parametrize("mode", ["full", "halfvec", "binary"])
+def test_batch_search_uses_lateral_join(mode):
+    """Test batch search runs every query vector through one statement."""
+    sql = build_batch_search_sql(mode)
+    statement = str(sql)
+    assert "CROSS JOIN LATERAL" in statement
+    assert "query_embeddings" in sql._bindparams
+    assert "query_embedding" not in sql._bindparams
+    assert "ORDER BY dc.embedding <=> q.embedding" in statement
+
+
+def test_unknown_mode_rejected():
+    """Test an unknown search mode raises."""
+    with pytest.raises(ValueError):
+        build_search_sql("int4")
+
+
+def test_candidate_count_bounds():
+    """Test candidate counts never drop below top_k or exceed 1000."""
+    assert candidate_count(10, 8) == 80
+    assert candidate_count(5, 0) == 5
+    assert candidate_count(500, 8) == 1000
+    assert "= 40" in str(ef_search_sql(10))
+    assert "= 1000" in str(ef_search_sql(5000))
+
+
+@pytest.mark.asyncio
+async def test_missing_quantized_index_falls_back_to_exact(fake_session, monkeypatch):
+    """Test a quantized mode whose index was never built searches exactly, checking once."""
+    monkeypatch.setattr(vector_search, "_resolved_modes", {})
+    session = fake_session([False], [True])
+
+    assert await resolve_search_mode(session, "halfvec") == "full"
+    assert await resolve_search_mode(session, "halfvec") == "full"
+    assert await resolve_search_mode(session, "binary") == "binary"
+    assert await resolve_search_mode(session, "full") == "full"
+    assert len(session.statements) == 2
@@ -20,12 +20,12 @@ export const Dashboard: React.FC = () => {
             try {
                 const [statsRes, executionsRes] = await Promise.all([
                     apiClient.get('/ai/stats'),
-                    apiClient.get('/ai/executions')
+                    apiClient.get('/ai/executions', { params: { limit: 5, fields: 'id,status,created_at' } })
                 ]);
                 setStats(statsRes.data);
 
                 // transform executions to activity items
-                const activities = executionsRes.data.slice(0, 5).map((exec: any) => ({
+                const activities = executionsRes.data.items.map((exec: any) => ({
                     id: exec.id,
                     type: 'execution',
                     title: `Workflow Execution: ${exec.status}`,
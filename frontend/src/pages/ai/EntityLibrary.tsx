@@ -3,29 +3,49 @@ import { Link } from 'react-router-dom';
 import { GlassCard, JellyButton } from '@/components/ui';
 import { Plus, Brain, Workflow, Zap, Activity, Edit, Trash2, Play, Layers, Tag } from 'lucide-react';
 import { apiClient } from '@/services/api.client';
-import { HierarchicalEntity, EntityType, EntityStatus } from '@/types';
+import { EntityLibraryItem, EntityLibraryPage, EntityType, EntityStatus } from '@/types';
 import './EntityLibrary.css';
 
+const PAGE_SIZE = 60;
+
 export const EntityLibrary: React.FC = () => {
-    const [entities, setEntities] = useState<HierarchicalEntity[]>([]);
+    const [entities, setEntities] = useState<EntityLibraryItem[]>([]);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
     const [loading, setLoading] = useState(true);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [filter, setFilter] = useState<EntityType | 'ALL'>('ALL');
 
     useEffect(() => {
+        setLoading(true);
         fetchEntities();
-    }, []);
+    }, [filter]);
 
-    const fetchEntities = async () => {
+    const fetchEntities = async (cursor?: string) => {
         try {
-            const { data } = await apiClient.get('/ai/entities');
-            setEntities(data);
+            const { data } = await apiClient.get<EntityLibraryPage>('/ai/entities/library', {
+                params: {
+                    limit: PAGE_SIZE,
+                    cursor,
+                    type: filter === 'ALL' ? undefined : filter,
+                    include_stats: true
+                }
+            });
+            setEntities(prev => cursor ? [...prev, ...data.items] : data.items);
+            setNextCursor(data.next_cursor);
         } catch (error) {
             console.error('Failed to fetch entities:', error);
         } finally {
             setLoading(false);
+            setLoadingMore(false);
         }
     };
 
+    const loadMore = () => {
+        if (!nextCursor) return;
+        setLoadingMore(true);
+        fetchEntities(nextCursor);
+    };
+
     const handleDelete = async (id: string) => {
         if (window.confirm('Are you sure you want to delete this entity?')) {
             try {
@@ -63,10 +83,6 @@ export const EntityLibrary: React.FC = () => {
         }
     };
 
-    const filteredEntities = filter === 'ALL'
-        ? entities
-        : entities.filter(e => e.type === filter);
-
     if (loading) {
         return (
             <div className="loading-container">
@@ -106,14 +122,14 @@ export const EntityLibrary: React.FC = () => {
             </div>
 
             <div className="entities-grid">
-                {filteredEntities.length === 0 ? (
+                {entities.length === 0 ? (
                     <GlassCard className="empty-state">
                         <Brain size={64} color="var(--color-text-tertiary)" />
                         <h3>Nothing here yet</h3>
                         <p>Begin by creating an Atomic Action or a Complex Process</p>
                     </GlassCard>
                 ) : (
-                    filteredEntities.map((entity) => (
+                    entities.map((entity) => (
                         <GlassCard key={entity.id} hover className="entity-card">
                             <div className="entity-card-header">
                                 <div className="entity-icon" style={{ color: getTypeColor(entity.type) }}>
@@ -140,14 +156,14 @@ export const EntityLibrary: React.FC = () => {
                             </p>
 
                             <div className="entity-meta">
-                                {entity.logic_gate?.reasoning_config && (
+                                {entity.model_name && (
                                     <span className="meta-item" title="Model">
-                                        <Brain size={12} /> {entity.logic_gate.reasoning_config.model_name}
+                                        <Brain size={12} /> {entity.model_name}
                                     </span>
                                 )}
-                                {entity.planning?.static_plan?.steps && (
+                                {entity.step_count > 0 && (
                                     <span className="meta-item" title="Steps">
-                                        <Activity size={12} /> {entity.planning.static_plan.steps.length} steps
+                                        <Activity size={12} /> {entity.step_count} steps
                                     </span>
                                 )}
                                 {entity.tags && entity.tags.length > 0 && (
@@ -155,6 +171,12 @@ export const EntityLibrary: React.FC = () => {
                                         <Tag size={12} /> {entity.tags.length}
                                     </span>
                                 )}
+                                {entity.stats && entity.stats.run_count > 0 && (
+                                    <span className="meta-item" title="Runs (success rate)">
+                                        <Play size={12} /> {entity.stats.run_count}
+                                        {entity.stats.success_rate !== null && ` (${Math.round(entity.stats.success_rate * 100)}%)`}
+                                    </span>
+                                )}
                             </div>
 
                             <div className="entity-actions">
@@ -181,6 +203,14 @@ export const EntityLibrary: React.FC = () => {
                     ))
                 )}
             </div>
+
+            {nextCursor && (
+                <div className="load-more">
+                    <JellyButton variant="ghost" onClick={loadMore} disabled={loadingMore}>
+                        {loadingMore ? 'Loading...' : 'Load more'}
+                    </JellyButton>
+                </div>
+            )}
         </div>
     );
 };
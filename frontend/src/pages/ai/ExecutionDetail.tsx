@@ -3,10 +3,39 @@ import { useParams, useNavigate } from 'react-router-dom';
 import { GlassCard, JellyButton } from '@/components/ui';
 import { ArrowLeft, ChevronDown, ChevronRight, Zap, Cpu, MessageSquare, Wrench, Clock, DollarSign, Database, Brain, Layers } from 'lucide-react';
 import { apiClient } from '@/services/api.client';
-import { ExecutionRun, RunStatus, EntityType, LLMInteractionLog, ToolInteractionLog } from '@/types';
+import { ExecutionRun, RunStatus, EntityType, LLMInteractionLog, ToolInteractionLog, ArtifactReference, ArtifactContent } from '@/types';
 import './ExecutionDetail.css';
 
-const TraceNode: React.FC<{ run: ExecutionRun; depth: number }> = ({ run, depth }) => {
+const ArtifactBody: React.FC<{ executionId: string; text: string; reference?: ArtifactReference }> = ({ executionId, text, reference }) => {
+    const [full, setFull] = useState<string | null>(null);
+    const [loading, setLoading] = useState(false);
+
+    const loadFull = async () => {
+        if (!reference) return;
+        setLoading(true);
+        try {
+            const { data } = await apiClient.get<ArtifactContent>(`/ai/executions/${executionId}/artifacts/${reference.$artifact}`);
+            setFull(typeof data.content === 'string' ? data.content : JSON.stringify(data.content, null, 2));
+        } catch (error) {
+            console.error('Failed to load artifact:', error);
+        } finally {
+            setLoading(false);
+        }
+    };
+
+    return (
+        <>
+            <pre>{full ?? text}</pre>
+            {reference && full === null && (
+                <button className="text-btn" onClick={loadFull} disabled={loading}>
+                    {loading ? 'Loading...' : `Load full (${(reference.size / 1024).toFixed(1)} KB)`}
+                </button>
+            )}
+        </>
+    );
+};
+
+const TraceNode: React.FC<{ run: ExecutionRun; depth: number; executionId: string }> = ({ run, depth, executionId }) => {
     const [expanded, setExpanded] = useState(depth < 2);
     const [showLLMLogs, setShowLLMLogs] = useState(false);
     const [showToolLogs, setShowToolLogs] = useState(false);
@@ -95,11 +124,11 @@ const TraceNode: React.FC<{ run: ExecutionRun; depth: number }> = ({ run, depth
                                     <div className="log-io">
                                         <div className="io-box">
                                             <label>Prompt</label>
-                                            <pre>{log.input_prompt}</pre>
+                                            <ArtifactBody executionId={executionId} text={log.input_prompt} reference={log.log_metadata?.artifacts?.input_prompt} />
                                         </div>
                                         <div className="io-box">
                                             <label>Response</label>
-                                            <pre>{log.output_response}</pre>
+                                            <ArtifactBody executionId={executionId} text={log.output_response} reference={log.log_metadata?.artifacts?.output_response} />
                                         </div>
                                     </div>
                                 </div>
@@ -147,7 +176,7 @@ const TraceNode: React.FC<{ run: ExecutionRun; depth: number }> = ({ run, depth
                     {hasChildren && (
                         <div className="node-children">
                             {run.child_runs?.map(child => (
-                                <TraceNode key={child.id} run={child} depth={depth + 1} />
+                                <TraceNode key={child.id} run={child} depth={depth + 1} executionId={executionId} />
                             ))}
                         </div>
                     )}
@@ -214,7 +243,7 @@ export const ExecutionDetail: React.FC = () => {
                             <h2>Hierarchical Invocation Tree</h2>
                         </div>
                         <div className="trace-container">
-                            <TraceNode run={run} depth={0} />
+                            <TraceNode run={run} depth={0} executionId={run.id} />
                         </div>
                     </GlassCard>
                 </div>
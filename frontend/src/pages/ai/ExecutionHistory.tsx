@@ -3,29 +3,48 @@ import { Link } from 'react-router-dom';
 import { GlassCard, JellyButton } from '@/components/ui';
 import { Clock, CheckCircle, XCircle, Loader, Eye, RotateCcw, DollarSign, Database } from 'lucide-react';
 import { apiClient } from '@/services/api.client';
-import { ExecutionRun, RunStatus } from '@/types';
+import { ExecutionRun, ExecutionRunPage, RunStatus } from '@/types';
 import './ExecutionHistory.css';
 
+const PAGE_SIZE = 50;
+
 export const ExecutionHistory: React.FC = () => {
     const [executions, setExecutions] = useState<ExecutionRun[]>([]);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
     const [loading, setLoading] = useState(true);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [filter, setFilter] = useState<RunStatus | 'ALL'>('ALL');
 
     useEffect(() => {
+        setLoading(true);
         fetchExecutions();
-    }, []);
+    }, [filter]);
 
-    const fetchExecutions = async () => {
+    const fetchExecutions = async (cursor?: string) => {
         try {
-            const { data } = await apiClient.get('/ai/executions');
-            setExecutions(data);
+            const { data } = await apiClient.get<ExecutionRunPage>('/ai/executions', {
+                params: {
+                    limit: PAGE_SIZE,
+                    cursor,
+                    status: filter === 'ALL' ? undefined : filter
+                }
+            });
+            setExecutions(prev => cursor ? [...prev, ...data.items] : data.items);
+            setNextCursor(data.next_cursor);
         } catch (error) {
             console.error('Failed to fetch executions:', error);
         } finally {
             setLoading(false);
+            setLoadingMore(false);
         }
     };
 
+    const loadMore = () => {
+        if (!nextCursor) return;
+        setLoadingMore(true);
+        fetchExecutions(nextCursor);
+    };
+
     const getStatusIcon = (status: RunStatus) => {
         switch (status) {
             case RunStatus.COMPLETED:
@@ -49,11 +68,6 @@ export const ExecutionHistory: React.FC = () => {
         });
     };
 
-    const filteredExecutions = executions.filter(exec => {
-        if (filter === 'ALL') return true;
-        return exec.status === filter;
-    });
-
     if (loading) {
         return (
             <div className="loading-container">
@@ -79,13 +93,13 @@ export const ExecutionHistory: React.FC = () => {
                         className={`filter-btn ${filter === s ? 'active' : ''}`}
                         onClick={() => setFilter(s)}
                     >
-                        {s} ({s === 'ALL' ? executions.length : executions.filter(e => e.status === s).length})
+                        {s}
                     </button>
                 ))}
             </div>
 
             <div className="executions-list">
-                {filteredExecutions.length === 0 ? (
+                {executions.length === 0 ? (
                     <GlassCard className="empty-state">
                         <Clock size={64} color="var(--color-text-tertiary)" />
                         <h3>Quiet in the archives</h3>
@@ -96,7 +110,7 @@ export const ExecutionHistory: React.FC = () => {
                         </p>
                     </GlassCard>
                 ) : (
-                    filteredExecutions.map((execution) => (
+                    executions.map((execution) => (
                         <GlassCard key={execution.id} hover className="execution-card">
                             <div className="execution-status-icon">
                                 {getStatusIcon(execution.status)}
@@ -167,6 +181,14 @@ export const ExecutionHistory: React.FC = () => {
                     ))
                 )}
             </div>
+
+            {nextCursor && (
+                <div className="load-more">
+                    <JellyButton variant="ghost" onClick={loadMore} disabled={loadingMore}>
+                        {loadingMore ? 'Loading...' : 'Load more'}
+                    </JellyButton>
+                </div>
+            )}
         </div>
     );
 };
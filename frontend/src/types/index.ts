@@ -9,6 +9,34 @@ export interface Company {
     updated_at: string;
 }
 
+export interface EntityRunStats {
+    run_count: number;
+    last_run_at: string | null;
+    success_rate: number | null;
+}
+
+export interface EntityLibraryItem {
+    id: string;
+    parent_id?: string;
+    name: string;
+    display_name?: string;
+    description?: string;
+    type: EntityType;
+    version: string;
+    status: EntityStatus;
+    tags: string[] | null;
+    model_name: string | null;
+    step_count: number;
+    created_at: string;
+    updated_at: string;
+    stats?: EntityRunStats;
+}
+
+export interface EntityLibraryPage {
+    items: EntityLibraryItem[];
+    next_cursor: string | null;
+}
+
 export interface User {
     id: string;
     email: string;
@@ -199,9 +227,26 @@ export interface LLMInteractionLog {
     latency_ms?: number;
     cost_usd: number;
     reasoning_mode?: string;
+    log_metadata?: { artifacts?: Record<string, ArtifactReference>; [key: string]: any };
     created_at: string;
 }
 
+// Large payloads stored by reference; the full body is loaded on demand
+export interface ArtifactReference {
+    $artifact: string;
+    codec: string;
+    kind: 'text' | 'json';
+    size: number;
+    preview: string;
+}
+
+export interface ArtifactContent {
+    digest: string;
+    kind: 'text' | 'json';
+    size: number;
+    content: any;
+}
+
 export interface ToolInteractionLog {
     id: string;
     run_id: string;
@@ -248,3 +293,8 @@ export interface ExecutionRun {
     child_runs?: ExecutionRun[];
     entity?: HierarchicalEntity;
 }
+
+export interface ExecutionRunPage {
+    items: ExecutionRun[];
+    next_cursor: string | null;
+}